@@ -1,12 +1,36 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
-from flask_mysqldb import MySQL
-from flask_session import Session
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import Flask, Response, render_template, request, redirect, url_for, session, flash, jsonify, current_app
 from werkzeug.utils import secure_filename
 import os
+import secrets
+import time
 from datetime import datetime, timedelta
+from urllib.parse import urlsplit
 from config import Config
-from utils.db_helper import execute_query, call_procedure, call_function, execute_transaction
+from utils.db_helper import execute_query, call_procedure, call_function, execute_transaction, get_pool_stats
+from utils.db_pool import ConnectionPool
+from utils.db_replicas import ReplicaSet
+from utils.booking_engine import (create_booking, create_booking_from_hold, normalize_seats, BookingError,
+                                  ShowNotFoundError, SeatUnavailableError, MAX_SEATS_PER_BOOKING,
+                                  USER_BOOKINGS_QUERY)
+from utils.seat_index import SeatIndex
+from utils.seat_holds import SeatHolds
+from utils.seat_feed import SeatFeeds, FeedFullError
+from utils.sessions import init_session
+from utils.passwords import PasswordHasher, HasherBusyError
+from utils.audit_log import AuditLog
+from utils.metrics import Metrics
+from utils.seat_layout import is_valid_seat
+from utils.page_cache import PageCache
+from utils.movie_search import MovieSearchIndex
+from utils.versions import VersionCounters
+from utils.assets import AssetPipeline
+from utils.compression import ResponseCompressor
+from utils.templates import init_templates, template_fingerprint
+from utils.reports import booking_report_page, count_bookings, ReportRequestError
+from utils.exports import export_report, ExportRequestError
+from utils.show_schedule import read_rows, schedule_shows, ScheduleRequestError
+from utils.revenue import revenue_totals, top_movies as top_movies_by_revenue
+from cli import register_commands
 
 # Add datetime to template globals
 def inject_now():
@@ -16,13 +40,30 @@ app = Flask(__name__)
 app.config.from_object(Config)
 
 # Initialize extensions
-mysql = MySQL(app)
-app.mysql = mysql  # Make mysql accessible to db_helper
-Session(app)
+app.db_pool = ConnectionPool.from_config(app.config)  # Shared by utils.db_helper
+app.db_replicas = ReplicaSet.from_config(app.config)  # Read replicas from DB_REPLICAS (none by default)
+app.seat_index = SeatIndex.from_config(app.config)
+app.seat_holds = SeatHolds.from_app(app)  # Expires holds on a background thread
+app.seat_feeds = SeatFeeds.from_app(app)  # Live seat maps over app.seat_index/seat_holds
+app.page_cache = PageCache.from_config(app.config)
+app.movie_search = MovieSearchIndex.from_config(app.config)
+app.passwords = PasswordHasher.from_config(app.config)  # KDF work runs on a bounded pool
+app.audit_log = AuditLog.from_app(app)  # Batched activity_log/cancellations_log writer
+app.metrics = Metrics.from_app(app)  # Times requests and every utils.db_helper statement
+app.versions = VersionCounters.from_app(app)  # ETag/Last-Modified for pages and seat maps
+app.assets = AssetPipeline.from_app(app)  # Fingerprinted CSS/JS bundles at /assets/ (asset_url in templates)
+app.compressor = ResponseCompressor.from_app(app)  # gzip for HTML/JSON bodies over COMPRESS_MIN_SIZE
+app.fragment_cache = init_templates(app)  # Jinja bytecode cache, plus {% cache %} movie cards and show rows
+app.versions.add_build_part(app.assets.fingerprint)  # a deploy changes ETags even if no data did
+app.versions.add_build_part(lambda: template_fingerprint(app))
+init_session(app)
 
 # Add template globals
 app.context_processor(inject_now)
 
+# Maintenance commands (flask --app app <command>)
+register_commands(app)
+
 # Create upload directory if it doesn't exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
@@ -49,11 +90,64 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def same_origin(f):
+    """Decorator refusing state-changing requests that another site's page sent (CSRF)"""
+    from functools import wraps
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            # Browsers send Origin (or at least Referer) with cross-site POSTs; scripts like curl send neither
+            origin = request.headers.get('Origin') or request.headers.get('Referer')
+            if origin and urlsplit(origin).netloc != request.host:
+                return jsonify({'success': False, 'error': 'Cross-site request refused.'}), 403
+        return f(*args, **kwargs)
+    return decorated_function
+
+def changed(*entities):
+    """Drop cached pages built from ``entities`` and bump their versions in every worker"""
+    current_app.page_cache.invalidate(*entities)
+    current_app.fragment_cache.invalidate(*entities)
+    current_app.versions.bump(*entities)
+
+def changed_show(show_id):
+    """``changed`` for a show's seats, which its movie's page lists too"""
+    show = execute_query("SELECT movie_id FROM shows WHERE show_id = %s", (show_id,), primary=True)
+    changed(f'show:{show_id}', *(f'movie:{row["movie_id"]}' for row in show))
+
+def apply_remote_changes(entities):
+    """Drop this worker's cached copies of entities another worker changed"""
+    app.page_cache.invalidate(*entities)
+    app.fragment_cache.invalidate(*entities)
+    for entity in entities:
+        kind, _, entity_id = entity.partition(':')
+        if kind == 'show':
+            app.seat_index.invalidate(int(entity_id))
+        elif kind == 'holds':
+            app.seat_holds.invalidate(int(entity_id))
+        elif kind == 'catalog':
+            # Read from the primary: a replica may not have the change yet
+            app.movie_search.rebuild(primary=True)
+
+app.versions.add_listener(apply_remote_changes)
+
+def refill_from_primary(*entities):
+    """True if cached data built from ``entities`` was just dropped and a replica may still lag behind"""
+    replicas = current_app.db_replicas
+    return bool(replicas) and current_app.page_cache.invalidated_within(entities, replicas.sticky_seconds)
+
+def page_validators(entities, ttl=None):
+    """Validators for a page this visitor sees, or None if it can't be revalidated"""
+    if '_flashes' in session:
+        return None  # a one-off message is part of this response
+    viewer = (session.get('user_id'), session.get('role'), session.get('name'))
+    return current_app.versions.validators(entities, vary=viewer, ttl=ttl)
+
 # Routes
 @app.route('/')
 def index():
     """Home page with movie listings"""
-    try:
+    def load_catalog():
+        primary = refill_from_primary('catalog')
         # Get all movies with show counts
         movies_query = """
         SELECT m.*, COUNT(s.show_id) as show_count
@@ -63,12 +157,20 @@ def index():
         GROUP BY m.movie_id
         ORDER BY m.release_date DESC
         """
-        movies = execute_query(movies_query)
+        movies = execute_query(movies_query, primary=primary)
         
         # Get unique genres for filter
-        genres = execute_query("SELECT DISTINCT genre FROM movies ORDER BY genre")
-        
-        return render_template('index.html', movies=movies, genres=genres)
+        genres = execute_query("SELECT DISTINCT genre FROM movies ORDER BY genre", primary=primary)
+        return movies, genres
+    
+    try:
+        # Show counts also change as shows start, so the page expires with the cache TTL too
+        validators = page_validators(['catalog'], ttl=app.config['PAGE_CACHE_TTL'])
+        if validators and validators.matches():
+            return current_app.versions.not_modified(validators)
+        movies, genres = current_app.page_cache.get_or_set('index', load_catalog, tags=('catalog',))
+        response = app.make_response(render_template('index.html', movies=movies, genres=genres))
+        return validators.apply(response) if validators else response
     except Exception as e:
         flash(f'Error loading movies: {str(e)}', 'error')
         return render_template('index.html', movies=[], genres=[])
@@ -93,7 +195,7 @@ def register():
                 return render_template('register.html')
             
             # Hash password and create user
-            hashed_password = generate_password_hash(password)
+            hashed_password = current_app.passwords.hash(password)
             user_id = execute_query(
                 "INSERT INTO users (name, email, password, role) VALUES (%s, %s, %s, 'customer')",
                 (name, email, hashed_password),
@@ -117,8 +219,13 @@ def login():
         
         try:
             user = execute_query("SELECT * FROM users WHERE email = %s", (email,))
+            matches, new_hash = current_app.passwords.verify(user[0]['password'], password) if user else (False, None)
             
-            if user and (check_password_hash(user[0]['password'], password) or user[0]['password'] == password):
+            if matches:
+                if new_hash:
+                    # Upgrade plaintext or weaker hashes now that we know the password
+                    execute_query("UPDATE users SET password = %s WHERE user_id = %s",
+                                  (new_hash, user[0]['user_id']), fetch=False)
                 session['user_id'] = user[0]['user_id']
                 session['name'] = user[0]['name']
                 session['role'] = user[0]['role']
@@ -133,6 +240,9 @@ def login():
             else:
                 flash('Invalid email or password.', 'error')
                 
+        except HasherBusyError as e:
+            flash(str(e), 'warning')
+            return render_template('login.html'), 503
         except Exception as e:
             flash(f'Login failed: {str(e)}', 'error')
     
@@ -148,30 +258,48 @@ def logout():
 @app.route('/movie/<int:movie_id>')
 def movie_detail(movie_id):
     """Movie details and show listings"""
-    try:
+    def load_movie_page():
+        # Show changes drop movie:<id> too (see changed_show)
+        primary = refill_from_primary(f'movie:{movie_id}')
+        
         # Get movie details
-        movie = execute_query("SELECT * FROM movies WHERE movie_id = %s", (movie_id,))
+        movie = execute_query("SELECT * FROM movies WHERE movie_id = %s", (movie_id,), primary=primary)
         if not movie:
-            flash('Movie not found.', 'error')
-            return redirect(url_for('index'))
-        
-        movie = movie[0]
+            return None
         
         # Get shows for this movie
         shows_query = """
         SELECT s.show_id, s.show_time, s.price,
                t.name as theater_name, sc.screen_name,
-               total_seats_booked(s.show_id) as booked_seats,
+               COALESCE(o.seats_booked, 0) as booked_seats,
                sc.total_seats
         FROM shows s
         JOIN screens sc ON s.screen_id = sc.screen_id
         JOIN theaters t ON sc.theater_id = t.theater_id
+        LEFT JOIN show_occupancy o ON o.show_id = s.show_id
         WHERE s.movie_id = %s AND s.show_time > NOW()
         ORDER BY s.show_time
         """
-        shows = execute_query(shows_query, (movie_id,))
+        shows = execute_query(shows_query, (movie_id,), primary=primary)
+        return movie[0], shows
+    
+    def page_tags(page):
+        # Bookings on any listed show change its seat counts
+        return [f'movie:{movie_id}'] + [f'show:{show["show_id"]}' for show in page[1]]
+    
+    try:
+        # Bookings on the movie's shows bump movie:<id> too (see changed_show)
+        validators = page_validators([f'movie:{movie_id}'], ttl=app.config['PAGE_CACHE_TTL'])
+        if validators and validators.matches():
+            return current_app.versions.not_modified(validators)
+        page = current_app.page_cache.get_or_set(f'movie:{movie_id}', load_movie_page, tags=page_tags)
+        if page is None:
+            flash('Movie not found.', 'error')
+            return redirect(url_for('index'))
         
-        return render_template('movie_detail.html', movie=movie, shows=shows)
+        movie, shows = page
+        response = app.make_response(render_template('movie_detail.html', movie=movie, shows=shows))
+        return validators.apply(response) if validators else response
         
     except Exception as e:
         flash(f'Error loading movie details: {str(e)}', 'error')
@@ -199,17 +327,12 @@ def booking(show_id):
         
         show = show[0]
         
-        # Get booked seats
-        booked_seats_query = """
-        SELECT bd.seat_number
-        FROM booking_details bd
-        JOIN bookings b ON bd.booking_id = b.booking_id
-        WHERE b.show_id = %s AND b.status = 'confirmed'
-        """
-        booked_seats = execute_query(booked_seats_query, (show_id,))
-        booked_seat_numbers = [seat['seat_number'] for seat in booked_seats]
+        # Get booked seats from the in-memory index
+        booked_seat_numbers = current_app.seat_index.booked_seats(show_id)
+        held_seat_numbers = current_app.seat_holds.held_seats(show_id, exclude_token=session.get('hold_token'))
         
-        return render_template('booking.html', show=show, booked_seats=booked_seat_numbers)
+        return render_template('booking.html', show=show, booked_seats=booked_seat_numbers,
+                               held_seats=held_seat_numbers, hold_ttl=current_app.seat_holds.ttl)
         
     except Exception as e:
         flash(f'Error loading booking page: {str(e)}', 'error')
@@ -228,53 +351,33 @@ def confirm_booking():
             flash('Please select at least one seat.', 'error')
             return redirect(url_for('booking', show_id=show_id))
         
-        # Get show price
-        show = execute_query("SELECT price FROM shows WHERE show_id = %s", (show_id,))
-        if not show:
-            flash('Invalid show.', 'error')
-            return redirect(url_for('index'))
-        
-        price_per_seat = float(show[0]['price'])
-        total_amount = price_per_seat * len(selected_seats)
-        
-        # Check if seats are still available
-        booked_seats_query = """
-        SELECT bd.seat_number
-        FROM booking_details bd
-        JOIN bookings b ON bd.booking_id = b.booking_id
-        WHERE b.show_id = %s AND b.status = 'confirmed'
-        """
-        booked_seats = execute_query(booked_seats_query, (show_id,))
-        booked_seat_numbers = [seat['seat_number'] for seat in booked_seats]
-        
-        for seat in selected_seats:
-            if seat in booked_seat_numbers:
-                flash(f'Seat {seat} is already booked. Please select different seats.', 'error')
-                return redirect(url_for('booking', show_id=show_id))
-        
-        # Create booking transaction
-        queries = [
-            ("INSERT INTO bookings (user_id, show_id, total_amount, status) VALUES (%s, %s, %s, 'confirmed')",
-             (session['user_id'], show_id, total_amount))
-        ]
-        
-        # Execute booking creation
-        booking_id = execute_query(queries[0][0], queries[0][1], fetch=False)
+        # Reject seats we already know are sold without touching the database
+        taken = current_app.seat_index.unavailable(show_id, selected_seats)
+        if taken:
+            flash(str(SeatUnavailableError(taken)), 'error')
+            return redirect(url_for('booking', show_id=show_id))
         
-        # Add seat details
-        for seat in selected_seats:
-            execute_query(
-                "INSERT INTO booking_details (booking_id, seat_number) VALUES (%s, %s)",
-                (booking_id, seat),
-                fetch=False
+        hold_token = session.get('hold_token')
+        try:
+            booking_id, total_amount, hold_claimed = create_booking_from_hold(
+                session['user_id'], show_id, selected_seats, payment_mode, hold_token
             )
+        except ShowNotFoundError:
+            flash('Invalid show.', 'error')
+            return redirect(url_for('index'))
+        except SeatUnavailableError as e:
+            # Our index missed a booking made elsewhere; resync it
+            current_app.seat_index.rebuild(show_id)
+            flash(str(e), 'error')
+            return redirect(url_for('booking', show_id=show_id))
+        except BookingError as e:
+            flash(str(e), 'error')
+            return redirect(url_for('booking', show_id=show_id))
         
-        # Add payment record
-        execute_query(
-            "INSERT INTO payments (booking_id, amount, payment_mode, payment_status) VALUES (%s, %s, %s, 'success')",
-            (booking_id, total_amount, payment_mode),
-            fetch=False
-        )
+        current_app.seat_index.mark_booked(show_id, selected_seats)
+        current_app.seat_holds.record_booking(show_id, hold_token, hold_claimed)
+        current_app.seat_feeds.notify(show_id)
+        changed_show(show_id)
         
         flash(f'Booking confirmed! Booking ID: {booking_id}', 'success')
         return redirect(url_for('my_bookings'))
@@ -288,25 +391,7 @@ def confirm_booking():
 def my_bookings():
     """User's booking history"""
     try:
-        bookings_query = """
-        SELECT b.booking_id, b.booking_date, b.total_amount, b.status,
-               m.title as movie_title, t.name as theater_name, 
-               sc.screen_name, s.show_time,
-               GROUP_CONCAT(bd.seat_number ORDER BY bd.seat_number SEPARATOR ', ') as seats,
-               CASE WHEN s.show_time > NOW() THEN 1 ELSE 0 END as can_cancel
-        FROM bookings b
-        JOIN shows s ON b.show_id = s.show_id
-        JOIN movies m ON s.movie_id = m.movie_id
-        JOIN screens sc ON s.screen_id = sc.screen_id
-        JOIN theaters t ON sc.theater_id = t.theater_id
-        LEFT JOIN booking_details bd ON b.booking_id = bd.booking_id
-        WHERE b.user_id = %s
-        GROUP BY b.booking_id, b.booking_date, b.total_amount, b.status, 
-                 m.title, t.name, sc.screen_name, s.show_time
-        ORDER BY b.booking_date DESC
-        """
-        bookings = execute_query(bookings_query, (session['user_id'],))
-        
+        bookings = execute_query(USER_BOOKINGS_QUERY, (session['user_id'],))
         return render_template('my_bookings.html', bookings=bookings)
         
     except Exception as e:
@@ -335,7 +420,7 @@ def cancel_booking_api(booking_id):
     try:
         # Verify booking belongs to user and get show details
         booking_query = """
-        SELECT b.*, s.show_time, m.title as movie_title
+        SELECT b.*, s.show_time, s.movie_id, m.title as movie_title
         FROM bookings b
         JOIN shows s ON b.show_id = s.show_id
         JOIN movies m ON s.movie_id = m.movie_id
@@ -376,19 +461,18 @@ def cancel_booking_api(booking_id):
                 fetch=False
             )
             
-            # Log the cancellation
-            execute_query(
-                "INSERT INTO cancellations_log (booking_id, user_id, reason) VALUES (%s, %s, %s)",
-                (booking_id, session['user_id'], 'User cancelled booking'),
-                fetch=False
+            # Free the seats in the availability index
+            seats = execute_query(
+                "SELECT seat_number FROM booking_details WHERE booking_id = %s",
+                (booking_id,)
             )
+            current_app.seat_index.mark_released(booking['show_id'], [seat['seat_number'] for seat in seats])
+            current_app.seat_feeds.notify(booking['show_id'])
+            changed(f'show:{booking["show_id"]}', f'movie:{booking["movie_id"]}')
             
-            # Log activity
-            execute_query(
-                "INSERT INTO activity_log (user_id, booking_id, activity_type, details) VALUES (%s, %s, %s, %s)",
-                (session['user_id'], booking_id, 'CANCELLED_BOOKING', f'Cancelled booking for {booking["movie_title"]}'),
-                fetch=False
-            )
+            # Queue the cancellation for the audit writer (written once, off the request path)
+            current_app.audit_log.record_cancellation(booking_id, session['user_id'], 'User cancelled booking',
+                                                      f'Cancelled booking for {booking["movie_title"]}')
             
             return jsonify({
                 'success': True,
@@ -419,29 +503,9 @@ def cancel_booking_api(booking_id):
 def admin_dashboard():
     """Admin dashboard with key metrics"""
     try:
-        # Get total revenue
-        total_revenue = execute_query(
-            "SELECT SUM(total_amount) as revenue FROM bookings WHERE status = 'confirmed'"
-        )[0]['revenue'] or 0
-        
-        # Get total bookings
-        total_bookings = execute_query("SELECT COUNT(*) as count FROM bookings")[0]['count']
-        
-        # Get top movies by revenue (using direct query instead of procedure)
-        top_movies_query = """
-        SELECT 
-            m.title AS Movie,
-            COUNT(b.booking_id) AS TotalBookings,
-            SUM(b.total_amount) AS Revenue
-        FROM bookings b
-        JOIN shows s ON b.show_id = s.show_id
-        JOIN movies m ON s.movie_id = m.movie_id
-        WHERE b.status = 'confirmed'
-        GROUP BY m.movie_id, m.title
-        ORDER BY Revenue DESC
-        LIMIT 3
-        """
-        top_movies = execute_query(top_movies_query)
+        # Revenue, booking count and top movies come from the daily rollup
+        total_revenue, total_bookings = revenue_totals()
+        top_movies = top_movies_by_revenue(3)
         
         # Get recent activity
         recent_activity = execute_query(
@@ -492,48 +556,83 @@ def admin_theaters():
 @app.route('/admin/shows')
 @admin_required
 def admin_shows():
-    """Admin shows management"""
+    """Admin shows management (filtered, keyset-paginated by show time)"""
+    filters = {
+        'date_from': request.args.get('date_from', ''),
+        'date_to': request.args.get('date_to', ''),
+        'theater_id': request.args.get('theater_id', type=int),
+        'movie_id': request.args.get('movie_id', type=int),
+    }
+    before_time = request.args.get('before_time', '')
+    before_id = request.args.get('before_id', type=int)
+    page_size = app.config['ADMIN_SHOWS_PAGE_SIZE']
+    
     try:
         shows_query = """
         SELECT s.*, m.title as movie_title, t.name as theater_name, 
-               sc.screen_name, total_seats_booked(s.show_id) as booked_seats,
+               sc.screen_name, COALESCE(o.seats_booked, 0) as booked_seats,
                sc.total_seats
         FROM shows s
         JOIN movies m ON s.movie_id = m.movie_id
         JOIN screens sc ON s.screen_id = sc.screen_id
         JOIN theaters t ON sc.theater_id = t.theater_id
-        ORDER BY s.show_time DESC
+        LEFT JOIN show_occupancy o ON o.show_id = s.show_id
+        WHERE 1=1
         """
-        shows = execute_query(shows_query)
-        return render_template('admin/shows.html', shows=shows)
+        params = []
+        
+        try:
+            if filters['date_from']:
+                date_from = datetime.strptime(filters['date_from'], '%Y-%m-%d')
+                shows_query += " AND s.show_time >= %s"
+                params.append(date_from)
+            if filters['date_to']:
+                date_to = datetime.strptime(filters['date_to'], '%Y-%m-%d') + timedelta(days=1)
+                shows_query += " AND s.show_time < %s"
+                params.append(date_to)
+            if before_time and before_id:
+                cursor_time = datetime.fromisoformat(before_time)
+                shows_query += " AND (s.show_time < %s OR (s.show_time = %s AND s.show_id < %s))"
+                params.extend([cursor_time, cursor_time, before_id])
+        except ValueError:
+            flash('Invalid date filter ignored.', 'warning')
+        
+        if filters['theater_id']:
+            shows_query += " AND sc.theater_id = %s"
+            params.append(filters['theater_id'])
+        
+        if filters['movie_id']:
+            shows_query += " AND s.movie_id = %s"
+            params.append(filters['movie_id'])
+        
+        # Fetch one extra row to learn whether there is a next page
+        shows_query += " ORDER BY s.show_time DESC, s.show_id DESC LIMIT %s"
+        params.append(page_size + 1)
+        
+        shows = list(execute_query(shows_query, params))
+        next_page = None
+        if len(shows) > page_size:
+            shows = shows[:page_size]
+            next_page = dict(filters, before_time=shows[-1]['show_time'].isoformat(),
+                             before_id=shows[-1]['show_id'])
+        
+        theaters = execute_query("SELECT theater_id, name FROM theaters ORDER BY name")
+        movies = execute_query("SELECT movie_id, title FROM movies ORDER BY title")
+        
+        return render_template('admin/shows.html', shows=shows, theaters=theaters, movies=movies,
+                               filters=filters, next_page=next_page, is_first_page=not before_id)
     except Exception as e:
         flash(f'Error loading shows: {str(e)}', 'error')
-        return render_template('admin/shows.html', shows=[])
+        return render_template('admin/shows.html', shows=[], theaters=[], movies=[],
+                               filters=filters, next_page=None, is_first_page=True)
 
 @app.route('/admin/reports')
 @admin_required
 def admin_reports():
     """Admin reports and analytics"""
     try:
-        # Get full booking report (using direct query instead of procedure)
-        booking_report_query = """
-        SELECT 
-            b.booking_id,
-            u.name AS Customer,
-            m.title AS Movie,
-            t.name AS Theater,
-            s.show_time AS ShowTime,
-            b.total_amount AS Amount,
-            b.status AS Status
-        FROM bookings b
-        JOIN users u ON b.user_id = u.user_id
-        JOIN shows s ON b.show_id = s.show_id
-        JOIN movies m ON s.movie_id = m.movie_id
-        JOIN screens sc ON s.screen_id = sc.screen_id
-        JOIN theaters t ON sc.theater_id = t.theater_id
-        ORDER BY b.booking_date DESC
-        """
-        booking_report = execute_query(booking_report_query)
+        # Booking rows are paged in by /api/admin/reports/bookings; only the total is needed here
+        total_bookings = count_bookings()
         
         # Get movie revenue view
         movie_revenue = execute_query("SELECT * FROM movie_revenue ORDER BY total_revenue DESC")
@@ -541,19 +640,35 @@ def admin_reports():
         # Get theater revenue summary
         theater_revenue = execute_query("SELECT * FROM theater_revenue_summary ORDER BY TotalRevenue DESC")
         
-        # Get customer booking summary
-        customer_summary = execute_query("SELECT * FROM customer_booking_summary ORDER BY Amount DESC LIMIT 20")
+        # Filter choices for the booking report
+        theaters = execute_query("SELECT theater_id, name FROM theaters ORDER BY name")
+        movies = execute_query("SELECT movie_id, title FROM movies ORDER BY title")
         
         return render_template('admin/reports.html',
-                             booking_report=booking_report,
+                             total_bookings=total_bookings,
                              movie_revenue=movie_revenue,
                              theater_revenue=theater_revenue,
-                             customer_summary=customer_summary)
+                             theaters=theaters, movies=movies)
     except Exception as e:
         flash(f'Error loading reports: {str(e)}', 'error')
         return render_template('admin/reports.html',
-                             booking_report=[], movie_revenue=[],
-                             theater_revenue=[], customer_summary=[])
+                             total_bookings=0, movie_revenue=[],
+                             theater_revenue=[], theaters=[], movies=[])
+
+@app.route('/admin/reports/export/<report>')
+@admin_required
+def admin_export_report(report):
+    """Stream a report as CSV or NDJSON (optionally gzipped) without buffering it"""
+    try:
+        body, mimetype, filename = export_report(report, request.args)
+    except ExportRequestError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    return Response(body, mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        # Let nginx-style proxies pass chunks straight through
+        'X-Accel-Buffering': 'no',
+    })
 
 @app.route('/admin/add_movie', methods=['GET', 'POST'])
 @admin_required
@@ -567,11 +682,12 @@ def admin_add_movie():
         release_date = request.form['release_date']
         
         try:
-            execute_query(
+            movie_id = execute_query(
                 "INSERT INTO movies (title, genre, duration, rating, release_date) VALUES (%s, %s, %s, %s, %s)",
-                (title, genre, duration, rating, release_date),
-                fetch=False
+                (title, genre, duration, rating, release_date)
             )
+            current_app.movie_search.refresh_movie(movie_id)
+            changed('catalog', f'movie:{movie_id}')
             flash('Movie added successfully!', 'success')
             return redirect(url_for('admin_movies'))
         except Exception as e:
@@ -606,18 +722,15 @@ def admin_add_show():
     """Add new show"""
     if request.method == 'POST':
         movie_id = int(request.form['movie_id'])
-        screen_id = int(request.form['screen_id'])
-        show_time = request.form['show_time']
-        price = float(request.form['price'])
         
         try:
-            execute_query(
-                "INSERT INTO shows (movie_id, screen_id, show_time, price) VALUES (%s, %s, %s, %s)",
-                (movie_id, screen_id, show_time, price),
-                fetch=False
-            )
-            flash('Show added successfully!', 'success')
-            return redirect(url_for('admin_shows'))
+            # Same overlap check as the bulk import, for a batch of one
+            result = schedule_shows([request.form], buffer_minutes=app.config['SHOW_CLEANING_BUFFER_MINUTES'])
+            if result['inserted']:
+                changed('catalog', f'movie:{movie_id}')
+                flash('Show added successfully!', 'success')
+                return redirect(url_for('admin_shows'))
+            flash(f"Could not schedule show: {result['rejected'][0]['reason']}", 'error')
         except Exception as e:
             flash(f'Error adding show: {str(e)}', 'error')
     
@@ -633,51 +746,159 @@ def admin_add_show():
     
     return render_template('admin/add_show.html', movies=movies, screens=screens)
 
+@app.route('/admin/shows/import', methods=['GET', 'POST'])
+@admin_required
+def admin_import_shows():
+    """Bulk-schedule shows from CSV or JSON, rejecting rows that would double-book a screen.
+
+    The form uploads a file; API clients POST the CSV or JSON as the request
+    body and get the report back as JSON. ``mode=all`` (default) imports
+    nothing if any row is rejected, ``mode=valid`` imports the rest, and
+    ``dry_run=1`` only validates.
+    """
+    if request.method == 'GET':
+        return render_template('admin/import_shows.html', result=None)
+    
+    upload = request.files.get('file')
+    wants_json = upload is None
+    options = request.form if upload is not None else request.args
+    try:
+        if upload is not None:
+            rows = read_rows(upload.read(), upload.mimetype or '')
+        else:
+            rows = read_rows(request.get_data(), request.content_type or '')
+        result = schedule_shows(rows, buffer_minutes=app.config['SHOW_CLEANING_BUFFER_MINUTES'],
+                                mode=options.get('mode', 'all'), dry_run=options.get('dry_run') in ('1', 'on'))
+    except ScheduleRequestError as e:
+        if wants_json:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        flash(str(e), 'error')
+        return render_template('admin/import_shows.html', result=None), 400
+    
+    if result['inserted']:
+        movie_ids = {row['movie_id'] for row in result['accepted'] if row['show_id']}
+        changed('catalog', *(f'movie:{movie_id}' for movie_id in movie_ids))
+    if wants_json:
+        return jsonify(result), 200 if result['success'] else 409
+    return render_template('admin/import_shows.html', result=result)
+
 # API Routes for AJAX calls
 @app.route('/api/movies/search')
 def api_search_movies():
-    """API endpoint for movie search"""
+    """API endpoint for movie search (ranked, typo-tolerant, paginated)"""
     search = request.args.get('q', '')
     genre = request.args.get('genre', '')
     rating = request.args.get('rating', '')
     
-    query = "SELECT * FROM movies WHERE 1=1"
-    params = []
-    
-    if search:
-        query += " AND title LIKE %s"
-        params.append(f"%{search}%")
-    
-    if genre:
-        query += " AND genre = %s"
-        params.append(genre)
-    
-    if rating:
-        query += " AND rating >= %s"
-        params.append(float(rating))
-    
-    query += " ORDER BY release_date DESC"
+    try:
+        min_rating = float(rating) if rating else None
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = int(request.args.get('limit', app.config['MOVIE_SEARCH_PAGE_SIZE']))
+        limit = min(max(limit, 1), app.config['MOVIE_SEARCH_MAX_PAGE_SIZE'])
+    except ValueError:
+        return jsonify({'success': False, 'error': 'rating, offset and limit must be numbers'}), 400
     
     try:
-        movies = execute_query(query, params)
-        return jsonify({'success': True, 'movies': movies})
+        validators = current_app.versions.validators(['catalog'])
+        if validators and validators.matches():
+            return current_app.versions.not_modified(validators)
+        started = time.perf_counter()
+        movies, total = current_app.movie_search.search(search, genre=genre, min_rating=min_rating,
+                                                        offset=offset, limit=limit)
+        took_ms = (time.perf_counter() - started) * 1000
+        response = jsonify({'success': True, 'movies': movies, 'total': total,
+                            'offset': offset, 'limit': limit, 'took_ms': round(took_ms, 3)})
+        return validators.apply(response) if validators else response
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/admin/reports/bookings')
+@admin_required
+def api_booking_report():
+    """DataTables server-side endpoint for the booking report"""
+    try:
+        return jsonify(booking_report_page(request.args))
+    except ReportRequestError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Error loading report: {str(e)}'}), 500
+
 @app.route('/api/shows/<int:show_id>/seats')
 def api_show_seats(show_id):
-    """API endpoint to get booked seats for a show"""
+    """API endpoint to get booked and held seats for a show"""
     try:
-        booked_seats_query = """
-        SELECT bd.seat_number
-        FROM booking_details bd
-        JOIN bookings b ON bd.booking_id = b.booking_id
-        WHERE b.show_id = %s AND b.status = 'confirmed'
-        """
-        booked_seats = execute_query(booked_seats_query, (show_id,))
-        seat_numbers = [seat['seat_number'] for seat in booked_seats]
+        # Hold changes bump holds:<id> (see utils/seat_holds.py), so a 304 runs no SQL
+        validators = current_app.versions.validators([f'show:{show_id}', f'holds:{show_id}'],
+                                                     vary=(session.get('hold_token'),))
+        if validators and validators.matches():
+            return current_app.versions.not_modified(validators)
+        held = current_app.seat_holds.held_seats(show_id, exclude_token=session.get('hold_token'))
+        seat_numbers = current_app.seat_index.booked_seats(show_id)
         
-        return jsonify({'success': True, 'booked_seats': seat_numbers})
+        response = jsonify({'success': True, 'booked_seats': seat_numbers, 'held_seats': held,
+                            'unavailable_seats': sorted(set(seat_numbers) | set(held))})
+        return validators.apply(response) if validators else response
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/my_bookings')
+def api_my_bookings():
+    """API endpoint for the signed-in customer's booking history"""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'error': 'Please log in.'}), 401
+    try:
+        bookings = execute_query(USER_BOOKINGS_QUERY, (session['user_id'],))
+        return jsonify({'success': True, 'bookings': bookings})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/shows/<int:show_id>/seats/stream')
+def api_show_seats_stream(show_id):
+    """Server-Sent Events stream of the show's seat map: a snapshot, then diffs"""
+    if current_app.seat_index.get(show_id) is None:
+        return jsonify({'success': False, 'error': 'Invalid show.'}), 404
+    try:
+        events = current_app.seat_feeds.stream(show_id)
+    except FeedFullError as e:
+        # The page falls back to polling /api/shows/<id>/seats
+        return jsonify({'success': False, 'error': str(e)}), 503, {'Retry-After': '30'}
+    
+    return Response(events, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
+@app.route('/api/shows/<int:show_id>/hold', methods=['POST', 'DELETE'])
+@login_required
+def api_hold_seats(show_id):
+    """Hold the posted seats for this session's checkout (replaces any earlier hold)"""
+    holds = current_app.seat_holds
+    token = session.get('hold_token')
+    if request.method == 'DELETE' or not (request.get_json(silent=True) or {}).get('seats'):
+        if token:
+            holds.release(show_id, token)
+            current_app.seat_feeds.notify(show_id)
+        return jsonify({'success': True, 'held': [], 'conflicts': []})
+    
+    seats = normalize_seats((request.get_json(silent=True) or {}).get('seats', []))
+    if len(seats) > MAX_SEATS_PER_BOOKING:
+        return jsonify({'success': False, 'error': f'You can hold at most {MAX_SEATS_PER_BOOKING} seats.'}), 400
+    
+    try:
+        seat_map = current_app.seat_index.get(show_id)
+        if seat_map is None:
+            return jsonify({'success': False, 'error': 'Invalid show.'}), 404
+        invalid = [seat for seat in seats if not is_valid_seat(seat, seat_map.total_seats)]
+        if invalid:
+            return jsonify({'success': False, 'error': f'Invalid seat selection: {", ".join(invalid)}'}), 400
+        
+        if not token:
+            token = session['hold_token'] = secrets.token_hex(16)
+        sold = current_app.seat_index.unavailable(show_id, seats)
+        held, conflicts = holds.hold(show_id, token, session['user_id'], seats, sold=sold)
+        current_app.seat_feeds.notify(show_id)
+        return jsonify({'success': True, 'held': held, 'conflicts': conflicts,
+                        'expires_in': holds.ttl if held else 0})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
@@ -694,6 +915,22 @@ def service_worker():
     """Serve empty service worker to prevent 404 errors"""
     return '', 204
 
+@app.route('/metrics')
+def metrics():
+    """Request and database metrics for this worker process, in Prometheus text format"""
+    # Statement labels reveal the schema: admins, or a scraper holding METRICS_TOKEN, only
+    token = current_app.config.get('METRICS_TOKEN')
+    scraper = bool(token) and secrets.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+    if not scraper and session.get('role') != 'admin':
+        return Response('Forbidden\n', status=403, mimetype='text/plain', headers={'WWW-Authenticate': 'Bearer'})
+    return Response(current_app.metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/debug/metrics')
+@admin_required
+def debug_metrics():
+    """Slowest statements and N+1 suspects for this worker process"""
+    return jsonify(current_app.metrics.stats())
+
 @app.route('/debug/session')
 def debug_session():
     """Debug session data (remove in production)"""
@@ -715,6 +952,103 @@ def test_db():
     except Exception as e:
         return f"Database error: {str(e)}"
 
+@app.route('/debug/db_pool')
+@admin_required
+def debug_db_pool():
+    """Connection pool statistics for this worker process"""
+    return jsonify(get_pool_stats())
+
+@app.route('/debug/db_replicas')
+@admin_required
+def debug_db_replicas():
+    """Replica health, lag and read routing counters for this worker process"""
+    return jsonify(current_app.db_replicas.stats())
+
+@app.route('/debug/seat_index', methods=['GET', 'POST'])
+@admin_required
+@same_origin
+def debug_seat_index():
+    """Seat index statistics; POST reloads every cached show from the database"""
+    if request.method == 'POST':
+        current_app.seat_index.rebuild()
+    return jsonify(current_app.seat_index.stats())
+
+@app.route('/debug/movie_search', methods=['GET', 'POST'])
+@admin_required
+@same_origin
+def debug_movie_search():
+    """Search index statistics; POST rebuilds it from the movies table"""
+    if request.method == 'POST':
+        current_app.movie_search.rebuild()
+    return jsonify(current_app.movie_search.stats())
+
+@app.route('/debug/seat_holds')
+@admin_required
+def debug_seat_holds():
+    """Seat hold conversion and contention counters for this worker process"""
+    return jsonify(current_app.seat_holds.stats())
+
+@app.route('/debug/seat_feeds')
+@admin_required
+def debug_seat_feeds():
+    """Open seat map streams and feed counters for this worker process"""
+    return jsonify(current_app.seat_feeds.stats())
+
+@app.route('/debug/sessions')
+@admin_required
+def debug_sessions():
+    """Session backend counters for this worker process"""
+    stats = getattr(current_app.session_interface, 'stats', None)
+    return jsonify(stats() if stats else {'backend': current_app.config.get('SESSION_BACKEND')})
+
+@app.route('/debug/passwords')
+@admin_required
+def debug_passwords():
+    """Password hashing pool counters for this worker process"""
+    return jsonify(current_app.passwords.stats())
+
+@app.route('/debug/audit_log', methods=['GET', 'POST'])
+@admin_required
+@same_origin
+def debug_audit_log():
+    """Audit writer counters; POST waits for queued events to be written"""
+    if request.method == 'POST':
+        current_app.audit_log.flush()
+    return jsonify(current_app.audit_log.stats())
+
+@app.route('/debug/versions')
+@admin_required
+def debug_versions():
+    """Version counter sync and conditional GET counters"""
+    return jsonify(current_app.versions.stats())
+
+@app.route('/debug/assets', methods=['GET', 'POST'])
+@admin_required
+@same_origin
+def debug_assets():
+    """Asset manifest and serving counters; POST rebuilds the bundles"""
+    if request.method == 'POST':
+        current_app.assets.build()
+    return jsonify(current_app.assets.stats())
+
+@app.route('/debug/compression')
+@admin_required
+def debug_compression():
+    """Response compression counters for this worker process"""
+    return jsonify(current_app.compressor.stats())
+
+@app.route('/debug/page_cache')
+@admin_required
+def debug_page_cache():
+    """Page cache hit/miss counters for this worker process"""
+    return jsonify(current_app.page_cache.stats())
+
+@app.route('/debug/fragment_cache')
+@admin_required
+def debug_fragment_cache():
+    """Cached template fragment hit/miss counters for this worker process"""
+    return jsonify(current_app.fragment_cache.stats())
+
 @app.route('/debug/test_cancel_api/<int:booking_id>')
 @login_required
 def test_cancel_api(booking_id):
@@ -739,18 +1073,7 @@ def create_test_booking():
         show_id = show[0]['show_id']
         
         # Create test booking
-        booking_id = execute_query(
-            "INSERT INTO bookings (user_id, show_id, total_amount, status) VALUES (%s, %s, %s, 'confirmed')",
-            (session['user_id'], show_id, 500.00),
-            fetch=False
-        )
-        
-        # Add seat details
-        execute_query(
-            "INSERT INTO booking_details (booking_id, seat_number) VALUES (%s, %s)",
-            (booking_id, 'A1'),
-            fetch=False
-        )
+        create_booking(session['user_id'], show_id, ['A1'], 'online')
         
         flash('Test booking created successfully!', 'success')
         return redirect(url_for('my_bookings'))
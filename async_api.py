@@ -0,0 +1,300 @@
+"""
+BookYourShow async API tier
+
+Serves the read APIs that fan out hardest at on-sale peaks from an event
+loop instead of sync workers:
+
+    GET /api/shows/<show_id>/seats   booked and held seats (the seat map's poll)
+    GET /api/movies/search           ranked, typo-tolerant movie search
+    GET /api/my_bookings             the signed-in customer's bookings
+
+In app.py each of these holds a worker thread while it waits on MySQL. Here
+a waiting request is only a suspended coroutine, so one process keeps
+thousands in flight against a pool of ASYNC_DB_POOL_MAX_SIZE connections
+(see utils/async_db.py). Concurrent seat map reads of the same show share
+one query. Responses are the same JSON as app.py's handlers, encoded the
+same way.
+
+Seat maps and search results carry ETags built from the ``entity_versions``
+counters that app.py bumps (utils/versions.py). The tier pulls the counters
+every VERSION_SYNC_INTERVAL seconds, so a matching If-None-Match gets a 304
+without a query. The search index is reloaded when the ``catalog`` counter
+moves.
+
+The tier shares config.Config with app.py. It reads the session cookie
+through the same session interface (never writing it), so a customer
+signed in on app.py is signed in here. Run it next to the Flask app and
+send these paths to it from the reverse proxy:
+
+    uvicorn async_api:app --host 0.0.0.0 --port 5001 --workers 4
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import json
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import date
+from decimal import Decimal
+from functools import wraps
+
+from flask import Flask
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from werkzeug.http import http_date, parse_etags
+
+from config import Config
+from utils.async_db import AsyncDatabase, PoolBusyError
+from utils.booking_engine import USER_BOOKINGS_QUERY
+from utils.movie_search import MovieSearchIndex
+from utils.seat_layout import index_to_seat, seat_to_index
+from utils.sessions import CompactCookieSessionInterface, init_session
+from utils.versions import SYNC_OVERLAP
+
+logger = logging.getLogger(__name__)
+
+SHOW_SEATS_QUERY = """
+    SELECT sc.total_seats, ss.seat_number
+    FROM shows s
+    JOIN screens sc ON s.screen_id = sc.screen_id
+    LEFT JOIN show_seats ss ON ss.show_id = s.show_id
+    WHERE s.show_id = %s
+"""
+SEAT_HOLDS_QUERY = "SELECT seat_number, hold_token FROM seat_holds WHERE show_id = %s AND expires_at > NOW(3)"
+VERSIONS_QUERY = "SELECT entity, version, UNIX_TIMESTAMP(updated_at) AS modified FROM entity_versions"
+
+# Config and sessions exactly as app.py has them; this Flask app never serves a request
+flask_app = Flask(__name__)
+flask_app.config.from_object(Config)
+init_session(flask_app)
+config = flask_app.config
+
+db = AsyncDatabase.from_config(config)
+movie_search = MovieSearchIndex(max_age=None)  # reloaded by _sync_versions when the catalog changes
+_versions = {}  # entity -> version, as of the last pull from entity_versions
+_sync = {'synced_to': None, 'search_version': 0, 'search_loaded_at': 0.0}
+_stats = {'requests': 0, 'in_flight': 0, 'peak_in_flight': 0, 'busy': 0, 'not_modified': 0}
+
+
+def _json_default(value):
+    """The conversions Flask's default JSON provider makes"""
+    if isinstance(value, date):
+        return http_date(value)
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class FlaskJSONResponse(JSONResponse):
+    """JSON byte-for-byte as app.py's ``jsonify`` writes it"""
+
+    def render(self, content):
+        return (json.dumps(content, default=_json_default, sort_keys=True, separators=(',', ':')) + '\n').encode()
+
+
+async def read_session(request):
+    """The Flask session for this request's cookie (read-only)"""
+    interface = flask_app.session_interface
+    if isinstance(interface, CompactCookieSessionInterface):
+        session = interface.open_session(flask_app, request)  # a signature check, no I/O
+    else:
+        session = await run_in_threadpool(interface.open_session, flask_app, request)
+    return session or {}
+
+
+def etag(versions, vary=()):
+    """Weak ETag for a response built from ``versions`` ((entity, version) pairs)"""
+    key = list(versions) + [('vary', tuple(vary)), ('build', config.get('BUILD_ID'))]
+    return hashlib.blake2b(repr(key).encode(), digest_size=10).hexdigest()
+
+
+def validator_headers(tag, private):
+    return {'ETag': f'W/"{tag}"', 'Cache-Control': 'private, no-cache' if private else 'no-cache'}
+
+
+def not_modified(request, tag, private):
+    """A 304 if the request already holds ``tag``, else None"""
+    if not parse_etags(request.headers.get('if-none-match')).contains_weak(tag):
+        return None
+    _stats['not_modified'] += 1
+    return Response(status_code=304, headers=validator_headers(tag, private))
+
+
+def tracked(handler):
+    """Count requests in flight, and answer 503 when no database connection frees up in time"""
+    @wraps(handler)
+    async def wrapper(request):
+        _stats['requests'] += 1
+        _stats['in_flight'] += 1
+        _stats['peak_in_flight'] = max(_stats['peak_in_flight'], _stats['in_flight'])
+        try:
+            return await handler(request)
+        except PoolBusyError as e:
+            _stats['busy'] += 1
+            return FlaskJSONResponse({'success': False, 'error': str(e)}, status_code=503,
+                                     headers={'Retry-After': '1'})
+        finally:
+            _stats['in_flight'] -= 1
+    return wrapper
+
+
+@tracked
+async def api_show_seats(request):
+    """Booked and held seats for a show (app.api_show_seats)"""
+    show_id = request.path_params['show_id']
+    try:
+        session = await read_session(request)
+        # Hold changes bump holds:<id> (see utils/seat_holds.py), so a 304 runs no SQL
+        tag = etag([(entity, _versions.get(entity, 0)) for entity in (f'show:{show_id}', f'holds:{show_id}')],
+                   vary=(session.get('hold_token'),))
+        cached = not_modified(request, tag, private=True)
+        if cached is not None:
+            return cached
+        seat_rows, hold_rows = await asyncio.gather(
+            db.coalesced(('seats', show_id), SHOW_SEATS_QUERY, (show_id,)),
+            db.coalesced(('holds', show_id), SEAT_HOLDS_QUERY, (show_id,)),
+        )
+        total_seats = (seat_rows[0]['total_seats'] or 0) if seat_rows else 0
+        indexes = {seat_to_index(row['seat_number']) for row in seat_rows if row['seat_number']}
+        seat_numbers = [index_to_seat(i) for i in sorted(i for i in indexes if i is not None and i < total_seats)]
+        held = sorted(row['seat_number'] for row in hold_rows if row['hold_token'] != session.get('hold_token'))
+
+        return FlaskJSONResponse({'success': True, 'booked_seats': seat_numbers, 'held_seats': held,
+                                  'unavailable_seats': sorted(set(seat_numbers) | set(held))},
+                                 headers=validator_headers(tag, private=True))
+    except PoolBusyError:
+        raise
+    except Exception as e:
+        return FlaskJSONResponse({'success': False, 'error': str(e)})
+
+
+@tracked
+async def api_search_movies(request):
+    """Movie search (app.api_search_movies)"""
+    args = request.query_params
+    search = args.get('q', '')
+    genre = args.get('genre', '')
+    rating = args.get('rating', '')
+
+    try:
+        min_rating = float(rating) if rating else None
+        offset = max(int(args.get('offset', 0)), 0)
+        limit = int(args.get('limit', config['MOVIE_SEARCH_PAGE_SIZE']))
+        limit = min(max(limit, 1), config['MOVIE_SEARCH_MAX_PAGE_SIZE'])
+    except ValueError:
+        return FlaskJSONResponse({'success': False, 'error': 'rating, offset and limit must be numbers'},
+                                 status_code=400)
+
+    try:
+        # The version the index was loaded at, not the newest one pulled
+        tag = etag([('catalog', _sync['search_version'])])
+        cached = not_modified(request, tag, private=False)
+        if cached is not None:
+            return cached
+        started = time.perf_counter()
+        movies, total = movie_search.search(search, genre=genre, min_rating=min_rating, offset=offset, limit=limit)
+        took_ms = (time.perf_counter() - started) * 1000
+        return FlaskJSONResponse({'success': True, 'movies': movies, 'total': total,
+                                  'offset': offset, 'limit': limit, 'took_ms': round(took_ms, 3)},
+                                 headers=validator_headers(tag, private=False))
+    except Exception as e:
+        return FlaskJSONResponse({'success': False, 'error': str(e)})
+
+
+@tracked
+async def api_my_bookings(request):
+    """The signed-in customer's booking history (app.api_my_bookings)"""
+    session = await read_session(request)
+    if 'user_id' not in session:
+        return FlaskJSONResponse({'success': False, 'error': 'Please log in.'}, status_code=401)
+    try:
+        bookings = await db.fetch_all(USER_BOOKINGS_QUERY, (session['user_id'],))
+        return FlaskJSONResponse({'success': True, 'bookings': bookings})
+    except PoolBusyError:
+        raise
+    except Exception as e:
+        return FlaskJSONResponse({'success': False, 'error': str(e)})
+
+
+async def debug_async_api(request):
+    """Request, pool and search counters for this process (admins only, as in app.py)"""
+    session = await read_session(request)
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return FlaskJSONResponse({'success': False, 'error': 'Admin access required.'}, status_code=403)
+    return FlaskJSONResponse(dict(_stats, db=db.stats(), movie_search=movie_search.stats()))
+
+
+async def _pull_versions():
+    """Copy the entity_versions rows changed since the last pull into ``_versions``"""
+    synced_to = _sync['synced_to']
+    if synced_to is None:
+        rows = await db.fetch_all(VERSIONS_QUERY)
+    else:
+        rows = await db.fetch_all(VERSIONS_QUERY + " WHERE updated_at >= FROM_UNIXTIME(%s)",
+                                  (synced_to - SYNC_OVERLAP,))
+    for row in rows:
+        _versions[row['entity']] = max(row['version'], _versions.get(row['entity'], 0))
+    _sync['synced_to'] = max([float(row['modified']) for row in rows] + [synced_to or 0.0]) or time.time()
+
+
+async def _load_movies():
+    # The version is read first: a change landing in between is reloaded on the next pull
+    version = _versions.get('catalog', 0)
+    movie_search.load(await db.fetch_all("SELECT * FROM movies"))
+    _sync['search_version'] = version
+    _sync['search_loaded_at'] = time.monotonic()
+
+
+async def _sync_versions():
+    """Pull version bumps every VERSION_SYNC_INTERVAL seconds; reload the search index when the catalog moves.
+
+    The index is also reloaded every MOVIE_SEARCH_MAX_AGE seconds, as app.py's
+    is, in case a change was made without a bump.
+    """
+    while True:
+        await asyncio.sleep(config['VERSION_SYNC_INTERVAL'])
+        try:
+            await _pull_versions()
+            if (_versions.get('catalog', 0) != _sync['search_version']
+                    or time.monotonic() - _sync['search_loaded_at'] >= config['MOVIE_SEARCH_MAX_AGE']):
+                await _load_movies()
+        except Exception as e:
+            logger.warning('Version sync failed, keeping the current versions and index: %s', e)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await db.open()
+    await _pull_versions()
+    await _load_movies()
+    refresher = asyncio.create_task(_sync_versions())
+    try:
+        yield
+    finally:
+        refresher.cancel()
+        await db.close()
+
+
+app = Starlette(
+    routes=[
+        Route('/api/shows/{show_id:int}/seats', api_show_seats),
+        Route('/api/movies/search', api_search_movies),
+        Route('/api/my_bookings', api_my_bookings),
+        Route('/debug/async_api', debug_async_api),
+    ],
+    # Same threshold and level as app.py's utils/compression.py
+    middleware=[Middleware(GZipMiddleware, minimum_size=config['COMPRESS_MIN_SIZE'],
+                           compresslevel=config['COMPRESS_LEVEL'])],
+    lifespan=lifespan,
+)
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+BookYourShow Async API Concurrency Benchmark
+Runs the read APIs served by both tiers side by side: the Flask app under
+the production server (run.py) and the async tier (async_api.py under
+uvicorn), each with the same number of worker processes. Keep-alive
+connections then poll them at rising concurrency with the on-sale mix:
+seat maps of a few hot shows, movie searches and my_bookings. Reports
+throughput, p50/p99 latency and failures (errors, 5xx and timeouts) for each
+tier at each level.
+
+It first checks that both tiers return the same JSON for the same requests.
+Sign-in uses the Flask app; the async tier reads that session cookie.
+
+Each client connection is a coroutine, spread over --client-processes
+processes. Thousands of connections need a high open-file limit
+(ulimit -n); the client raises its soft limit as far as the hard limit allows.
+
+Usage: python benchmarks/async_api_concurrency.py [--concurrency 100 500 2000] [--seconds 10]
+                                                  [--workers 2] [--threads 8] [--client-processes 2]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+from http.client import HTTPConnection
+from urllib.parse import urlencode
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from utils.db_helper import execute_query
+from benchmarks.load_test import percentile
+from benchmarks.server_throughput import ROOT, start_server, stop_server, wait_until_up
+
+HOST = '127.0.0.1'
+REQUEST_TIMEOUT = 30  # seconds before a request counts as failed
+
+# Endpoint -> share of the mix
+MIX = {'seats': 70, 'search': 20, 'my_bookings': 10}
+
+def start_async_tier(port, workers):
+    command = [sys.executable, '-m', 'uvicorn', 'async_api:app', '--host', HOST, '--port', str(port),
+               '--workers', str(workers), '--backlog', '4096', '--no-access-log', '--log-level', 'warning']
+    return subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def sign_in(port, email, password):
+    """The session cookie ("name=value") for a customer, from the Flask app"""
+    conn = HTTPConnection(HOST, port, timeout=30)
+    conn.request('POST', '/login', urlencode({'email': email, 'password': password}),
+                 {'Content-Type': 'application/x-www-form-urlencoded'})
+    response = conn.getresponse()
+    response.read()
+    prefix = app.config['SESSION_COOKIE_NAME'] + '='
+    for header, value in response.getheaders():
+        if header.lower() == 'set-cookie' and value.startswith(prefix):
+            return value.split(';', 1)[0]
+    raise RuntimeError(f'{email} could not sign in (status {response.status})')
+
+def request_path(rng, shows, words):
+    endpoint = rng.choices(list(MIX), weights=list(MIX.values()))[0]
+    if endpoint == 'seats':
+        return f'/api/shows/{rng.choice(shows)}/seats'
+    if endpoint == 'search':
+        return '/api/movies/search?' + urlencode({'q': rng.choice(words)[:rng.randint(3, 8)]})
+    return '/api/my_bookings'
+
+def get_json(port, path, cookie):
+    conn = HTTPConnection(HOST, port, timeout=30)
+    conn.request('GET', path, headers={'Cookie': cookie})
+    response = conn.getresponse()
+    body = json.loads(response.read())
+    body.pop('took_ms', None)  # timing, not contract
+    return response.status, body
+
+async def _fetch(reader, writer, path, cookie):
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: {HOST}\r\nCookie: {cookie}\r\n\r\n'.encode())
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed')
+    status = int(status_line.split()[1])
+    length, close = 0, False
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name = name.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'connection' and value.strip().lower() == 'close':
+            close = True
+    await reader.readexactly(length)
+    return status, close
+
+async def _client(port, next_path, cookie, deadline, latencies, failures):
+    conn = None
+    while time.monotonic() < deadline:
+        path = next_path()
+        started = time.perf_counter()
+        try:
+            if conn is None:
+                conn = await asyncio.wait_for(asyncio.open_connection(HOST, port), REQUEST_TIMEOUT)
+            status, close = await asyncio.wait_for(_fetch(*conn, path, cookie), REQUEST_TIMEOUT)
+            ok = status == 200
+        except (OSError, ValueError, IndexError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            ok, close = False, True
+        if close and conn is not None:
+            conn[1].close()
+            conn = None
+        if ok:
+            latencies.append(time.perf_counter() - started)
+        else:
+            failures.append(path)
+            await asyncio.sleep(0.05)  # don't spin on a refused connection
+    if conn is not None:
+        conn[1].close()
+
+def drive(port, connections, seconds, cookie, shows, words, seed):
+    """Run ``connections`` keep-alive clients for ``seconds``; returns (latencies, failures)"""
+    try:
+        import resource
+        _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+    rng = random.Random(seed)
+    latencies, failures = [], []
+    deadline = time.monotonic() + seconds
+
+    async def main():
+        next_path = lambda: request_path(rng, shows, words)
+        await asyncio.gather(*(_client(port, next_path, cookie, deadline, latencies, failures)
+                               for _ in range(connections)))
+
+    asyncio.run(main())
+    return latencies, len(failures)
+
+def measure(port, concurrency, seconds, cookie, shows, words, processes):
+    shares = [concurrency // processes + (1 if i < concurrency % processes else 0) for i in range(processes)]
+    with multiprocessing.Pool(processes) as pool:
+        parts = pool.starmap(drive, [(port, share, seconds, cookie, shows, words, i)
+                                     for i, share in enumerate(shares) if share])
+    latencies = [sample for part, _ in parts for sample in part]
+    return {
+        'rps': len(latencies) / seconds,
+        'p50_ms': percentile(latencies, 0.50),
+        'p99_ms': percentile(latencies, 0.99),
+        'failures': sum(failed for _, failed in parts),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[100, 500, 2000],
+                        help='open connections per run')
+    parser.add_argument('--seconds', type=float, default=10, help='measured duration per run')
+    parser.add_argument('--workers', type=int, default=2, help='worker processes for each tier')
+    parser.add_argument('--threads', type=int, default=app.config['SERVER_THREADS'], help='threads per Flask worker')
+    parser.add_argument('--client-processes', type=int, default=2)
+    parser.add_argument('--flask-port', type=int, default=5100)
+    parser.add_argument('--async-port', type=int, default=5101)
+    parser.add_argument('--email', default='rajesh.k@email.com')
+    parser.add_argument('--password', default='pass123')
+    args = parser.parse_args()
+
+    print("BookYourShow Async API Concurrency Benchmark")
+    print("=" * 50)
+    with app.app_context():
+        # A handful of hot shows, as at an on-sale
+        shows = [row['show_id'] for row in execute_query(
+            "SELECT show_id FROM shows WHERE show_time > NOW() ORDER BY show_time LIMIT 10")]
+        words = [row['title'].split()[0] for row in execute_query("SELECT title FROM movies") if row['title']]
+    if not shows or not words:
+        print("✗ Need movies and upcoming shows; run benchmarks/generate_data.py first")
+        sys.exit(1)
+
+    tiers = {
+        'flask': (args.flask_port, start_server('production', args.flask_port, args.workers, args.threads)),
+        'async': (args.async_port, start_async_tier(args.async_port, args.workers)),
+    }
+    ok = True
+    try:
+        for name, (port, process) in tiers.items():
+            if not wait_until_up(process, f'http://{HOST}:{port}', '/api/movies/search'):
+                print(f"✗ The {name} tier did not start (exit code {process.poll()})")
+                sys.exit(1)
+        cookie = sign_in(args.flask_port, args.email, args.password)
+
+        # Same requests, same answers
+        samples = [f'/api/shows/{shows[0]}/seats', '/api/my_bookings', '/api/movies/search?q=' + words[0][:4],
+                   '/api/movies/search?limit=abc']
+        for path in samples:
+            same = get_json(args.flask_port, path, cookie) == get_json(args.async_port, path, cookie)
+            ok = ok and same
+            print(f"{'✓' if same else '✗'} {path}: {'same response' if same else 'responses differ'}")
+        print()
+
+        print(f"{'Tier':<8}{'Connections':>12}{'Req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'Failed':>8}")
+        print("-" * 58)
+        for concurrency in args.concurrency:
+            for name, (port, _) in tiers.items():
+                row = measure(port, concurrency, args.seconds, cookie, shows, words, args.client_processes)
+                print(f"{name:<8}{concurrency:>12}{row['rps']:>10.1f}{row['p50_ms']:>10.1f}"
+                      f"{row['p99_ms']:>10.1f}{row['failures']:>8}")
+                if name == 'async' and row['failures']:
+                    ok = False
+    finally:
+        for _, process in tiers.values():
+            stop_server(process)
+
+    print("✓ Async tier answered every request" if ok else "✗ Async tier failed requests or differs from app.py")
+    print("=" * 50)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
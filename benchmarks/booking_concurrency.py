@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+BookYourShow Booking Concurrency Benchmark
+Fires many concurrent booking attempts at a single show and verifies that
+no seat is ever sold twice.
+
+Usage: python benchmarks/booking_concurrency.py [--clients 200] [--seats 2] [--keep]
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from utils.db_helper import execute_query
+from utils.db_pool import ConnectionPool
+from utils.booking_engine import create_booking, SeatUnavailableError
+from utils.seat_layout import index_to_seat
+from utils.revenue import rebuild_revenue
+
+def create_benchmark_show():
+    """Schedule a throwaway show far in the future on the first screen"""
+    movie = execute_query("SELECT movie_id FROM movies ORDER BY movie_id LIMIT 1")
+    screen = execute_query("SELECT screen_id, total_seats FROM screens ORDER BY screen_id LIMIT 1")
+    if not movie or not screen:
+        raise RuntimeError('Need at least one movie and one screen; load bookyourshow_updated.sql first')
+    show_time = datetime.now() + timedelta(days=365, minutes=random.randint(0, 10000))
+    show_id = execute_query(
+        "INSERT INTO shows (movie_id, screen_id, show_time, price) VALUES (%s, %s, %s, %s)",
+        (movie[0]['movie_id'], screen[0]['screen_id'], show_time, 100.00)
+    )
+    return show_id, screen[0]['total_seats']
+
+def remove_benchmark_show(show_id):
+    """Delete the benchmark show and everything booked against it"""
+    # Let queued NEW_BOOKING events land first so they are deleted too
+    app.audit_log.flush()
+    first_booked = execute_query(
+        "SELECT MIN(booking_date) AS first_booked FROM bookings WHERE show_id = %s", (show_id,)
+    )[0]['first_booked']
+    booking_ids = "SELECT booking_id FROM bookings WHERE show_id = %s"
+    execute_query(f"DELETE FROM payments WHERE booking_id IN ({booking_ids})", (show_id,), fetch=False)
+    execute_query(f"DELETE FROM booking_details WHERE booking_id IN ({booking_ids})", (show_id,), fetch=False)
+    execute_query(f"DELETE FROM activity_log WHERE booking_id IN ({booking_ids})", (show_id,), fetch=False)
+    execute_query("DELETE FROM show_seats WHERE show_id = %s", (show_id,), fetch=False)
+    execute_query("DELETE FROM seat_holds WHERE show_id = %s", (show_id,), fetch=False)
+    execute_query("DELETE FROM show_occupancy WHERE show_id = %s", (show_id,), fetch=False)
+    execute_query("DELETE FROM bookings WHERE show_id = %s", (show_id,), fetch=False)
+    execute_query("DELETE FROM shows WHERE show_id = %s", (show_id,), fetch=False)
+    if first_booked:
+        # Take the benchmark bookings back out of the revenue rollup
+        rebuild_revenue(first_booked.date())
+
+def count_double_sells(show_id):
+    """Seats that appear in more than one confirmed booking for the show"""
+    return execute_query(
+        """
+        SELECT bd.seat_number, COUNT(*) AS times_sold
+        FROM booking_details bd
+        JOIN bookings b ON bd.booking_id = b.booking_id
+        WHERE b.show_id = %s AND b.status = 'confirmed'
+        GROUP BY bd.seat_number
+        HAVING COUNT(*) > 1
+        """,
+        (show_id,)
+    )
+
+def run(clients, seats_per_booking, keep):
+    user = execute_query("SELECT user_id FROM users ORDER BY user_id LIMIT 1")
+    if not user:
+        raise RuntimeError('Need at least one user')
+    user_id = user[0]['user_id']
+
+    show_id, total_seats = create_benchmark_show()
+    # Crowd everyone onto a small block of seats so contention is high
+    hot_seats = [index_to_seat(i) for i in range(min(total_seats, clients // 2 or 1))]
+    print(f"Show {show_id}: {clients} clients x {seats_per_booking} seats over {len(hot_seats)} hot seats")
+
+    results = {'booked': 0, 'conflicts': 0, 'errors': 0}
+    lock = threading.Lock()
+    start_gate = threading.Barrier(clients)
+
+    def client():
+        seats = random.sample(hot_seats, min(seats_per_booking, len(hot_seats)))
+        with app.app_context():
+            start_gate.wait()
+            try:
+                create_booking(user_id, show_id, seats, 'online')
+                outcome = 'booked'
+            except SeatUnavailableError:
+                outcome = 'conflicts'
+            except Exception as e:
+                print(f"  ✗ {e}")
+                outcome = 'errors'
+        with lock:
+            results[outcome] += 1
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    double_sells = count_double_sells(show_id)
+    sold = execute_query("SELECT COUNT(*) AS count FROM show_seats WHERE show_id = %s", (show_id,))[0]['count']
+
+    print(f"  Elapsed:        {elapsed:.2f}s")
+    print(f"  Attempts/sec:   {clients / elapsed:.1f}")
+    print(f"  Bookings/sec:   {results['booked'] / elapsed:.1f}")
+    print(f"  Booked:         {results['booked']}")
+    print(f"  Seat conflicts: {results['conflicts']}")
+    print(f"  Errors:         {results['errors']}")
+    print(f"  Seats sold:     {sold}")
+    if double_sells:
+        print(f"✗ {len(double_sells)} seats were sold more than once: {double_sells}")
+    else:
+        print("✓ Zero double-sells")
+
+    if not keep:
+        remove_benchmark_show(show_id)
+    return not double_sells and results['errors'] == 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--seats', type=int, default=2, help='seats per booking attempt')
+    parser.add_argument('--pool-size', type=int, default=20)
+    parser.add_argument('--keep', action='store_true', help='keep the benchmark show and its bookings')
+    args = parser.parse_args()
+
+    app.config['DB_POOL_MAX_SIZE'] = args.pool_size
+    app.config['DB_POOL_TIMEOUT'] = 60
+    app.db_pool = ConnectionPool.from_config(app.config)
+
+    print("BookYourShow Booking Concurrency Benchmark")
+    print("=" * 50)
+    with app.app_context():
+        ok = run(args.clients, args.seats, args.keep)
+    print("=" * 50)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+BookYourShow Export Memory Benchmark
+Downloads a report export through the streaming endpoint and records peak
+Python heap use while it runs. With the unbuffered cursor the peak should
+stay roughly the same whether the export holds a thousand rows or a million.
+
+Usage: python benchmarks/export_memory.py [--report bookings] [--format csv] [--gzip]
+                                          [--date-from 2024-01-01] [--date-to 2024-12-31]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from utils.db_helper import execute_query
+from utils.exports import EXPORTS, FORMATS
+
+def run(report, fmt, gzip, date_from, date_to):
+    with app.app_context():
+        admin = execute_query("SELECT user_id, name FROM users WHERE role = 'admin' LIMIT 1")
+    if not admin:
+        print("✗ Need an admin user")
+        return False
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = admin[0]['user_id']
+        sess['name'] = admin[0]['name']
+        sess['role'] = 'admin'
+
+    query = {'format': fmt}
+    if gzip:
+        query['gzip'] = '1'
+    if date_from:
+        query['date_from'] = date_from
+    if date_to:
+        query['date_to'] = date_to
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = client.get(f'/admin/reports/export/{report}', query_string=query, buffered=False)
+    if response.status_code != 200:
+        print(f"✗ Export returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        return False
+
+    size = lines = 0
+    for chunk in response.response:
+        size += len(chunk)
+        lines += chunk.count(b'\n')
+    response.close()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Report:      {report} ({fmt}{', gzip' if gzip else ''})")
+    if not gzip:
+        print(f"Lines:       {lines}")
+    print(f"Bytes:       {size / 1024 / 1024:.1f} MiB")
+    print(f"Time:        {elapsed:.2f}s ({size / 1024 / 1024 / elapsed if elapsed else 0:.1f} MiB/s)")
+    print(f"Peak heap:   {peak / 1024 / 1024:.1f} MiB")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--report', choices=sorted(EXPORTS), default='bookings')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+    parser.add_argument('--gzip', action='store_true')
+    parser.add_argument('--date-from')
+    parser.add_argument('--date-to')
+    args = parser.parse_args()
+
+    print("BookYourShow Export Memory Benchmark")
+    print("=" * 50)
+    ok = run(args.report, args.format, args.gzip, args.date_from, args.date_to)
+    print("=" * 50)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
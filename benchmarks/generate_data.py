@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+BookYourShow Synthetic Data Generator
+Fills the database configured in config.py with a realistic, production-sized
+dataset for the load test (benchmarks/load_test.py) and the query plan test:
+theaters with several screens each, a movie catalog, a schedule of shows
+around today, customers, and bookings with their seats, payments and a share
+of cancellations.
+
+Rows are written with multi-row inserts in batches of --batch. They go through
+the same triggers as the app's own writes, so show_occupancy, show_seats and
+revenue_daily stay consistent. Generated rows are tagged (theaters and movies
+named "LoadGen ...", users loadgen-N@bys.test), and --purge removes them all again.
+
+Usage: python benchmarks/generate_data.py [--theaters 50] [--screens 4] [--movies 200]
+                                          [--days 60] [--shows-per-day 4] [--users 20000]
+                                          [--bookings 1000000] [--cancel-rate 0.08]
+                                          [--batch 5000] [--seed 42]
+       python benchmarks/generate_data.py --purge
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from utils.db_helper import execute_query, execute_transaction
+from utils.seat_layout import SEATS_PER_ROW, index_to_seat
+from utils.revenue import rebuild_revenue
+
+TAG = 'LoadGen'
+USER_EMAIL = 'loadgen-{}@bys.test'
+USER_PASSWORD = 'loadgen-pass'
+
+GENRES = ['Action', 'Drama', 'Comedy', 'Sci-Fi', 'Thriller', 'Horror', 'Romance', 'Animation', 'Crime', 'Fantasy']
+TITLE_WORDS = ['Midnight', 'Harbor', 'Silent', 'Empire', 'Last', 'Garden', 'Storm', 'Echo', 'Crimson', 'River',
+               'Forgotten', 'Signal', 'Glass', 'Horizon', 'Iron', 'Shadow', 'Paper', 'Kingdom', 'Velvet', 'Summer']
+CITIES = ['Mumbai', 'Delhi', 'Bengaluru', 'Hyderabad', 'Chennai', 'Pune', 'Kolkata', 'Ahmedabad', 'Jaipur', 'Kochi']
+SHOW_SLOTS = [(10, 0), (13, 30), (16, 45), (19, 30), (22, 15), (11, 15), (14, 45), (18, 0)]
+
+def insert_rows(cursor, table, columns, rows):
+    """Multi-row insert; returns the ids given to ``rows`` in order"""
+    cursor.executemany(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})",
+        rows
+    )
+    # One multi-row INSERT gets consecutive ids (checked in check_auto_increment)
+    return list(range(cursor.lastrowid, cursor.lastrowid + len(rows)))
+
+def check_auto_increment():
+    step = execute_query("SELECT @@auto_increment_increment AS step")[0]['step']
+    if int(step) != 1:
+        raise RuntimeError(f'auto_increment_increment is {step}; the generator needs 1')
+
+def batched(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+class Progress:
+    def __init__(self, label, total):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.started = time.perf_counter()
+
+    def add(self, count):
+        self.done += count
+        elapsed = time.perf_counter() - self.started
+        print(f"\r  {self.label:<10} {self.done:>10,} / {self.total:,}  ({self.done / elapsed:,.0f} rows/s)",
+              end='', flush=True)
+
+    def finish(self):
+        print()
+
+def generate_catalog(rng, theaters, screens_per_theater, movies):
+    """Theaters, screens and movies; returns [(screen_id, total_seats)] and movie ids"""
+    def load(cursor):
+        theater_ids = insert_rows(cursor, 'theaters', ['name', 'location'], [
+            (f'{TAG} Cinema {i + 1}', f'{rng.choice(CITIES)}, Block {rng.randint(1, 40)}')
+            for i in range(theaters)
+        ])
+        screen_rows = []
+        for theater_id in theater_ids:
+            for number in range(screens_per_theater):
+                # Whole rows only, so every seat label exists on the seat map
+                seats = rng.randint(8, 26) * SEATS_PER_ROW
+                screen_rows.append((theater_id, f'Screen {number + 1}', seats))
+        screen_ids = insert_rows(cursor, 'screens', ['theater_id', 'screen_name', 'total_seats'], screen_rows)
+        movie_ids = insert_rows(cursor, 'movies', ['title', 'genre', 'duration', 'rating', 'release_date'], [
+            (f"{TAG}: {' '.join(rng.sample(TITLE_WORDS, rng.randint(1, 3)))} {i + 1}",
+             rng.choice(GENRES), rng.randint(85, 180), round(rng.uniform(4.0, 9.5), 1),
+             (datetime.now() - timedelta(days=rng.randint(0, 3650))).date())
+            for i in range(movies)
+        ])
+        return list(zip(screen_ids, (row[2] for row in screen_rows))), movie_ids
+
+    return execute_transaction(load)
+
+def generate_shows(rng, screens, movie_ids, days, shows_per_day, batch):
+    """A schedule from ``days`` * 3/4 ago to ``days`` / 4 ahead; returns [(show_id, show_time, price, capacity)]"""
+    first_day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days * 3 // 4)
+    slots = SHOW_SLOTS[:shows_per_day]
+    rows = []
+    for screen_id, capacity in screens:
+        for day in range(days):
+            for hour, minute in slots:
+                show_time = first_day + timedelta(days=day, hours=hour, minutes=minute)
+                rows.append((rng.choice(movie_ids), screen_id, show_time, rng.choice([150, 200, 250, 300, 350])))
+    capacities = dict(screens)
+
+    shows = []
+    progress = Progress('shows', len(rows))
+    for chunk in batched(rows, batch):
+        ids = execute_transaction(lambda cursor: insert_rows(
+            cursor, 'shows', ['movie_id', 'screen_id', 'show_time', 'price'], chunk))
+        shows.extend((show_id, row[2], row[3], capacities[row[1]]) for show_id, row in zip(ids, chunk))
+        progress.add(len(chunk))
+    progress.finish()
+    return shows
+
+def generate_users(count, batch):
+    hashed = app.passwords.hash(USER_PASSWORD)
+    progress = Progress('users', count)
+    user_ids = []
+    for chunk in batched(range(count), batch):
+        rows = [(f'{TAG} Customer {i + 1}', USER_EMAIL.format(i + 1), hashed, 'customer') for i in chunk]
+        user_ids.extend(execute_transaction(lambda cursor: insert_rows(
+            cursor, 'users', ['name', 'email', 'password', 'role'], rows)))
+        progress.add(len(rows))
+    progress.finish()
+    return user_ids
+
+def generate_bookings(rng, shows, user_ids, count, cancel_rate, batch):
+    """Bookings of 1-6 seats on random shows, never selling a seat twice; returns how many were made"""
+    open_shows = [[show_id, show_time, price, capacity, 0] for show_id, show_time, price, capacity in shows]
+    now = datetime.now()
+    progress = Progress('bookings', count)
+    remaining = count
+    while remaining and open_shows:
+        planned = []
+        while len(planned) < min(batch, remaining) and open_shows:
+            pick = rng.randrange(len(open_shows))
+            show = open_shows[pick]
+            show_id, show_time, price, capacity, next_seat = show
+            seats = min(rng.choice([1, 2, 2, 2, 3, 4, 4, 5, 6]), capacity - next_seat)
+            show[4] += seats
+            if show[4] >= capacity:
+                # Sold out: swap-remove so picks stay O(1)
+                open_shows[pick] = open_shows[-1]
+                open_shows.pop()
+            booked_at = min(show_time, now) - timedelta(minutes=rng.randint(5, 14 * 24 * 60))
+            planned.append({
+                'row': (rng.choice(user_ids), show_id, booked_at, price * seats, 'confirmed'),
+                'seats': [index_to_seat(i) for i in range(next_seat, next_seat + seats)],
+                'show_id': show_id,
+                'mode': rng.choice(['online', 'online', 'offline']),
+                'cancelled': rng.random() < cancel_rate,
+            })
+
+        def load(cursor):
+            booking_ids = insert_rows(cursor, 'bookings',
+                                      ['user_id', 'show_id', 'booking_date', 'total_amount', 'status'],
+                                      [booking['row'] for booking in planned])
+            details, sold, payments, cancelled = [], [], [], []
+            for booking_id, booking in zip(booking_ids, planned):
+                details.extend((booking_id, seat) for seat in booking['seats'])
+                if booking['cancelled']:
+                    cancelled.append(booking_id)
+                else:
+                    sold.extend((booking['show_id'], seat, booking_id) for seat in booking['seats'])
+                payments.append((booking_id, booking['row'][3], booking['mode'], 'success', booking['row'][2]))
+            cursor.executemany("INSERT INTO booking_details (booking_id, seat_number) VALUES (%s, %s)", details)
+            if sold:
+                cursor.executemany("INSERT INTO show_seats (show_id, seat_number, booking_id) VALUES (%s, %s, %s)",
+                                   sold)
+            # After the seats, so the revenue trigger counts them
+            cursor.executemany(
+                "INSERT INTO payments (booking_id, amount, payment_mode, payment_status, payment_date) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                payments
+            )
+            if cancelled:
+                # The cancellation triggers move these out of the revenue rollup
+                placeholders = ', '.join(['%s'] * len(cancelled))
+                cursor.execute(f"UPDATE bookings SET status = 'cancelled' WHERE booking_id IN ({placeholders})",
+                               cancelled)
+                cursor.execute(
+                    "INSERT INTO cancellations_log (booking_id, user_id, cancel_time, reason) "
+                    "SELECT booking_id, user_id, booking_date + INTERVAL 1 HOUR, 'Changed plans' "
+                    f"FROM bookings WHERE booking_id IN ({placeholders})",
+                    cancelled
+                )
+
+        execute_transaction(load)
+        remaining -= len(planned)
+        progress.add(len(planned))
+    progress.finish()
+    if remaining:
+        print(f"  ! Every show sold out; {remaining:,} bookings not generated (add shows or screens)")
+
+    sync_occupancy([show[0] for show in shows], batch)
+    return count - remaining
+
+def sync_occupancy(show_ids, batch):
+    """Recount show_occupancy.seats_booked from show_seats for the generated shows"""
+    for chunk in batched(show_ids, batch):
+        placeholders = ', '.join(['%s'] * len(chunk))
+        execute_query(
+            f"""
+            UPDATE show_occupancy o
+            LEFT JOIN (SELECT show_id, COUNT(*) AS sold FROM show_seats
+                       WHERE show_id IN ({placeholders}) GROUP BY show_id) s ON s.show_id = o.show_id
+            SET o.seats_booked = COALESCE(s.sold, 0)
+            WHERE o.show_id IN ({placeholders})
+            """,
+            chunk + chunk, fetch=False
+        )
+
+def purge(batch):
+    """Delete every generated row, children first, in batches"""
+    theaters = "SELECT theater_id FROM theaters WHERE name LIKE %s"
+    screens = f"SELECT screen_id FROM screens WHERE theater_id IN ({theaters})"
+    show_ids = [row['show_id'] for row in execute_query(
+        f"SELECT show_id FROM shows WHERE screen_id IN ({screens})", (f'{TAG} %',))]
+    first = execute_query(
+        f"SELECT MIN(booking_date) AS first_booked FROM bookings WHERE show_id IN (SELECT show_id FROM shows "
+        f"WHERE screen_id IN ({screens}))", (f'{TAG} %',)
+    )[0]['first_booked']
+
+    progress = Progress('shows', len(show_ids))
+    # About a thousand bookings per transaction
+    for chunk in batched(show_ids, max(1, batch // 250)):
+        placeholders = ', '.join(['%s'] * len(chunk))
+        bookings = f"SELECT booking_id FROM bookings WHERE show_id IN ({placeholders})"
+        execute_transaction([
+            (f"DELETE FROM payments WHERE booking_id IN ({bookings})", chunk),
+            (f"DELETE FROM booking_details WHERE booking_id IN ({bookings})", chunk),
+            (f"DELETE FROM activity_log WHERE booking_id IN ({bookings})", chunk),
+            (f"DELETE FROM cancellations_log WHERE booking_id IN ({bookings})", chunk),
+            (f"DELETE FROM show_seats WHERE show_id IN ({placeholders})", chunk),
+            (f"DELETE FROM seat_holds WHERE show_id IN ({placeholders})", chunk),
+            (f"DELETE FROM show_occupancy WHERE show_id IN ({placeholders})", chunk),
+            (f"DELETE FROM bookings WHERE show_id IN ({placeholders})", chunk),
+            (f"DELETE FROM shows WHERE show_id IN ({placeholders})", chunk),
+        ])
+        progress.add(len(chunk))
+    progress.finish()
+
+    execute_query(
+        "DELETE FROM activity_log WHERE user_id IN (SELECT user_id FROM users WHERE email LIKE %s)",
+        (USER_EMAIL.format('%'),), fetch=False
+    )
+    execute_query(f"DELETE FROM screens WHERE theater_id IN ({theaters})", (f'{TAG} %',), fetch=False)
+    execute_query("DELETE FROM theaters WHERE name LIKE %s", (f'{TAG} %',), fetch=False)
+    execute_query("DELETE FROM movies WHERE title LIKE %s", (f'{TAG}: %',), fetch=False)
+    execute_query("DELETE FROM users WHERE email LIKE %s", (USER_EMAIL.format('%'),), fetch=False)
+    if first:
+        rebuild_revenue(first.date())
+    print(f"✓ Removed {len(show_ids):,} generated shows and everything attached to them")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--theaters', type=int, default=50)
+    parser.add_argument('--screens', type=int, default=4, help='screens per theater')
+    parser.add_argument('--movies', type=int, default=200)
+    parser.add_argument('--days', type=int, default=60, help='days of shows, three quarters of them in the past')
+    parser.add_argument('--shows-per-day', type=int, default=4, choices=range(1, len(SHOW_SLOTS) + 1),
+                        metavar=f'1-{len(SHOW_SLOTS)}', help='shows per screen per day')
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--bookings', type=int, default=1000000)
+    parser.add_argument('--cancel-rate', type=float, default=0.08)
+    parser.add_argument('--batch', type=int, default=5000, help='rows per multi-row insert')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--purge', action='store_true', help='remove previously generated data and exit')
+    args = parser.parse_args()
+
+    print("BookYourShow Synthetic Data Generator")
+    print("=" * 50)
+    started = time.perf_counter()
+    with app.app_context():
+        if args.purge:
+            purge(args.batch)
+        else:
+            check_auto_increment()
+            rng = random.Random(args.seed)
+            screens, movie_ids = generate_catalog(rng, args.theaters, args.screens, args.movies)
+            print(f"✓ {args.theaters} theaters, {len(screens)} screens, {len(movie_ids)} movies")
+            shows = generate_shows(rng, screens, movie_ids, args.days, args.shows_per_day, args.batch)
+            user_ids = generate_users(args.users, args.batch)
+            booked = generate_bookings(rng, shows, user_ids, args.bookings, args.cancel_rate, args.batch)
+            print(f"✓ {len(shows):,} shows, {len(user_ids):,} users, {booked:,} bookings")
+            # Fresh statistics, so the optimizer plans for the new volume
+            execute_query("ANALYZE TABLE shows, bookings, booking_details, show_seats, payments, users",
+                          fetch=False)
+            print(f"  Customers sign in as {USER_EMAIL.format('N')} / {USER_PASSWORD}")
+    print(f"Elapsed: {time.perf_counter() - started:.1f}s")
+    print("=" * 50)
+
+if __name__ == "__main__":
+    main()
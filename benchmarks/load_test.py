@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+BookYourShow Load Test
+Drives a weighted mix of the key flows from concurrent virtual users:
+browsing (index, movie_detail, movie search), the booking page, checkout
+(seat map, hold, confirm_booking), cancellation and the admin reports. Reports
+throughput and p50/p95/p99 latency per endpoint. The numbers can be saved as a
+named baseline and later runs compared against it.
+
+Each virtual user signs in as one of the customers made by
+benchmarks/generate_data.py (loadgen-N@bys.test), so generate a dataset first.
+By default requests go through Flask's test client in this process. With
+--base-url they go over HTTP to a running server instead, which measures the
+real server (and its worker model) rather than this process's threads.
+
+Usage: python benchmarks/load_test.py [--users 16] [--seconds 30] [--warmup 5]
+                                      [--base-url http://127.0.0.1:5000]
+                                      [--save-baseline NAME] [--compare NAME] [--tolerance 20]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from utils.db_helper import execute_query
+from utils.db_pool import ConnectionPool
+from utils.seat_layout import index_to_seat
+from benchmarks.generate_data import TITLE_WORDS, USER_EMAIL, USER_PASSWORD
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+# Flow -> share of the mix
+FLOWS = {
+    'index': 25,
+    'movie_detail': 20,
+    'search': 15,
+    'booking': 15,
+    'checkout': 12,
+    'cancel': 5,
+    'admin_reports': 8,
+}
+
+class LocalClient:
+    """Requests through Flask's test client, in this process"""
+
+    def __init__(self):
+        self.client = app.test_client()
+
+    def request(self, method, path, data=None, json_body=None):
+        response = self.client.open(path, method=method, data=data, json=json_body)
+        return response.status_code, response.headers.get('Location', ''), response.get_data()
+
+class _NoRedirect(HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None  # surface the 302 itself; its Location tells success from failure
+
+class HttpClient:
+    """Requests over HTTP to a running server, keeping its session cookie"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = build_opener(HTTPCookieProcessor(CookieJar()), _NoRedirect())
+
+    def request(self, method, path, data=None, json_body=None):
+        body, headers = None, {}
+        if json_body is not None:
+            body, headers = json.dumps(json_body).encode(), {'Content-Type': 'application/json'}
+        elif data is not None:
+            body, headers = urlencode(data, doseq=True).encode(), {'Content-Type': 'application/x-www-form-urlencoded'}
+        req = Request(self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            with self.opener.open(req, timeout=60) as response:
+                return response.status, response.headers.get('Location', ''), response.read()
+        except HTTPError as e:
+            return e.code, e.headers.get('Location', ''), e.read()
+
+class Recorder:
+    """Latency samples and failures per endpoint, shared by all virtual users"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+        self.recording = False
+
+    def record(self, endpoint, seconds, ok):
+        if not self.recording:
+            return
+        with self.lock:
+            self.samples.setdefault(endpoint, []).append(seconds)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000
+
+class VirtualUser:
+    """One signed-in customer (plus an admin session for the reports) working through the mix"""
+
+    def __init__(self, number, make_client, catalog, recorder, admin):
+        self.number = number
+        self.customer = make_client()
+        self.admin = make_client()
+        self.catalog = catalog
+        self.recorder = recorder
+        self.admin_credentials = admin
+        self.rng = random.Random(number)
+        self.bookings = []
+
+    def call(self, endpoint, client, method, path, ok=lambda status, location: status == 200, **kwargs):
+        started = time.perf_counter()
+        try:
+            status, location, body = client.request(method, path, **kwargs)
+        except Exception:
+            self.recorder.record(endpoint, time.perf_counter() - started, False)
+            return None, '', b''
+        self.recorder.record(endpoint, time.perf_counter() - started, ok(status, location))
+        return status, location, body
+
+    def sign_in(self):
+        email = USER_EMAIL.format(self.number + 1)
+        status, location, _ = self.customer.request('POST', '/login', data={'email': email, 'password': USER_PASSWORD})
+        if status != 302:
+            raise RuntimeError(f'{email} could not sign in ({status}); run benchmarks/generate_data.py first')
+        if 'admin_reports' in self.catalog['flows']:
+            email, password = self.admin_credentials
+            status, location, _ = self.admin.request('POST', '/login', data={'email': email, 'password': password})
+            if status != 302 or 'admin' not in location:
+                raise RuntimeError(f'Admin {email} could not sign in ({status})')
+
+    def run(self, stop):
+        flows, weights = zip(*self.catalog['flows'].items())
+        while not stop.is_set():
+            getattr(self, f'flow_{self.rng.choices(flows, weights)[0]}')()
+
+    # -- flows ----------------------------------------------------------------
+
+    def flow_index(self):
+        self.call('index', self.customer, 'GET', '/')
+
+    def flow_movie_detail(self):
+        self.call('movie_detail', self.customer, 'GET', f"/movie/{self.rng.choice(self.catalog['movies'])}")
+
+    def flow_search(self):
+        query = urlencode({'q': self.rng.choice(TITLE_WORDS).lower()[:self.rng.randint(3, 6)]})
+        self.call('search', self.customer, 'GET', f'/api/movies/search?{query}')
+
+    def flow_booking(self):
+        show_id, _ = self.rng.choice(self.catalog['shows'])
+        self.call('booking', self.customer, 'GET', f'/booking/{show_id}')
+
+    def flow_checkout(self):
+        show_id, capacity = self.rng.choice(self.catalog['shows'])
+        status, _, body = self.call('seat_map', self.customer, 'GET', f'/api/shows/{show_id}/seats')
+        if status != 200:
+            return
+        taken = set(json.loads(body).get('unavailable_seats', []))
+        free = [seat for seat in (index_to_seat(i) for i in range(capacity)) if seat not in taken]
+        if not free:
+            return
+        seats = self.rng.sample(free, min(len(free), self.rng.randint(1, 4)))
+        self.call('hold', self.customer, 'POST', f'/api/shows/{show_id}/hold', json_body={'seats': seats})
+        # Booked -> my_bookings; lost a seat race -> back to the booking page (fine); anything else failed
+        status, location, _ = self.call('confirm_booking', self.customer, 'POST', '/confirm_booking',
+                                        ok=lambda status, location: status == 302 and (
+                                            '/booking/' in location or location.rstrip('/').endswith('my_bookings')),
+                                        data={'show_id': show_id, 'seats': seats, 'payment_mode': 'online'})
+        if status == 302 and location.rstrip('/').endswith('my_bookings'):
+            booking = execute_query(
+                "SELECT booking_id FROM bookings WHERE user_id = %s AND show_id = %s AND status = 'confirmed' "
+                "ORDER BY booking_id DESC LIMIT 1",
+                (self.catalog['user_ids'][self.number], show_id)
+            )
+            if booking:
+                self.bookings.append(booking[0]['booking_id'])
+
+    def flow_cancel(self):
+        if not self.bookings:
+            return self.flow_checkout()
+        booking_id = self.bookings.pop(self.rng.randrange(len(self.bookings)))
+        self.call('cancel', self.customer, 'POST', f'/api/cancel_booking/{booking_id}')
+
+    def flow_admin_reports(self):
+        self.call('admin_reports', self.admin, 'GET', '/admin/reports')
+        params = urlencode({'draw': 1, 'start': 0, 'length': 25, 'status': self.rng.choice(['', 'confirmed'])})
+        self.call('admin_report_api', self.admin, 'GET', f'/api/admin/reports/bookings?{params}')
+
+def load_catalog(users, flows):
+    """Movies, upcoming shows and the generated customers the virtual users work with"""
+    emails = [USER_EMAIL.format(i + 1) for i in range(users)]
+    rows = execute_query(
+        f"SELECT user_id, email FROM users WHERE email IN ({', '.join(['%s'] * len(emails))})", emails
+    )
+    by_email = {row['email']: row['user_id'] for row in rows}
+    missing = [email for email in emails if email not in by_email]
+    if missing:
+        raise RuntimeError(f'{len(missing)} generated customers missing (e.g. {missing[0]}); '
+                           'run benchmarks/generate_data.py with at least --users ' + str(users))
+    shows = execute_query(
+        """
+        SELECT s.show_id, sc.total_seats
+        FROM shows s JOIN screens sc ON s.screen_id = sc.screen_id
+        WHERE s.show_time > NOW() + INTERVAL 1 HOUR
+        ORDER BY s.show_time LIMIT 2000
+        """
+    )
+    movies = execute_query("SELECT DISTINCT movie_id FROM shows WHERE show_time > NOW() LIMIT 500")
+    if not shows or not movies:
+        raise RuntimeError('No upcoming shows; generate a dataset first')
+    return {
+        'flows': flows,
+        'user_ids': [by_email[email] for email in emails],
+        'shows': [(row['show_id'], row['total_seats']) for row in shows],
+        'movies': [row['movie_id'] for row in movies],
+    }
+
+def run(args, flows):
+    catalog = load_catalog(args.users, flows)
+    make_client = (lambda: HttpClient(args.base_url)) if args.base_url else LocalClient
+    recorder = Recorder()
+    vusers = [VirtualUser(i, make_client, catalog, recorder, (args.admin_email, args.admin_password))
+              for i in range(args.users)]
+    for vuser in vusers:
+        vuser.sign_in()
+
+    stop = threading.Event()
+
+    def drive(vuser):
+        with app.app_context():
+            vuser.run(stop)
+
+    threads = [threading.Thread(target=drive, args=(vuser,)) for vuser in vusers]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.warmup)
+    recorder.recording = True
+    started = time.perf_counter()
+    time.sleep(args.seconds)
+    recorder.recording = False
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    results = {}
+    for endpoint, samples in sorted(recorder.samples.items()):
+        results[endpoint] = {
+            'requests': len(samples),
+            'rps': round(len(samples) / elapsed, 2),
+            'p50_ms': round(percentile(samples, 0.50), 2),
+            'p95_ms': round(percentile(samples, 0.95), 2),
+            'p99_ms': round(percentile(samples, 0.99), 2),
+            'errors': recorder.errors.get(endpoint, 0),
+        }
+    return results
+
+def report(results, baseline=None, tolerance=20):
+    """Print the results table; returns the endpoints that regressed against ``baseline``"""
+    print(f"{'Endpoint':<18}{'Requests':>9}{'Req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'Errors':>8}")
+    print("-" * 71)
+    regressions = []
+    for endpoint, row in results.items():
+        line = (f"{endpoint:<18}{row['requests']:>9}{row['rps']:>9.1f}{row['p50_ms']:>9.1f}"
+                f"{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['errors']:>8}")
+        before = (baseline or {}).get(endpoint)
+        if before and before['p95_ms']:
+            change = (row['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100
+            line += f"   p95 {change:+.0f}%"
+            if change > tolerance:
+                line += " ✗"
+                regressions.append(endpoint)
+        print(line)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=16, help='concurrent virtual users')
+    parser.add_argument('--seconds', type=float, default=30, help='measured duration')
+    parser.add_argument('--warmup', type=float, default=5, help='unmeasured seconds first (caches, pool)')
+    parser.add_argument('--base-url', help='drive a running server over HTTP instead of the test client')
+    parser.add_argument('--flow', action='append', choices=sorted(FLOWS),
+                        help='flow to include (repeatable; default: the full mix)')
+    parser.add_argument('--admin-email', default='admin@bys.com')
+    parser.add_argument('--admin-password', default='secret')
+    parser.add_argument('--save-baseline', metavar='NAME', help=f'save results to {BASELINE_DIR}/NAME.json')
+    parser.add_argument('--compare', metavar='NAME', help='compare with a saved baseline')
+    parser.add_argument('--tolerance', type=float, default=20, help='p95 increase (%%) counted as a regression')
+    args = parser.parse_args()
+    flows = {flow: FLOWS[flow] for flow in (args.flow or FLOWS)}
+
+    baseline = None
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f'{args.compare}.json'), encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+
+    if not args.base_url:
+        app.config['DB_POOL_MAX_SIZE'] = args.users * 2 + 4
+        app.config['DB_POOL_TIMEOUT'] = 60
+        app.db_pool = ConnectionPool.from_config(app.config)
+
+    print("BookYourShow Load Test")
+    print("=" * 50)
+    print(f"{args.users} users, {args.seconds:g}s after {args.warmup:g}s warm-up, "
+          f"{'HTTP to ' + args.base_url if args.base_url else 'in-process test client'}")
+    with app.app_context():
+        results = run(args, flows)
+    regressions = report(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f'{args.save_baseline}.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'saved_at': time.strftime('%Y-%m-%d %H:%M:%S'), 'users': args.users,
+                       'seconds': args.seconds, 'base_url': args.base_url, 'flows': flows,
+                       'results': results}, f, indent=2)
+        print(f"✓ Baseline saved to {path}")
+    errors = sum(row['errors'] for row in results.values())
+    if baseline is not None:
+        print(f"✗ p95 regressed past {args.tolerance:g}%: {', '.join(regressions)}" if regressions
+              else f"✓ No endpoint's p95 regressed past {args.tolerance:g}% of '{args.compare}'")
+    if errors:
+        print(f"✗ {errors} failed requests")
+    print("=" * 50)
+    sys.exit(1 if regressions or errors else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+BookYourShow Login Throughput Benchmark
+Measures booking latency on its own, then again while a login surge runs
+alongside it, and reports login throughput. With password hashing on the
+bounded pool, booking latency should barely move however many logins queue.
+
+Throwaway users and shows are created for the run and removed afterwards.
+
+Usage: python benchmarks/login_throughput.py [--logins 32] [--bookers 8] [--seconds 10]
+                                             [--kdf-workers N] [--method scrypt:32768:8:1]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from utils.db_helper import execute_query
+from utils.db_pool import ConnectionPool
+from utils.booking_engine import create_booking
+from utils.passwords import PasswordHasher
+from utils.seat_layout import index_to_seat
+from benchmarks.booking_concurrency import create_benchmark_show, remove_benchmark_show
+
+PASSWORD = 'bench-login-pass'
+
+def create_users(count):
+    hashed = app.passwords.hash(PASSWORD)
+    emails = [f'bench-login-{i}@bys.test' for i in range(count)]
+    for email in emails:
+        execute_query(
+            "INSERT INTO users (name, email, password, role) VALUES (%s, %s, %s, 'customer')",
+            ('Login Benchmark', email, hashed), fetch=False
+        )
+    return emails
+
+def remove_users():
+    execute_query("DELETE FROM users WHERE email LIKE %s", ('bench-login-%@bys.test',), fetch=False)
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000
+
+class BookingLoad:
+    """Books one seat at a time, opening a fresh show whenever one fills up"""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.lock = threading.Lock()
+        self.shows = []
+        self.show_id = None
+        self.total_seats = 0
+        self.next_seat = 0
+
+    def _next(self):
+        with self.lock:
+            if self.show_id is None or self.next_seat >= self.total_seats:
+                self.show_id, self.total_seats = create_benchmark_show()
+                self.shows.append(self.show_id)
+                self.next_seat = 0
+            seat = index_to_seat(self.next_seat)
+            self.next_seat += 1
+            return self.show_id, seat
+
+    def run(self, stop, latencies):
+        with app.app_context():
+            while not stop.is_set():
+                show_id, seat = self._next()
+                started = time.perf_counter()
+                create_booking(self.user_id, show_id, [seat], 'online')
+                latencies.append(time.perf_counter() - started)
+
+    def cleanup(self):
+        for show_id in self.shows:
+            remove_benchmark_show(show_id)
+
+def login_loop(emails, offset, stop, latencies, outcomes):
+    client = app.test_client()
+    i = offset
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = client.post('/login', data={'email': emails[i % len(emails)], 'password': PASSWORD})
+        latencies.append(time.perf_counter() - started)
+        outcomes[response.status_code] = outcomes.get(response.status_code, 0) + 1
+        client.get('/logout')
+        i += 1
+
+def phase(load, bookers, emails, logins, seconds):
+    stop = threading.Event()
+    booking_latencies, login_latencies, outcomes = [], [], {}
+    threads = [threading.Thread(target=load.run, args=(stop, booking_latencies)) for _ in range(bookers)]
+    threads += [threading.Thread(target=login_loop, args=(emails, i, stop, login_latencies, outcomes))
+                for i in range(logins)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return booking_latencies, login_latencies, outcomes
+
+def report(label, seconds, booking_latencies, login_latencies=None, outcomes=None):
+    print(label)
+    print(f"  Bookings/sec:      {len(booking_latencies) / seconds:.1f}")
+    print(f"  Booking p50/p95:   {percentile(booking_latencies, 0.5):.1f} / {percentile(booking_latencies, 0.95):.1f} ms")
+    if login_latencies is not None:
+        print(f"  Logins/sec:        {len(login_latencies) / seconds:.1f}")
+        print(f"  Login p50/p95:     {percentile(login_latencies, 0.5):.1f} / {percentile(login_latencies, 0.95):.1f} ms")
+        print(f"  Login responses:   {outcomes}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=32, help='concurrent login clients')
+    parser.add_argument('--bookers', type=int, default=8, help='concurrent booking clients')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--kdf-workers', type=int, help='override PASSWORD_HASH_WORKERS')
+    parser.add_argument('--method', help='override PASSWORD_HASH_METHOD')
+    args = parser.parse_args()
+
+    app.config['DB_POOL_MAX_SIZE'] = args.bookers + args.logins + 4
+    app.config['DB_POOL_TIMEOUT'] = 60
+    app.db_pool = ConnectionPool.from_config(app.config)
+    if args.kdf_workers:
+        app.config['PASSWORD_HASH_WORKERS'] = args.kdf_workers
+    if args.method:
+        app.config['PASSWORD_HASH_METHOD'] = args.method
+    app.passwords = PasswordHasher.from_config(app.config)
+
+    print("BookYourShow Login Throughput Benchmark")
+    print("=" * 50)
+    print(f"KDF: {app.passwords.method} on {app.passwords.max_workers} threads")
+    with app.app_context():
+        user = execute_query("SELECT user_id FROM users ORDER BY user_id LIMIT 1")
+        if not user:
+            print("✗ Need at least one user")
+            sys.exit(1)
+        emails = create_users(max(args.logins, 1))
+        load = BookingLoad(user[0]['user_id'])
+        try:
+            booking_only, _, _ = phase(load, args.bookers, emails, 0, args.seconds)
+            report("Bookings alone:", args.seconds, booking_only)
+            mixed = phase(load, args.bookers, emails, args.logins, args.seconds)
+            report(f"Bookings + {args.logins} login clients:", args.seconds, *mixed)
+        finally:
+            load.cleanup()
+            remove_users()
+    print(f"Hasher: {app.passwords.stats()}")
+    print("=" * 50)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+BookYourShow Occupancy Benchmark
+Fills a throwaway show booking by booking and reports booking
+latency at each fill level. With incrementally maintained occupancy counters
+the latency should stay flat as the show sells out.
+
+Usage: python benchmarks/occupancy_fill_latency.py [--seats-per-booking 4] [--keep]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from utils.db_helper import execute_query
+from utils.booking_engine import create_booking, SoldOutError
+from utils.seat_layout import index_to_seat
+from benchmarks.booking_concurrency import create_benchmark_show, remove_benchmark_show
+
+def run(seats_per_booking, buckets, keep):
+    user_id = execute_query("SELECT user_id FROM users ORDER BY user_id LIMIT 1")[0]['user_id']
+    show_id, total_seats = create_benchmark_show()
+    print(f"Show {show_id}: {total_seats} seats, {seats_per_booking} seats per booking")
+
+    latencies = {bucket: [] for bucket in range(buckets)}
+    next_seat = 0
+    sold_out = False
+    while next_seat + seats_per_booking <= total_seats:
+        seats = [index_to_seat(i) for i in range(next_seat, next_seat + seats_per_booking)]
+        fill_bucket = min(buckets - 1, next_seat * buckets // total_seats)
+        started = time.perf_counter()
+        create_booking(user_id, show_id, seats, 'online')
+        latencies[fill_bucket].append((time.perf_counter() - started) * 1000)
+        next_seat += seats_per_booking
+
+    # The counter must refuse anything beyond capacity
+    remaining = [index_to_seat(i) for i in range(next_seat, total_seats)]
+    try:
+        create_booking(user_id, show_id, remaining + [index_to_seat(0)], 'online')
+    except SoldOutError:
+        sold_out = True
+
+    print(f"{'Fill level':>12} {'Bookings':>9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for bucket in range(buckets):
+        samples = sorted(latencies[bucket])
+        if not samples:
+            continue
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        low, high = bucket * 100 // buckets, (bucket + 1) * 100 // buckets
+        print(f"{f'{low}-{high}%':>12} {len(samples):>9} {statistics.median(samples):>8.2f} "
+              f"{p95:>8.2f} {samples[-1]:>8.2f}")
+
+    counter = execute_query("SELECT seats_booked, capacity FROM show_occupancy WHERE show_id = %s", (show_id,))[0]
+    print(f"Counter: {counter['seats_booked']}/{counter['capacity']}")
+    print("✓ Over-capacity booking rejected" if sold_out else "✗ Over-capacity booking was accepted")
+
+    if not keep:
+        remove_benchmark_show(show_id)
+    return sold_out
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seats-per-booking', type=int, default=4)
+    parser.add_argument('--buckets', type=int, default=10, help='number of fill-level buckets to report')
+    parser.add_argument('--keep', action='store_true', help='keep the benchmark show and its bookings')
+    args = parser.parse_args()
+
+    print("BookYourShow Occupancy Benchmark")
+    print("=" * 50)
+    with app.app_context():
+        ok = run(args.seats_per_booking, args.buckets, args.keep)
+    print("=" * 50)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+BookYourShow Page Weight and TTFB
+Fetches the main customer and admin pages from a running server the way a
+browser would, with Accept-Encoding: gzip. Reports for each page:
+
+* TTFB: median and p95 time to the response headers, over --repeat requests
+  on one keep-alive connection;
+* first view: bytes transferred for the HTML and every first-party
+  stylesheet and script it links, and the number of requests;
+* repeat view: what a revisit costs. The HTML is fetched again. Assets
+  cached as immutable are not, and the rest are revalidated (one request
+  each; their 304s carry no body).
+
+Only HTTP is used, so the same script measures any build. To measure before
+and after a change, run it against the old build with --save-baseline, then
+against the new one with --compare:
+
+    git checkout <old commit> && python run.py       # in another terminal
+    python benchmarks/page_weight.py --save-baseline before
+    git checkout - && python run.py
+    python benchmarks/page_weight.py --compare before
+
+Usage: python benchmarks/page_weight.py [--base-url http://127.0.0.1:5000] [--repeat 20]
+                                        [--save-baseline NAME] [--compare NAME]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+import time
+from html.parser import HTMLParser
+from http.client import HTTPConnection
+from urllib.parse import urlencode, urlsplit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.load_test import BASELINE_DIR, percentile
+
+class AssetLinks(HTMLParser):
+    """First-party stylesheets and scripts linked from a page"""
+
+    def __init__(self):
+        super().__init__()
+        self.assets = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'link' and 'stylesheet' in (attrs.get('rel') or '').split():
+            url = attrs.get('href')
+        elif tag == 'script':
+            url = attrs.get('src')
+        else:
+            return
+        if url and url.startswith('/') and not url.startswith('//') and url not in self.assets:
+            self.assets.append(url)
+
+class Browser:
+    """One keep-alive connection with a cookie jar"""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.cookies = {}
+        self.conn = HTTPConnection(self.host, self.port, timeout=30)
+
+    def request(self, method, path, body=None, headers=None):
+        """(status, headers, raw body, seconds to first byte)"""
+        headers = dict(headers or {}, **{'Accept-Encoding': 'gzip'})
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+        for attempt in range(2):
+            started = time.perf_counter()
+            try:
+                self.conn.request(method, path, body, headers)
+                response = self.conn.getresponse()
+                break
+            except (ConnectionError, OSError):
+                # The server closed the keep-alive connection; reconnect once
+                self.conn.close()
+                self.conn = HTTPConnection(self.host, self.port, timeout=30)
+                if attempt:
+                    raise
+        ttfb = time.perf_counter() - started
+        data = response.read()
+        for name, value in response.getheaders():
+            if name.lower() == 'set-cookie':
+                cookie = value.split(';', 1)[0]
+                name, _, value = cookie.partition('=')
+                self.cookies[name.strip()] = value
+        return response.status, {name.lower(): value for name, value in response.getheaders()}, data, ttfb
+
+    def sign_in(self, email, password):
+        status, _, _, _ = self.request('POST', '/login', urlencode({'email': email, 'password': password}),
+                                       {'Content-Type': 'application/x-www-form-urlencoded'})
+        if status not in (200, 302, 303):
+            raise RuntimeError(f'{email} could not sign in (status {status})')
+
+def decoded_size(headers, data):
+    return len(gzip.decompress(data)) if headers.get('content-encoding') == 'gzip' else len(data)
+
+def cached_forever(headers):
+    cache_control = headers.get('cache-control', '')
+    match = re.search(r'max-age=(\d+)', cache_control)
+    return 'immutable' in cache_control or bool(match and int(match.group(1)) >= 86400)
+
+def measure_page(browser, path, repeat):
+    ttfbs, status, headers, data = [], None, {}, b''
+    for _ in range(repeat):
+        status, headers, data, ttfb = browser.request('GET', path)
+        ttfbs.append(ttfb)
+    if status != 200:
+        raise RuntimeError(f'GET {path} returned {status}')
+    html = gzip.decompress(data) if headers.get('content-encoding') == 'gzip' else data
+    links = AssetLinks()
+    links.feed(html.decode('utf-8', 'replace'))
+
+    asset_bytes = revalidated = 0
+    for url in links.assets:
+        asset_status, asset_headers, asset_data, _ = browser.request('GET', url)
+        if asset_status != 200:
+            raise RuntimeError(f'GET {url} (linked from {path}) returned {asset_status}')
+        asset_bytes += len(asset_data)
+        if not cached_forever(asset_headers):
+            revalidated += 1
+    return {
+        'ttfb_p50_ms': percentile(ttfbs, 0.50),
+        'ttfb_p95_ms': percentile(ttfbs, 0.95),
+        'html_bytes': len(data),
+        'html_decoded_bytes': decoded_size(headers, data),
+        'assets': len(links.assets),
+        'first_view_bytes': len(data) + asset_bytes,
+        'first_view_requests': 1 + len(links.assets),
+        'repeat_view_bytes': len(data),
+        'repeat_view_requests': 1 + revalidated,
+    }, html.decode('utf-8', 'replace')
+
+def run(args):
+    """{page: measurements} for the customer and admin pages"""
+    results = {}
+    guest = Browser(args.base_url)
+    results['index'], html = measure_page(guest, '/', args.repeat)
+    movie = re.search(r'href="(/movie/\d+)"', html)
+    results['login'], _ = measure_page(guest, '/login', args.repeat)
+
+    customer = Browser(args.base_url)
+    customer.sign_in(args.email, args.password)
+    if movie:
+        results['movie_detail'], html = measure_page(customer, movie.group(1), args.repeat)
+        booking = re.search(r'href="(/booking/\d+)"', html)
+        if booking:
+            results['booking'], _ = measure_page(customer, booking.group(1), args.repeat)
+    results['my_bookings'], _ = measure_page(customer, '/my_bookings', args.repeat)
+
+    admin = Browser(args.base_url)
+    admin.sign_in(args.admin_email, args.admin_password)
+    results['admin_dashboard'], _ = measure_page(admin, '/admin', args.repeat)
+    results['admin_reports'], _ = measure_page(admin, '/admin/reports', args.repeat)
+    return results
+
+def _change(after, before):
+    if before is None:
+        return ''
+    if not before:
+        return f'{"":>8}'
+    return f'{(after - before) / before * 100:>+7.0f}%'
+
+def report(results, baseline=None):
+    columns = [('TTFB p50', 'ttfb_p50_ms', '{:.1f}'), ('HTML B', 'html_bytes', '{}'),
+               ('1st view B', 'first_view_bytes', '{}'), ('1st reqs', 'first_view_requests', '{}'),
+               ('Repeat B', 'repeat_view_bytes', '{}'), ('Repeat reqs', 'repeat_view_requests', '{}')]
+    print(f"{'Page':<16}" + ''.join(f'{title:>13}' + ('        ' if baseline else '') for title, _, _ in columns))
+    print("-" * (16 + len(columns) * (21 if baseline else 13)))
+    for page, row in results.items():
+        before = (baseline or {}).get(page, {})
+        line = f'{page:<16}'
+        for _, key, fmt in columns:
+            line += f'{fmt.format(row[key]):>13}'
+            if baseline:
+                line += _change(row[key], before.get(key)) if before else f'{"":>8}'
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--repeat', type=int, default=20, help='requests per page for the TTFB figures')
+    parser.add_argument('--email', default='rajesh.k@email.com')
+    parser.add_argument('--password', default='pass123')
+    parser.add_argument('--admin-email', default='admin@bys.com')
+    parser.add_argument('--admin-password', default='secret')
+    parser.add_argument('--save-baseline', metavar='NAME', help=f'save results to {BASELINE_DIR}/NAME.json')
+    parser.add_argument('--compare', metavar='NAME', help='compare with a saved baseline')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f'{args.compare}.json'), encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+
+    print("BookYourShow Page Weight and TTFB")
+    print("=" * 50)
+    print(f"{args.base_url}, {args.repeat} requests per page")
+    try:
+        results = run(args)
+    except (RuntimeError, OSError) as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    report(results, baseline)
+
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f'{args.save_baseline}.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'saved_at': time.strftime('%Y-%m-%d %H:%M:%S'), 'base_url': args.base_url,
+                       'repeat': args.repeat, 'results': results}, f, indent=2)
+        print(f"✓ Baseline saved to {path}")
+    ok = True
+    if baseline is not None:
+        pages = [page for page in results if page in baseline]
+        before = sum(baseline[page]['repeat_view_bytes'] for page in pages)
+        after = sum(results[page]['repeat_view_bytes'] for page in pages)
+        ok = after <= before
+        print(f"✓ Repeat views transfer {after} bytes, down from {before}" if ok
+              else f"✗ Repeat views transfer {after} bytes, up from {before}")
+    print("=" * 50)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
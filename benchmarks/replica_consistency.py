@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+BookYourShow Replica Consistency Check
+Exercises read/write splitting against the replicas in DB_REPLICAS. A
+customer books a seat and immediately loads my_bookings, and then cancels
+and reloads it, many times over. Every page must show the change at once
+(read-your-writes), even while the replicas lag. Meanwhile anonymous page
+loads should be served by the replicas. Reports how the reads were routed.
+
+Test locally with two MySQL instances, the second replicating the first:
+    DB_REPLICAS=127.0.0.1:3307 python benchmarks/replica_consistency.py [--rounds 50]
+
+Usage: python benchmarks/replica_consistency.py [--rounds 50] [--email rajesh.k@email.com] [--password pass123]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from utils.seat_layout import index_to_seat
+from benchmarks.booking_concurrency import create_benchmark_show, remove_benchmark_show
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--email', default='rajesh.k@email.com')
+    parser.add_argument('--password', default='pass123')
+    args = parser.parse_args()
+
+    print("BookYourShow Replica Consistency Check")
+    print("=" * 50)
+    if not app.db_replicas:
+        print("✗ No replicas configured; set DB_REPLICAS=host:port[,host:port]")
+        sys.exit(1)
+    # Check replication before the first read rather than waiting for the background thread
+    app.db_replicas.check_all()
+    for replica in app.db_replicas.replicas:
+        state = f"lag {replica.lag}s" if replica.healthy else replica.error
+        print(f"  {replica.name}: {state}")
+
+    customer = app.test_client()
+    response = customer.post('/login', data={'email': args.email, 'password': args.password})
+    if response.status_code != 302:
+        print(f"✗ {args.email} could not sign in")
+        sys.exit(1)
+    anonymous = app.test_client()
+
+    stale = 0
+    with app.app_context():
+        show_id, total_seats = create_benchmark_show()
+    try:
+        before = app.db_replicas.stats()
+        for i in range(min(args.rounds, total_seats)):
+            seat = index_to_seat(i)
+            response = customer.post('/confirm_booking', data={'show_id': show_id, 'seats': [seat],
+                                                               'payment_mode': 'online'})
+            location = response.headers.get('Location', '')
+            if not location.rstrip('/').endswith('my_bookings'):
+                print(f"✗ Booking {seat} failed ({response.status_code} -> {location})")
+                stale += 1
+                continue
+            page = customer.get('/my_bookings').get_data(as_text=True)
+            if seat not in page:
+                stale += 1
+                print(f"✗ my_bookings did not show the booking for {seat}")
+            # Browsing by someone who hasn't written can use the replicas (skip the page cache so it reads)
+            app.page_cache.clear()
+            anonymous.get('/')
+        time.sleep(0.1)
+        after = app.db_replicas.stats()
+    finally:
+        with app.app_context():
+            remove_benchmark_show(show_id)
+
+    replica_reads = after['replica_reads'] - before['replica_reads']
+    primary_reads = after['primary_reads'] - before['primary_reads']
+    print(f"  Rounds:          {min(args.rounds, total_seats)}")
+    print(f"  Replica reads:   {replica_reads}")
+    print(f"  Primary reads:   {primary_reads} (sticky sessions and fallbacks)")
+    print(f"  Fallbacks:       {after['fallbacks'] - before['fallbacks']}")
+    if stale:
+        print(f"✗ {stale} rounds did not read their own write")
+    else:
+        print("✓ Every booking was visible on the very next page")
+    if not replica_reads:
+        print("✗ No reads reached a replica")
+    print("=" * 50)
+    sys.exit(0 if not stale and replica_reads else 1)
+
+if __name__ == "__main__":
+    main()
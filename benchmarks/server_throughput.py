@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+BookYourShow Server Throughput Comparison
+Starts the app with Flask's threaded development server (what run.py used
+to do in "production") and then with the pre-fork production server, and
+drives each over HTTP with the load test's virtual users and flow mix.
+Reports throughput and p50/p95/p99 latency per endpoint for both, and the
+overall speed-up.
+
+The virtual users sign in as customers made by benchmarks/generate_data.py,
+so generate a dataset first. The client runs in this process, so on a small
+machine it can saturate before the production server does; give it fewer
+--workers than the machine has cores to leave it room.
+
+Usage: python benchmarks/server_throughput.py [--users 32] [--seconds 20] [--warmup 5]
+                                              [--workers N] [--threads 8] [--port 5100]
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.error import URLError
+from urllib.request import urlopen
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from benchmarks.load_test import FLOWS, report, run
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def start_server(mode, port, workers, threads):
+    command = [sys.executable, os.path.join(ROOT, 'run.py'), '--bind', f'127.0.0.1:{port}']
+    if mode == 'dev-server':
+        command.append('--dev-server')
+    else:
+        if workers:
+            command += ['--workers', str(workers)]
+        command += ['--threads', str(threads)]
+    # A pidfile of its own, so a server already running on this machine is left alone
+    env = dict(os.environ, SERVER_PIDFILE=os.path.join(tempfile.mkdtemp(prefix='bys-bench-'), 'server.pid'))
+    return subprocess.Popen(command, cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def wait_until_up(process, base_url, path='/', timeout=90):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            with urlopen(base_url + path, timeout=5) as response:
+                if response.status == 200:
+                    return True
+        except (URLError, OSError):
+            pass
+        time.sleep(0.5)
+    return False
+
+def stop_server(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=40)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+def totals(results):
+    return {
+        'rps': sum(row['rps'] for row in results.values()),
+        'p95_ms': max((row['p95_ms'] for row in results.values()), default=0.0),
+        'errors': sum(row['errors'] for row in results.values()),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=32, help='concurrent virtual users')
+    parser.add_argument('--seconds', type=float, default=20, help='measured duration per server')
+    parser.add_argument('--warmup', type=float, default=5, help='unmeasured seconds first')
+    parser.add_argument('--workers', type=int, help='production worker processes (default SERVER_WORKERS)')
+    parser.add_argument('--threads', type=int, default=app.config['SERVER_THREADS'], help='threads per worker')
+    parser.add_argument('--port', type=int, default=5100, help='port the servers listen on, one at a time')
+    parser.add_argument('--admin-email', default='admin@bys.com')
+    parser.add_argument('--admin-password', default='secret')
+    args = parser.parse_args()
+    args.base_url = f'http://127.0.0.1:{args.port}'
+
+    print("BookYourShow Server Throughput Comparison")
+    print("=" * 50)
+    print(f"{args.users} users, {args.seconds:g}s per server after {args.warmup:g}s warm-up")
+
+    summary = {}
+    for mode in ('dev-server', 'production'):
+        print(f"\n{mode}")
+        process = start_server(mode, args.port, args.workers, args.threads)
+        try:
+            if not wait_until_up(process, args.base_url):
+                print(f"✗ The {mode} server did not start (exit code {process.poll()})")
+                sys.exit(1)
+            with app.app_context():
+                results = run(args, FLOWS)
+        finally:
+            stop_server(process)
+        report(results)
+        summary[mode] = totals(results)
+
+    print()
+    for mode, row in summary.items():
+        print(f"{mode:<12} {row['rps']:>8.1f} req/s   worst p95 {row['p95_ms']:>8.1f} ms   {row['errors']} errors")
+    before, after = summary['dev-server'], summary['production']
+    ok = not before['errors'] and not after['errors']
+    if before['rps']:
+        print(f"✓ Production server: {after['rps'] / before['rps']:.1f}x the throughput" if after['rps'] > before['rps']
+              else f"✗ Production server was not faster ({after['rps']:.1f} vs {before['rps']:.1f} req/s)")
+    if not ok:
+        print("✗ Some requests failed")
+    print("=" * 50)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+BookYourShow Session Overhead Benchmark
+Measures what each session backend adds to a request. A bare Flask app with
+the project's session settings serves a logged-in user; each backend is timed
+on requests that only read the session and on requests that change it, and
+the same requests with sessions disabled are subtracted as the baseline.
+
+The kv backend runs against the local stand-in server (utils/kv_server.py)
+unless --kv-url points at a real Redis-protocol server.
+
+Usage: python benchmarks/session_overhead.py [--requests 5000] [--kv-url redis://127.0.0.1:6379/0]
+                                             [--backend cookie --backend kv ...]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, session
+from flask.sessions import SecureCookieSession, SessionInterface
+
+from config import Config
+from utils.kv_server import start_background
+from utils.sessions import SESSION_BACKENDS, init_session
+
+class _NoSessionInterface(SessionInterface):
+    """Baseline: an empty session that is never loaded or saved"""
+
+    def open_session(self, app, request):
+        return SecureCookieSession()
+
+    def save_session(self, app, session, response):
+        pass
+
+def make_app(backend, kv_url=None, file_dir=None):
+    app = Flask('session_overhead')
+    app.config.from_object(Config)
+    app.config['SESSION_BACKEND'] = backend or 'cookie'
+    if kv_url:
+        app.config['SESSION_KV_URL'] = kv_url
+    if file_dir:
+        app.config['SESSION_FILE_DIR'] = file_dir
+
+    @app.route('/login')
+    def login():
+        session['user_id'] = 42
+        session['name'] = 'Benchmark Customer'
+        session['role'] = 'customer'
+        return 'ok'
+
+    @app.route('/read')
+    def read():
+        return str(session.get('user_id'))
+
+    @app.route('/write')
+    def write():
+        session['hold_token'] = os.urandom(16).hex()
+        return 'ok'
+
+    if backend is None:
+        app.session_interface = _NoSessionInterface()
+    else:
+        init_session(app)
+    return app
+
+def time_requests(client, path, count):
+    started = time.perf_counter()
+    for _ in range(count):
+        response = client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f'{path} returned {response.status_code}')
+    return (time.perf_counter() - started) / count * 1e6
+
+def run(backend, count, kv_url, file_dir):
+    app = make_app(backend, kv_url, file_dir)
+    client = app.test_client()
+    client.get('/login')
+    read_us = time_requests(client, '/read', count)
+    write_us = time_requests(client, '/write', count)
+    stats = getattr(app.session_interface, 'stats', None)
+    return read_us, write_us, stats() if stats else None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--kv-url', help='Use this server instead of the local stand-in.')
+    parser.add_argument('--backend', action='append', choices=SESSION_BACKENDS,
+                        help='Backend to measure (repeatable; default: all).')
+    args = parser.parse_args()
+    backends = args.backend or list(SESSION_BACKENDS)
+
+    server = None
+    kv_url = args.kv_url
+    if 'kv' in backends and not kv_url:
+        server, port = start_background()
+        kv_url = f'redis://127.0.0.1:{port}/0'
+
+    print("BookYourShow Session Overhead Benchmark")
+    print("=" * 50)
+    base_read, base_write, _ = run(None, args.requests, kv_url, None)
+    print(f"Baseline (no session): read {base_read:7.1f} µs   write {base_write:7.1f} µs")
+    print("-" * 50)
+    ok = True
+    with tempfile.TemporaryDirectory() as file_dir:
+        for backend in backends:
+            try:
+                read_us, write_us, stats = run(backend, args.requests, kv_url, file_dir)
+            except Exception as e:
+                print(f"✗ {backend}: {e}")
+                ok = False
+                continue
+            print(f"{backend:<11} +read {read_us - base_read:7.1f} µs   +write {write_us - base_write:7.1f} µs")
+            if stats:
+                details = {key: value for key, value in stats.items() if key != 'backend' and value}
+                print(f"            {details}")
+    print("=" * 50)
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
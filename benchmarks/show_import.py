@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+BookYourShow Show Import Benchmark
+Builds a week of back-to-back shows across the existing screens (a year out,
+so nothing real is in the way), imports it through the bulk scheduler, and
+checks that a second copy of the same week is rejected as overlapping. The
+imported shows are removed afterwards.
+
+Usage: python benchmarks/show_import.py [--shows 5000] [--keep]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from utils.db_helper import execute_query
+from utils.show_schedule import schedule_shows
+
+def build_week(count, buffer_minutes):
+    """``count`` rows packed onto the screens back to back, starting a year from today"""
+    movie = execute_query("SELECT movie_id, duration FROM movies WHERE duration > 0 ORDER BY movie_id LIMIT 1")
+    screens = execute_query("SELECT screen_id FROM screens ORDER BY screen_id")
+    if not movie or not screens:
+        raise RuntimeError('Need at least one movie and one screen')
+    slot = timedelta(minutes=movie[0]['duration'] + buffer_minutes)
+    start = (datetime.now() + timedelta(days=365)).replace(hour=0, minute=0, second=0, microsecond=0)
+    rows = []
+    for i in range(count):
+        screen = screens[i % len(screens)]['screen_id']
+        show_time = start + slot * (i // len(screens))
+        rows.append({'movie_id': movie[0]['movie_id'], 'screen_id': screen,
+                     'show_time': show_time.strftime('%Y-%m-%d %H:%M'), 'price': 250})
+    return rows
+
+def remove_shows(show_ids):
+    for start in range(0, len(show_ids), 1000):
+        chunk = show_ids[start:start + 1000]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        execute_query(f"DELETE FROM show_occupancy WHERE show_id IN ({placeholders})", chunk, fetch=False)
+        execute_query(f"DELETE FROM shows WHERE show_id IN ({placeholders})", chunk, fetch=False)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--shows', type=int, default=5000)
+    parser.add_argument('--keep', action='store_true', help='keep the imported shows')
+    args = parser.parse_args()
+    buffer_minutes = app.config['SHOW_CLEANING_BUFFER_MINUTES']
+
+    print("BookYourShow Show Import Benchmark")
+    print("=" * 50)
+    ok = True
+    with app.app_context():
+        rows = build_week(args.shows, buffer_minutes)
+        print(f"{len(rows)} shows from {rows[0]['show_time']} to {rows[-1]['show_time']}")
+
+        started = time.perf_counter()
+        dry = schedule_shows(rows, buffer_minutes=buffer_minutes, dry_run=True)
+        print(f"  Validate only:   {time.perf_counter() - started:.2f}s ({len(dry['accepted'])} valid)")
+
+        started = time.perf_counter()
+        result = schedule_shows(rows, buffer_minutes=buffer_minutes)
+        print(f"  Import:          {time.perf_counter() - started:.2f}s ({result['inserted']} inserted)")
+        show_ids = [row['show_id'] for row in result['accepted'] if row['show_id']]
+        try:
+            started = time.perf_counter()
+            again = schedule_shows(rows, buffer_minutes=buffer_minutes, mode='valid')
+            print(f"  Re-import:       {time.perf_counter() - started:.2f}s ({len(again['rejected'])} rejected)")
+            show_ids += [row['show_id'] for row in again['accepted'] if row['show_id']]
+
+            if result['inserted'] != len(rows):
+                print(f"✗ Expected {len(rows)} shows imported, got {result['inserted']}: {result['rejected'][:3]}")
+                ok = False
+            elif again['inserted'] or len(again['rejected']) != len(rows):
+                print(f"✗ Re-import should reject every row as overlapping ({again['inserted']} got in)")
+                ok = False
+            else:
+                print("✓ Every row imported once; the duplicate week was rejected")
+        finally:
+            if not args.keep:
+                remove_shows(show_ids)
+    print("=" * 50)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+BookYourShow Template Render Benchmark
+Measures, per template:
+
+* load: compiling it from source, against loading it from the Jinja
+  bytecode cache (what a new worker pays for each template);
+* render: the time per render with synthetic data (a catalog of --movies
+  movies, a movie page with --shows shows), with the fragment cache off and
+  then warm.
+
+It also checks that cached fragments produce exactly the HTML an uncached
+render does. No database is needed: the data is made up in this process.
+
+Usage: python benchmarks/template_render.py [--movies 300] [--shows 40] [--repeat 200]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import render_template
+from jinja2 import FileSystemBytecodeCache
+
+from app import app
+from utils.page_cache import PageCache
+from benchmarks.generate_data import GENRES, TITLE_WORDS
+from benchmarks.load_test import percentile
+
+def sample_movies(count, rng):
+    movies = []
+    for movie_id in range(1, count + 1):
+        movies.append({
+            'movie_id': movie_id,
+            'title': ' '.join(rng.sample(TITLE_WORDS, 2)),
+            'genre': rng.choice(GENRES),
+            'duration': rng.randint(85, 180),
+            'rating': Decimal(f'{rng.uniform(5, 9.5):.1f}'),
+            'release_date': date.today() - timedelta(days=rng.randint(0, 365)),
+            'show_count': rng.randint(0, 30),
+        })
+    return movies
+
+def sample_shows(count, rng):
+    start = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=2)
+    return [{
+        'show_id': show_id,
+        'show_time': start + timedelta(hours=3 * show_id),
+        'price': Decimal(rng.choice([180, 250, 320, 450])),
+        'theater_name': f'Theater {show_id % 8 + 1}',
+        'screen_name': f'Screen {show_id % 4 + 1}',
+        'booked_seats': rng.randint(0, 120),
+        'total_seats': 120,
+    } for show_id in range(1, count + 1)]
+
+def load_times(names):
+    """{template: (compile ms, bytecode load ms)}"""
+    env = app.jinja_env
+    saved = env.bytecode_cache
+    directory = tempfile.mkdtemp(prefix='bys-bytecode-')
+    times = {}
+    try:
+        for name in names:
+            env.bytecode_cache = None
+            env.cache.clear()
+            started = time.perf_counter()
+            env.get_template(name)
+            compiled = time.perf_counter() - started
+
+            env.bytecode_cache = FileSystemBytecodeCache(directory)
+            env.cache.clear()
+            env.get_template(name)  # compiles once more and stores the bytecode
+            env.cache.clear()
+            started = time.perf_counter()
+            env.get_template(name)
+            times[name] = (compiled * 1000, (time.perf_counter() - started) * 1000)
+    finally:
+        env.bytecode_cache = saved
+        env.cache.clear()
+        shutil.rmtree(directory, ignore_errors=True)
+    return times
+
+def render_times(name, context, repeat):
+    """(samples in seconds, last HTML) for ``repeat`` renders"""
+    samples, html = [], None
+    with app.test_request_context('/'):
+        render_template(name, **context)  # first render: load the template, build assets
+        for _ in range(repeat):
+            started = time.perf_counter()
+            html = render_template(name, **context)
+            samples.append(time.perf_counter() - started)
+    return samples, html
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--movies', type=int, default=300, help='movies on the home page')
+    parser.add_argument('--shows', type=int, default=40, help='shows on the movie page')
+    parser.add_argument('--repeat', type=int, default=200, help='renders per measurement')
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    movies = sample_movies(args.movies, rng)
+    pages = {
+        'index.html': {'movies': movies, 'genres': [{'genre': genre} for genre in sorted(GENRES)]},
+        'movie_detail.html': {'movie': movies[0], 'shows': sample_shows(args.shows, rng)},
+        'login.html': {},
+        'register.html': {},
+    }
+
+    print("BookYourShow Template Render Benchmark")
+    print("=" * 50)
+    print(f"{args.movies} movies, {args.shows} shows, {args.repeat} renders each")
+    print()
+    print(f"{'Template':<20}{'Compile ms':>12}{'Bytecode ms':>13}")
+    print("-" * 45)
+    for name, (compiled, loaded) in load_times(pages).items():
+        print(f"{name:<20}{compiled:>12.2f}{loaded:>13.2f}")
+    print()
+
+    env = app.jinja_env
+    cache = env.fragment_cache
+    ok = True
+    print(f"{'Template':<20}{'Fragments':>10}{'Mean ms':>10}{'p95 ms':>10}")
+    print("-" * 50)
+    try:
+        for name, context in pages.items():
+            env.fragment_cache = None
+            plain, expected = render_times(name, context, args.repeat)
+            env.fragment_cache = PageCache(default_ttl=3600, max_entries=args.movies + args.shows + 100)
+            cached, html = render_times(name, context, args.repeat)
+            for label, samples in (('off', plain), ('warm', cached)):
+                print(f"{name:<20}{label:>10}{sum(samples) / len(samples) * 1000:>10.2f}"
+                      f"{percentile(samples, 0.95):>10.2f}")
+            if html != expected:
+                ok = False
+                print(f"✗ {name}: cached fragments changed the HTML")
+    finally:
+        env.fragment_cache = cache
+
+    print("✓ Cached fragments render the same HTML" if ok else "✗ Cached fragments render different HTML")
+    print("=" * 50)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -69,6 +69,27 @@ CREATE TABLE IF NOT EXISTS booking_details (
   FOREIGN KEY (booking_id) REFERENCES bookings(booking_id)
 );
 
+-- Show Seats Table (one row per seat currently sold for a show;
+-- the primary key makes double-selling a seat impossible)
+CREATE TABLE IF NOT EXISTS show_seats (
+  show_id INT NOT NULL,
+  seat_number VARCHAR(10) NOT NULL,
+  booking_id INT NOT NULL,
+  PRIMARY KEY (show_id, seat_number),
+  KEY idx_show_seats_booking (booking_id),
+  FOREIGN KEY (show_id) REFERENCES shows(show_id),
+  FOREIGN KEY (booking_id) REFERENCES bookings(booking_id)
+);
+
+-- Show Occupancy Table (seats sold per show, maintained incrementally so the
+-- capacity check is a single conditional UPDATE)
+CREATE TABLE IF NOT EXISTS show_occupancy (
+  show_id INT PRIMARY KEY,
+  capacity INT NOT NULL,
+  seats_booked INT NOT NULL DEFAULT 0,
+  FOREIGN KEY (show_id) REFERENCES shows(show_id)
+);
+
 -- Payments Table
 CREATE TABLE IF NOT EXISTS payments (
   payment_id INT AUTO_INCREMENT PRIMARY KEY,
@@ -159,6 +180,8 @@ DROP TRIGGER IF EXISTS prevent_overbooking;
 DROP TRIGGER IF EXISTS log_booking_cancellation;
 DROP TRIGGER IF EXISTS log_new_booking;
 DROP TRIGGER IF EXISTS log_cancellation_to_activity_log;
+DROP TRIGGER IF EXISTS release_show_seats;
+DROP TRIGGER IF EXISTS init_show_occupancy;
 
 -- Trigger: update_booking_status_after_payment
 DELIMITER //
@@ -174,31 +197,16 @@ BEGIN
 END //
 DELIMITER ;
 
--- Trigger: Prevent Overbooking
+-- Trigger: Start every new show with an empty occupancy counter
+-- (replaces the old prevent_overbooking trigger, which recounted every sold
+-- seat on each booking_details insert)
 DELIMITER //
-CREATE TRIGGER prevent_overbooking
-BEFORE INSERT ON booking_details
+CREATE TRIGGER init_show_occupancy
+AFTER INSERT ON shows
 FOR EACH ROW
 BEGIN
-  DECLARE booked_count INT DEFAULT 0;
-  DECLARE seat_limit INT DEFAULT 0;
-  DECLARE showid INT;
-
-  SELECT show_id INTO showid FROM bookings WHERE booking_id = NEW.booking_id;
-  SELECT COUNT(*) INTO booked_count 
-  FROM booking_details bd
-  JOIN bookings b ON b.booking_id = bd.booking_id
-  WHERE b.show_id = showid AND b.status = 'confirmed';
-
-  SELECT s.total_seats INTO seat_limit
-  FROM screens s
-  JOIN shows sh ON sh.screen_id = s.screen_id
-  WHERE sh.show_id = showid;
-
-  IF booked_count >= seat_limit THEN
-    SIGNAL SQLSTATE '45000'
-    SET MESSAGE_TEXT = '❌ No seats available for this show!';
-  END IF;
+  INSERT INTO show_occupancy (show_id, capacity, seats_booked)
+  SELECT NEW.show_id, total_seats, 0 FROM screens WHERE screen_id = NEW.screen_id;
 END //
 DELIMITER ;
 
@@ -247,6 +255,25 @@ BEGIN
 END //
 DELIMITER ;
 
+-- Trigger: Free a booking's seats when it is cancelled (user cancellation,
+-- cancel_booking procedure or failed payment)
+DELIMITER //
+CREATE TRIGGER release_show_seats
+AFTER UPDATE ON bookings
+FOR EACH ROW
+BEGIN
+  DECLARE released INT DEFAULT 0;
+
+  IF NEW.status = 'cancelled' AND OLD.status <> 'cancelled' THEN
+    DELETE FROM show_seats WHERE booking_id = NEW.booking_id;
+    SET released = ROW_COUNT();
+
+    UPDATE show_occupancy SET seats_booked = seats_booked - released
+    WHERE show_id = NEW.show_id;
+  END IF;
+END //
+DELIMITER ;
+
 -- Drop existing procedures if they exist
 DROP PROCEDURE IF EXISTS get_full_booking_report;
 DROP PROCEDURE IF EXISTS cancel_booking;
@@ -715,6 +742,19 @@ INSERT INTO booking_details (booking_id, seat_number) VALUES
 -- Booking 8: 3 seats
 (@booking8, 'H1'), (@booking8, 'H2'), (@booking8, 'H3');
 
+-- Mark the seats of confirmed sample bookings as sold
+INSERT IGNORE INTO show_seats (show_id, seat_number, booking_id)
+SELECT b.show_id, bd.seat_number, b.booking_id
+FROM booking_details bd
+JOIN bookings b ON bd.booking_id = b.booking_id
+WHERE b.status = 'confirmed';
+
+-- Bring occupancy counters in line with the sample bookings
+UPDATE show_occupancy o
+JOIN (SELECT show_id, COUNT(*) AS sold FROM show_seats GROUP BY show_id) ss
+  ON ss.show_id = o.show_id
+SET o.seats_booked = ss.sold;
+
 -- ========================================
 -- 8. ADD PAYMENT RECORDS
 -- ========================================
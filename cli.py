@@ -0,0 +1,116 @@
+"""
+BookYourShow maintenance commands
+
+Run with the Flask CLI, e.g.  flask --app app db-migrate
+"""
+
+import os
+import time
+
+import click
+
+from utils.migrations import migrate, migration_status, MigrationError
+from utils.occupancy import reconcile_occupancy
+from utils.revenue import rebuild_revenue
+from utils.templates import precompile_templates
+
+def register_commands(app):
+    """Attach the maintenance commands to the Flask CLI"""
+
+    @app.cli.command('db-migrate')
+    @click.option('--target', help='Stop after this migration version.')
+    @click.option('--dry-run', is_flag=True, help='List pending migrations without applying them.')
+    def db_migrate(target, dry_run):
+        """Apply pending schema migrations from migrations/"""
+        try:
+            applied = migrate(target=target, dry_run=dry_run, log=click.echo)
+        except MigrationError as e:
+            click.echo(f'✗ {e}')
+            raise SystemExit(1)
+        if not applied:
+            click.echo('✓ Database schema is up to date')
+        elif not dry_run:
+            click.echo(f'✓ Applied {len(applied)} migration(s)')
+
+    @app.cli.command('db-status')
+    def db_status():
+        """Show which migrations have been applied"""
+        for migration in migration_status():
+            if migration['applied_at']:
+                state = f"applied {migration['applied_at']:%Y-%m-%d %H:%M}"
+                if migration['modified']:
+                    state += ' (file changed since)'
+            else:
+                state = 'pending'
+            click.echo(f"{migration['version']}  {migration['name']:<40} {state}")
+
+    @app.cli.command('check-occupancy')
+    @click.option('--fix', is_flag=True, help='Rewrite drifted counters from show_seats.')
+    def check_occupancy(fix):
+        """Reconcile show_occupancy counters against show_seats"""
+        drift = reconcile_occupancy(fix=fix)
+        if not drift:
+            click.echo('✓ All occupancy counters match show_seats')
+            return
+        for row in drift:
+            click.echo(
+                f"✗ show {row['show_id']}: counter {row['seats_booked']}/{row['capacity']}, "
+                f"expected {row['expected_booked']}/{row['expected_capacity']}"
+            )
+        if fix:
+            click.echo(f'✓ Repaired {len(drift)} counters')
+        else:
+            click.echo(f'{len(drift)} counters drifted; rerun with --fix to repair')
+            raise SystemExit(1)
+
+    @app.cli.command('rebuild-revenue')
+    @click.option('--since', type=click.DateTime(formats=['%Y-%m-%d']),
+                  help='Only rebuild days on or after this date (default: all).')
+    def rebuild_revenue_command(since):
+        """Recompute the revenue_daily rollup from bookings and payments"""
+        removed, written = rebuild_revenue(since.date() if since else None)
+        click.echo(f'✓ Replaced {removed} rollup rows with {written}')
+
+    @app.cli.command('purge-session-files')
+    @click.option('--all', 'purge_all', is_flag=True, help='Delete every file, not just expired ones.')
+    def purge_session_files(purge_all):
+        """Delete session files left by the filesystem session backend"""
+        directory = app.config.get('SESSION_FILE_DIR') or os.path.join(os.getcwd(), 'flask_session')
+        if not os.path.isdir(directory):
+            click.echo(f'✓ No session directory at {directory}')
+            return
+        cutoff = time.time() - app.config.get('SESSION_IDLE_TIMEOUT', 7200)
+        removed = kept = 0
+        for entry in os.scandir(directory):
+            if not entry.is_file():
+                continue
+            if purge_all or entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+            else:
+                kept += 1
+        click.echo(f'✓ Removed {removed} session files, kept {kept}')
+
+    @app.cli.command('build-assets')
+    @click.option('--clean', is_flag=True, help='Also delete files left by earlier builds.')
+    def build_assets(clean):
+        """Bundle, minify, fingerprint and gzip the CSS/JS under static/"""
+        report = app.assets.build()
+        click.echo(f"{'Bundle':<32} {'Source':>9} {'Minified':>9} {'Gzipped':>9}  File")
+        for bundle, row in sorted(report.items()):
+            click.echo(f"{bundle:<32} {row['source_bytes']:>9} {row['bytes']:>9} {row['gzip_bytes']:>9}  {row['file']}")
+        click.echo(f'✓ Built {len(report)} bundles into {app.assets.output_dir}')
+        if clean:
+            click.echo(f'✓ Removed {app.assets.clean()} files from earlier builds')
+
+    @app.cli.command('precompile-templates')
+    @click.option('--clear', is_flag=True, help='Empty the bytecode cache first and compile everything again.')
+    def precompile_templates_command(clear):
+        """Compile every template into the Jinja bytecode cache"""
+        if app.jinja_env.bytecode_cache is None:
+            click.echo('✗ The bytecode cache is off (TEMPLATE_BYTECODE_DIR is empty or unsafe); nothing to fill')
+            raise SystemExit(1)
+        timings = precompile_templates(app, clear=clear)
+        for name, seconds in sorted(timings.items()):
+            click.echo(f'{name:<40} {seconds * 1000:>8.1f} ms')
+        click.echo(f'✓ {len(timings)} templates ready in {app.jinja_env.bytecode_cache.directory}')
@@ -10,15 +10,127 @@ class Config:
     MYSQL_AUTOCOMMIT = True
     MYSQL_CONNECT_TIMEOUT = 60
     
+    # Connection Pool Configuration
+    DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', 2))
+    DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 20))
+    DB_MAX_CONNECTIONS = int(os.environ.get('DB_MAX_CONNECTIONS', 120))  # all Gunicorn workers together, per server (MySQL's default max_connections is 151)
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))  # seconds to wait for a free connection
+    DB_POOL_RECYCLE_USES = 5000  # reopen a connection after this many checkouts
+    DB_POOL_RECYCLE_SECONDS = 3600  # ...or after it has been open this long
+    DB_POOL_PING_INTERVAL = 0  # ping on borrow if idle at least this long (0 = always)
+    
+    # Read Replicas (see utils/db_replicas.py)
+    DB_REPLICAS = os.environ.get('DB_REPLICAS', '')  # comma-separated host:port list; empty = primary only
+    DB_REPLICA_POOL_MAX_SIZE = None  # per replica (None = DB_POOL_MAX_SIZE)
+    DB_REPLICA_POOL_TIMEOUT = 0.5  # seconds to wait for a replica connection before using the primary
+    DB_REPLICA_MAX_LAG = int(os.environ.get('DB_REPLICA_MAX_LAG', 2))  # seconds behind before a replica is skipped
+    DB_REPLICA_CHECK_INTERVAL = 2.0  # seconds between replication status checks
+    DB_STICKY_PRIMARY_SECONDS = 10  # a session reads from the primary this long after it writes
+    
+    # Query Instrumentation (see utils/metrics.py; exported at /metrics)
+    DB_SLOW_QUERY_SECONDS = float(os.environ.get('DB_SLOW_QUERY_SECONDS', 0.5))  # log statements slower than this
+    DB_N_PLUS_ONE_THRESHOLD = 10  # runs of one statement in a request before it is flagged as N+1
+    METRICS_MAX_STATEMENTS = 500  # distinct normalized statements tracked per worker
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # bearer token a scraper sends for /metrics (admins need none)
+    SERVER_TIMING_HEADER = False  # send Server-Timing to everyone, not only to admins and in debug mode
+    
+    # Async API Tier (async_api.py; see utils/async_db.py)
+    ASYNC_DB_POOL_MIN_SIZE = 2
+    ASYNC_DB_POOL_MAX_SIZE = int(os.environ.get('ASYNC_DB_POOL_MAX_SIZE', 50))  # per async worker process
+    ASYNC_DB_POOL_TIMEOUT = 5.0  # seconds a request waits for a connection before a 503
+    
+    # Seat Availability Index
+    SEAT_INDEX_MAX_SHOWS = 5000  # shows kept in memory before LRU eviction
+    SEAT_INDEX_MAX_AGE = 30  # seconds before a cached show is reloaded from the DB
+    
+    # Seat Holds (checkout reservations)
+    SEAT_HOLD_TTL = 300  # seconds a selection is held before it is released
+    SEAT_HOLD_CACHE_TTL = 2.0  # seconds held seats are cached per show for seat maps
+    SEAT_HOLD_PURGE_INTERVAL = 60  # seconds between sweeps for holds orphaned by other workers
+    
+    # Live Seat Map Streams (Server-Sent Events)
+    SEAT_FEED_MAX_CONNECTIONS = int(os.environ.get('SEAT_FEED_MAX_CONNECTIONS', 0)) or None  # open streams per worker (None = SERVER_THREADS - reserved)
+    SEAT_FEED_RESERVED_THREADS = 4  # request threads per worker that streams may never take
+    SEAT_FEED_MAX_QUEUE = 32  # events a slow client may fall behind before it is resent a snapshot
+    SEAT_FEED_HEARTBEAT = 15  # seconds between keep-alive comments on an idle stream
+    SEAT_FEED_POLL_INTERVAL = 2.0  # seconds between reloads that pick up other workers' changes
+    
+    # Page Cache (home page and movie detail data)
+    PAGE_CACHE_TTL = 60  # seconds; safety net for changes made by other workers
+    PAGE_CACHE_MAX_ENTRIES = 2000
+    
+    # Conditional GET (see utils/versions.py)
+    VERSION_SYNC_INTERVAL = 1.0  # seconds between polls for versions bumped by other workers
+    BUILD_ID = os.environ.get('BUILD_ID')  # release identifier (e.g. git commit) mixed into every ETag
+    
+    # Movie Search Index
+    MOVIE_SEARCH_MAX_AGE = 300  # seconds before the index is rebuilt from the DB
+    MOVIE_SEARCH_PAGE_SIZE = 10
+    MOVIE_SEARCH_MAX_PAGE_SIZE = 100
+    
+    # Admin Listings
+    ADMIN_SHOWS_PAGE_SIZE = 50
+    
+    # Show Scheduling (see utils/show_schedule.py)
+    SHOW_CLEANING_BUFFER_MINUTES = 15  # screen turnaround kept free after each show
+    
     # Flask Configuration
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key-change-in-production'
     
-    # Session Configuration
+    # Password Hashing (see utils/passwords.py)
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')  # any Werkzeug method
+    PASSWORD_HASH_WORKERS = None  # concurrent KDF threads per worker process (None = half the CPUs)
+    PASSWORD_HASH_MAX_PENDING = 64  # logins allowed to queue for a KDF thread
+    PASSWORD_HASH_QUEUE_TIMEOUT = 5.0  # seconds to wait for a slot before answering 503
+    
+    # Audit Log Writer (see utils/audit_log.py)
+    AUDIT_MAX_QUEUE = 10000  # events buffered in memory per worker
+    AUDIT_BATCH_SIZE = 200  # events per multi-row insert
+    AUDIT_FLUSH_INTERVAL = 0.5  # seconds a partial batch waits for more events
+    AUDIT_SPILL_DIR = os.environ.get('AUDIT_SPILL_DIR')  # append-only fallback files (None = disabled)
+    AUDIT_SLOW_FLUSH = 1.0  # seconds; slower batches divert writes to the spill file
+    AUDIT_REPLAY_INTERVAL = 30  # seconds between spill replays into the database
+    
+    # Session Configuration (see utils/sessions.py)
+    SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'cookie')  # cookie, kv or filesystem
+    SESSION_IDLE_TIMEOUT = 2 * 3600  # seconds without a request before a session expires
+    SESSION_REFRESH_INTERVAL = 300  # re-stamp an unchanged session's expiry at most this often
+    SESSION_KV_URL = os.environ.get('SESSION_KV_URL', 'redis://127.0.0.1:6379/0')
+    SESSION_KV_TIMEOUT = 2.0  # seconds
+    SESSION_KV_CACHE_SIZE = 10000  # sessions kept in the per-process LRU
+    SESSION_KV_CACHE_TTL = 5.0  # seconds a cached session is trusted before re-reading it
+    SESSION_KEY_PREFIX = 'bookyourshow:'
+    # Used only by the filesystem backend (Flask-Session)
     SESSION_TYPE = 'filesystem'
     SESSION_PERMANENT = False
     SESSION_USE_SIGNER = True
-    SESSION_KEY_PREFIX = 'bookyourshow:'
+    
+    # Template Rendering (see utils/templates.py; precompile with flask --app app precompile-templates)
+    TEMPLATE_BYTECODE_DIR = os.environ.get('TEMPLATE_BYTECODE_DIR')  # None = instance/jinja-cache; '' disables
+    FRAGMENT_CACHE_TTL = 600  # seconds; keys change with the data, so this only bounds memory
+    FRAGMENT_CACHE_MAX_ENTRIES = 5000  # movie cards and show rows
+    
+    # Static Assets (see utils/assets.py; build with flask --app app build-assets)
+    ASSETS_OUTPUT_DIR = 'static/dist'  # hashed bundles and manifest.json, relative to the app
+    ASSETS_AUTO_BUILD = True  # build on first use if there's no manifest (and on source changes in debug)
+    ASSETS_MAX_AGE = 365 * 24 * 3600  # hashed names never change content, so cache them for a year
+    
+    # Response Compression (see utils/compression.py)
+    COMPRESS_MIN_SIZE = 1024  # bytes; smaller HTML/JSON bodies are sent as they are
+    COMPRESS_LEVEL = 6  # gzip level for on-the-fly compression (bundles are built at level 9)
     
     # Upload Configuration
     UPLOAD_FOLDER = 'static/images'
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
\ No newline at end of file
+    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+    
+    # Production Server (run.py; see utils/warmup.py)
+    SERVER_BIND = os.environ.get('SERVER_BIND', '0.0.0.0:5000')
+    SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', 0)) or None  # worker processes (None = 2 x CPUs + 1)
+    SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 32))  # request threads per worker; each seat map stream holds one
+    SERVER_MAX_REQUESTS = 5000  # recycle a worker after this many requests...
+    SERVER_MAX_REQUESTS_JITTER = 500  # ...plus up to this many, so workers don't all restart together
+    SERVER_TIMEOUT = 60  # seconds a silent worker may go before it is killed and replaced
+    SERVER_GRACEFUL_TIMEOUT = 30  # seconds a stopping worker gets to finish its requests
+    SERVER_KEEPALIVE = 5  # seconds to hold an idle keep-alive connection
+    SERVER_PIDFILE = os.environ.get('SERVER_PIDFILE')  # None = bookyourshow.pid in the app's instance folder
+    SERVER_WARMUP_SHOWS = 50  # upcoming shows whose seat maps a new worker loads before serving
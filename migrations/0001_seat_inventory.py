@@ -0,0 +1,87 @@
+"""Seat inventory tables and triggers for databases created before show_seats existed.
+
+Brings a database loaded from an older bookyourshow_updated.sql up to the
+current seat model: show_seats (no double-selling), show_occupancy counters,
+and the triggers that maintain them in place of prevent_overbooking.
+Already-current databases pass through unchanged.
+"""
+
+def upgrade(cursor):
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS show_seats (
+          show_id INT NOT NULL,
+          seat_number VARCHAR(10) NOT NULL,
+          booking_id INT NOT NULL,
+          PRIMARY KEY (show_id, seat_number),
+          KEY idx_show_seats_booking (booking_id),
+          FOREIGN KEY (show_id) REFERENCES shows(show_id),
+          FOREIGN KEY (booking_id) REFERENCES bookings(booking_id)
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS show_occupancy (
+          show_id INT PRIMARY KEY,
+          capacity INT NOT NULL,
+          seats_booked INT NOT NULL DEFAULT 0,
+          FOREIGN KEY (show_id) REFERENCES shows(show_id)
+        )
+        """
+    )
+
+    cursor.execute("DROP TRIGGER IF EXISTS prevent_overbooking")
+    cursor.execute("DROP TRIGGER IF EXISTS init_show_occupancy")
+    cursor.execute(
+        """
+        CREATE TRIGGER init_show_occupancy
+        AFTER INSERT ON shows
+        FOR EACH ROW
+        BEGIN
+          INSERT INTO show_occupancy (show_id, capacity, seats_booked)
+          SELECT NEW.show_id, total_seats, 0 FROM screens WHERE screen_id = NEW.screen_id;
+        END
+        """
+    )
+    cursor.execute("DROP TRIGGER IF EXISTS release_show_seats")
+    cursor.execute(
+        """
+        CREATE TRIGGER release_show_seats
+        AFTER UPDATE ON bookings
+        FOR EACH ROW
+        BEGIN
+          DECLARE released INT DEFAULT 0;
+
+          IF NEW.status = 'cancelled' AND OLD.status <> 'cancelled' THEN
+            DELETE FROM show_seats WHERE booking_id = NEW.booking_id;
+            SET released = ROW_COUNT();
+
+            UPDATE show_occupancy SET seats_booked = seats_booked - released
+            WHERE show_id = NEW.show_id;
+          END IF;
+        END
+        """
+    )
+
+    # Backfill from existing bookings; earliest booking wins if a seat was double-sold
+    cursor.execute(
+        """
+        INSERT IGNORE INTO show_seats (show_id, seat_number, booking_id)
+        SELECT b.show_id, bd.seat_number, b.booking_id
+        FROM booking_details bd
+        JOIN bookings b ON bd.booking_id = b.booking_id
+        WHERE b.status = 'confirmed'
+        ORDER BY b.booking_id
+        """
+    )
+    cursor.execute(
+        """
+        INSERT INTO show_occupancy (show_id, capacity, seats_booked)
+        SELECT s.show_id, sc.total_seats,
+               (SELECT COUNT(*) FROM show_seats ss WHERE ss.show_id = s.show_id)
+        FROM shows s
+        JOIN screens sc ON s.screen_id = sc.screen_id
+        ON DUPLICATE KEY UPDATE capacity = VALUES(capacity), seats_booked = VALUES(seats_booked)
+        """
+    )
@@ -0,0 +1,24 @@
+"""Indexes for the WHERE/ORDER BY columns of the busiest queries.
+
+- bookings(show_id, status): seat maps and occupancy checks per show
+- bookings(user_id, booking_date): my_bookings, newest first
+- bookings(status, total_amount): dashboard revenue SUM without touching rows
+- shows(movie_id, show_time): upcoming shows per movie (index, movie_detail)
+- shows(show_time): admin shows listing and its keyset pagination
+- activity_log(log_timestamp): dashboard recent activity
+"""
+
+from utils.migrations import add_index
+
+INDEXES = [
+    ('bookings', 'idx_bookings_show_status', ['show_id', 'status']),
+    ('bookings', 'idx_bookings_user_date', ['user_id', 'booking_date']),
+    ('bookings', 'idx_bookings_status_amount', ['status', 'total_amount']),
+    ('shows', 'idx_shows_movie_time', ['movie_id', 'show_time']),
+    ('shows', 'idx_shows_time', ['show_time']),
+    ('activity_log', 'idx_activity_log_timestamp', ['log_timestamp']),
+]
+
+def upgrade(cursor):
+    for table, index, columns in INDEXES:
+        add_index(cursor, table, index, columns)
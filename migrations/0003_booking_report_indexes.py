@@ -0,0 +1,19 @@
+"""Indexes for the keyset-paginated admin booking report.
+
+- bookings(booking_date, booking_id): default report order and date filters
+- bookings(total_amount, booking_id): "top customers" order by amount
+
+booking_id is listed explicitly so the index order matches the report's
+(sort column, booking_id) cursor and no filesort is needed.
+"""
+
+from utils.migrations import add_index
+
+INDEXES = [
+    ('bookings', 'idx_bookings_date_id', ['booking_date', 'booking_id']),
+    ('bookings', 'idx_bookings_amount_id', ['total_amount', 'booking_id']),
+]
+
+def upgrade(cursor):
+    for table, index, columns in INDEXES:
+        add_index(cursor, table, index, columns)
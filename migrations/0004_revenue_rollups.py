@@ -0,0 +1,120 @@
+"""Daily revenue rollup table, the triggers that maintain it, and views over it.
+
+revenue_daily is keyed by (revenue_day, movie_id, screen_id, payment_mode) and
+carries the theater for grouping. A successful payment adds its booking to the
+row for the booking's day; a cancellation moves it from confirmed to cancelled
+on that same row. movie_revenue and theater_revenue_summary are redefined to
+read the rollup, and the table is backfilled from existing bookings.
+"""
+
+from utils.revenue import REBUILD_QUERY, EPOCH
+
+def upgrade(cursor):
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS revenue_daily (
+          revenue_day DATE NOT NULL,
+          movie_id INT NOT NULL,
+          theater_id INT NOT NULL,
+          screen_id INT NOT NULL,
+          payment_mode VARCHAR(10) NOT NULL,
+          confirmed_bookings INT NOT NULL DEFAULT 0,
+          cancelled_bookings INT NOT NULL DEFAULT 0,
+          seats INT NOT NULL DEFAULT 0,
+          revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+          PRIMARY KEY (revenue_day, movie_id, screen_id, payment_mode),
+          KEY idx_revenue_daily_movie (movie_id),
+          KEY idx_revenue_daily_theater (theater_id)
+        )
+        """
+    )
+
+    cursor.execute("DROP TRIGGER IF EXISTS rollup_payment_revenue")
+    cursor.execute(
+        """
+        CREATE TRIGGER rollup_payment_revenue
+        AFTER INSERT ON payments
+        FOR EACH ROW
+        BEGIN
+          IF NEW.payment_status = 'success' THEN
+            INSERT INTO revenue_daily (revenue_day, movie_id, theater_id, screen_id, payment_mode,
+                                       confirmed_bookings, cancelled_bookings, seats, revenue)
+            SELECT DATE(b.booking_date), s.movie_id, sc.theater_id, s.screen_id,
+                   COALESCE(NEW.payment_mode, 'none'), 1, 0,
+                   (SELECT COUNT(*) FROM booking_details bd WHERE bd.booking_id = b.booking_id),
+                   b.total_amount
+            FROM bookings b
+            JOIN shows s ON b.show_id = s.show_id
+            JOIN screens sc ON s.screen_id = sc.screen_id
+            WHERE b.booking_id = NEW.booking_id AND b.status = 'confirmed'
+            ON DUPLICATE KEY UPDATE
+              confirmed_bookings = confirmed_bookings + 1,
+              seats = seats + VALUES(seats),
+              revenue = revenue + VALUES(revenue);
+          END IF;
+        END
+        """
+    )
+
+    cursor.execute("DROP TRIGGER IF EXISTS rollup_booking_cancellation")
+    cursor.execute(
+        """
+        CREATE TRIGGER rollup_booking_cancellation
+        AFTER UPDATE ON bookings
+        FOR EACH ROW
+        BEGIN
+          DECLARE paid INT DEFAULT 0;
+          DECLARE pay_mode VARCHAR(10);
+
+          IF NEW.status = 'cancelled' AND OLD.status <> 'cancelled' THEN
+            SET paid = EXISTS(SELECT 1 FROM payments
+                              WHERE booking_id = NEW.booking_id AND payment_status = 'success');
+            SET pay_mode = COALESCE((SELECT payment_mode FROM payments WHERE booking_id = NEW.booking_id
+                                 ORDER BY payment_status = 'success' DESC LIMIT 1), 'none');
+
+            INSERT INTO revenue_daily (revenue_day, movie_id, theater_id, screen_id, payment_mode,
+                                       confirmed_bookings, cancelled_bookings, seats, revenue)
+            SELECT DATE(NEW.booking_date), s.movie_id, sc.theater_id, s.screen_id, pay_mode,
+                   -paid, 1,
+                   IF(paid, -(SELECT COUNT(*) FROM booking_details WHERE booking_id = NEW.booking_id), 0),
+                   IF(paid, -NEW.total_amount, 0)
+            FROM shows s
+            JOIN screens sc ON s.screen_id = sc.screen_id
+            WHERE s.show_id = NEW.show_id
+            ON DUPLICATE KEY UPDATE
+              confirmed_bookings = confirmed_bookings + VALUES(confirmed_bookings),
+              cancelled_bookings = cancelled_bookings + 1,
+              seats = seats + VALUES(seats),
+              revenue = revenue + VALUES(revenue);
+          END IF;
+        END
+        """
+    )
+
+    cursor.execute(
+        """
+        CREATE OR REPLACE VIEW movie_revenue AS
+        SELECT m.title,
+               SUM(r.confirmed_bookings) AS total_bookings,
+               SUM(r.revenue) AS total_revenue
+        FROM revenue_daily r
+        JOIN movies m ON r.movie_id = m.movie_id
+        GROUP BY m.title
+        HAVING SUM(r.confirmed_bookings) > 0
+        """
+    )
+    cursor.execute(
+        """
+        CREATE OR REPLACE VIEW theater_revenue_summary AS
+        SELECT t.name AS TheaterName,
+               SUM(r.revenue) AS TotalRevenue,
+               SUM(r.confirmed_bookings) AS TotalBookings
+        FROM revenue_daily r
+        JOIN theaters t ON r.theater_id = t.theater_id
+        GROUP BY t.theater_id, t.name
+        HAVING SUM(r.confirmed_bookings) > 0
+        """
+    )
+
+    cursor.execute("DELETE FROM revenue_daily")
+    cursor.execute(REBUILD_QUERY, (EPOCH,))
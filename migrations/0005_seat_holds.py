@@ -0,0 +1,25 @@
+"""Seat holds taken during checkout.
+
+One row per held seat; the (show_id, seat_number) primary key means a seat
+can be held by only one checkout at a time. expires_at is indexed so lapsed
+holds are purged with a range delete, and (hold_token, show_id) lets a hold be
+renewed, released or converted without touching other customers' rows.
+"""
+
+def upgrade(cursor):
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS seat_holds (
+          show_id INT NOT NULL,
+          seat_number VARCHAR(10) NOT NULL,
+          hold_token CHAR(32) NOT NULL,
+          user_id INT NOT NULL,
+          expires_at DATETIME(3) NOT NULL,
+          PRIMARY KEY (show_id, seat_number),
+          KEY idx_seat_holds_token (hold_token, show_id),
+          KEY idx_seat_holds_expiry (expires_at),
+          FOREIGN KEY (show_id) REFERENCES shows(show_id),
+          FOREIGN KEY (user_id) REFERENCES users(user_id)
+        )
+        """
+    )
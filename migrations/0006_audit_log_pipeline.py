@@ -0,0 +1,46 @@
+"""Move audit logging out of the booking triggers and into the app's batched writer.
+
+log_new_booking and log_booking_cancellation are dropped: the app now queues
+those events itself (utils/audit_log.py), and the cancellation trigger was
+logging every app cancellation a second time. activity_log and
+cancellations_log get a unique event_id so a batch that is retried, or
+replayed from the spill file, never inserts an event twice.
+
+The cancel_booking procedure has no app code around it, so it now writes its
+own log rows, once, when it actually changes a booking.
+"""
+
+from utils.migrations import add_index, column_exists
+
+def upgrade(cursor):
+    cursor.execute("DROP TRIGGER IF EXISTS log_new_booking")
+    cursor.execute("DROP TRIGGER IF EXISTS log_booking_cancellation")
+
+    for table in ('activity_log', 'cancellations_log'):
+        if not column_exists(cursor, table, 'event_id'):
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN event_id CHAR(32) NULL")
+        add_index(cursor, table, f'uq_{table}_event', ['event_id'], unique=True)
+
+    cursor.execute("DROP PROCEDURE IF EXISTS cancel_booking")
+    cursor.execute(
+        """
+        CREATE PROCEDURE cancel_booking(IN p_booking_id INT)
+        BEGIN
+          UPDATE bookings SET status = 'cancelled'
+          WHERE booking_id = p_booking_id AND status <> 'cancelled';
+
+          IF ROW_COUNT() > 0 THEN
+            INSERT INTO cancellations_log (booking_id, user_id, reason)
+            SELECT booking_id, user_id, 'Cancelled by administrator'
+            FROM bookings WHERE booking_id = p_booking_id;
+
+            INSERT INTO activity_log (user_id, booking_id, activity_type, details)
+            SELECT b.user_id, b.booking_id, 'CANCELLED_BOOKING', CONCAT('Cancelled: ', m.title)
+            FROM bookings b
+            JOIN shows s ON b.show_id = s.show_id
+            JOIN movies m ON s.movie_id = m.movie_id
+            WHERE b.booking_id = p_booking_id;
+          END IF;
+        END
+        """
+    )
@@ -0,0 +1,19 @@
+"""Version counters behind the ETag and Last-Modified headers (utils/versions.py).
+
+One row per entity that has changed at least once: ``catalog``,
+``movie:<id>`` or ``show:<id>``. A write bumps the version and stamps
+updated_at. Each worker polls for rows with a recent updated_at, hence the
+index on it.
+"""
+
+def upgrade(cursor):
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS entity_versions (
+          entity VARCHAR(64) NOT NULL PRIMARY KEY,
+          version BIGINT UNSIGNED NOT NULL,
+          updated_at DATETIME(3) NOT NULL,
+          KEY idx_entity_versions_updated (updated_at)
+        )
+        """
+    )
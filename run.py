@@ -1,40 +1,223 @@
 #!/usr/bin/env python3
 """
 BookYourShow Application Launcher
+
+    python run.py                 production: pre-fork Gunicorn server (SERVER_* settings)
+    python run.py --debug         development: Flask server with debugger and auto-reload
+    python run.py --dev-server    Flask's threaded server without the debugger
+    python run.py --reload        restart the running server's workers one by one (SIGHUP)
+    python run.py --upgrade       switch the running server to the code on disk (SIGUSR2)
+
+The production server loads the app once in the master process, then forks
+the workers. Each worker runs utils/warmup.py before it accepts connections,
+and is replaced after SERVER_MAX_REQUESTS requests. --reload and --upgrade
+never close the listening socket, so no request is refused while they run.
+
+Every worker has its own connection pool (and one per read replica), so the
+database sees workers x DB_POOL_MAX_SIZE connections. The server shrinks
+each worker's pools so all workers together stay within DB_MAX_CONNECTIONS.
+Keep that below MySQL's max_connections, leaving room for the async tier's
+ASYNC_DB_POOL_MAX_SIZE per process, cron jobs, and the second server that
+runs for a while during --upgrade.
 """
 
+import argparse
 import os
+import signal
 import sys
+import threading
+import time
 from app import app
+from utils.warmup import warm_worker
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # Gunicorn doesn't run on Windows
+    BaseApplication = None
+
+if BaseApplication is not None:
+    class ProductionServer(BaseApplication):
+        """Gunicorn serving the already-imported ``app`` with the given settings"""
+
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+def post_worker_init(worker):
+    """Gunicorn hook: runs in each new worker before it takes requests"""
+    timings = warm_worker(app, show_limit=app.config['SERVER_WARMUP_SHOWS'])
+    app.logger.info('Worker %s warmed up: %s', os.getpid(), timings)
+    threading.Thread(target=close_streams_on_exit, args=(worker,), name='stream-closer', daemon=True).start()
+
+def close_streams_on_exit(worker):
+    """End open seat map streams once the worker starts stopping (signal or SERVER_MAX_REQUESTS).
+
+    They never finish by themselves, so the worker would otherwise wait the
+    whole SERVER_GRACEFUL_TIMEOUT for them.
+    """
+    while worker.alive:
+        time.sleep(0.5)
+    app.seat_feeds.close()
+
+def worker_exit(server, worker):
+    """Gunicorn hook: a recycled or stopping worker writes out its queued audit events"""
+    app.audit_log.close()
+
+def default_pidfile():
+    """SERVER_PIDFILE, else a pidfile in the instance folder; never a guessable path in shared /tmp"""
+    if app.config['SERVER_PIDFILE']:
+        return app.config['SERVER_PIDFILE']
+    os.makedirs(app.instance_path, mode=0o700, exist_ok=True)
+    return os.path.join(app.instance_path, 'bookyourshow.pid')
+
+def fit_connection_budget(workers):
+    """Shrink each worker's pools so ``workers`` of them stay within DB_MAX_CONNECTIONS; returns the pool size"""
+    per_worker = max(app.config['DB_MAX_CONNECTIONS'] // workers, 1)
+    for pool in [app.db_pool] + [replica.pool for replica in app.db_replicas.replicas]:
+        if pool.max_size > per_worker:
+            pool.max_size = per_worker  # before the fork: no connection is open yet
+            pool.min_size = min(pool.min_size, per_worker)
+    return per_worker
+
+def server_options(config, bind, workers=None, threads=None):
+    workers = workers or config['SERVER_WORKERS'] or (os.cpu_count() or 1) * 2 + 1
+    threads = threads or config['SERVER_THREADS']
+    return {
+        'bind': bind,
+        'workers': workers,
+        'threads': threads,
+        'worker_class': 'gthread' if threads > 1 else 'sync',
+        'preload_app': True,  # import once in the master; workers share its memory copy-on-write
+        'max_requests': config['SERVER_MAX_REQUESTS'],
+        'max_requests_jitter': config['SERVER_MAX_REQUESTS_JITTER'],
+        'timeout': config['SERVER_TIMEOUT'],
+        'graceful_timeout': config['SERVER_GRACEFUL_TIMEOUT'],
+        'keepalive': config['SERVER_KEEPALIVE'],
+        'pidfile': default_pidfile(),
+        'post_worker_init': post_worker_init,
+        'worker_exit': worker_exit,
+    }
+
+def read_pid(pidfile):
+    try:
+        with open(pidfile) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+def reload_workers(pidfile):
+    """Ask the master to start fresh workers and retire the old ones gracefully"""
+    pid = read_pid(pidfile)
+    if pid is None:
+        print(f"❌ No running server found ({pidfile})")
+        sys.exit(1)
+    os.kill(pid, signal.SIGHUP)
+    print(f"🔄 Workers of server {pid} are being replaced")
+
+def upgrade_server(pidfile, wait):
+    """Start a new master on the current code, then stop the old one once its workers are up"""
+    old_pid = read_pid(pidfile)
+    if old_pid is None:
+        print(f"❌ No running server found ({pidfile})")
+        sys.exit(1)
+    os.kill(old_pid, signal.SIGUSR2)
+    deadline = time.monotonic() + 60
+    new_pid = None
+    while time.monotonic() < deadline:
+        # The new master writes the pidfile once it has started; the old one's moves to .oldbin
+        new_pid = read_pid(pidfile)
+        if new_pid and new_pid != old_pid:
+            break
+        time.sleep(0.5)
+    else:
+        print(f"❌ No new server started within 60s; {old_pid} keeps serving")
+        sys.exit(1)
+    print(f"🚀 New server {new_pid} started; letting its workers warm up for {wait}s")
+    time.sleep(wait)
+    os.kill(old_pid, signal.SIGTERM)  # graceful: in-flight requests finish
+    print(f"👋 Old server {old_pid} is shutting down")
 
 def main():
     """Launch the BookYourShow application"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--debug', action='store_true', help='Flask debug server with auto-reload')
+    parser.add_argument('--dev-server', action='store_true', help="Flask's built-in threaded server")
+    parser.add_argument('--bind', default=app.config['SERVER_BIND'], help='host:port to listen on')
+    parser.add_argument('--workers', type=int, help='worker processes (default SERVER_WORKERS)')
+    parser.add_argument('--threads', type=int, help='threads per worker (default SERVER_THREADS)')
+    parser.add_argument('--reload', action='store_true', help='gracefully replace the running workers')
+    parser.add_argument('--upgrade', action='store_true', help='restart the running server on new code')
+    parser.add_argument('--wait', type=float, default=10, help='seconds --upgrade waits before stopping the old server')
+    args = parser.parse_args()
+
+    pidfile = default_pidfile()
+    if args.reload:
+        return reload_workers(pidfile)
+    if args.upgrade:
+        return upgrade_server(pidfile, args.wait)
+
     print("🎬 Starting BookYourShow Application...")
     print("=" * 50)
-    
+
     # Check if running in development mode
-    debug_mode = os.environ.get('FLASK_ENV') == 'development' or '--debug' in sys.argv
-    
+    debug_mode = os.environ.get('FLASK_ENV') == 'development' or args.debug
+    dev_server = debug_mode or args.dev_server
+    if not dev_server and BaseApplication is None:
+        print("⚠️  Gunicorn is not available here; falling back to the Flask server")
+        dev_server = True
+    host, _, port = args.bind.rpartition(':')
+
     if debug_mode:
         print("🔧 Running in DEBUG mode")
         print("📝 Auto-reload enabled")
+    elif dev_server:
+        print("🧪 Running on the Flask development server")
     else:
+        options = server_options(app.config, args.bind, args.workers, args.threads)
+        if not app.config['SEAT_FEED_MAX_CONNECTIONS']:
+            app.seat_feeds.fit_threads(options['threads'])  # --threads may differ from SERVER_THREADS
+        fit_connection_budget(options['workers'])
+        pool_size = app.db_pool.max_size
         print("🚀 Running in PRODUCTION mode")
-    
-    print(f"🌐 Server will start at: http://localhost:5000")
+        print(f"⚙️  {options['workers']} workers x {options['threads']} threads "
+              f"({app.seat_feeds.max_connections} for seat map streams), "
+              f"recycled after ~{options['max_requests']} requests")
+        print(f"🗄️  {pool_size} database connections per worker, "
+              f"{pool_size * options['workers']} in all (DB_MAX_CONNECTIONS={app.config['DB_MAX_CONNECTIONS']})")
+        if pool_size * options['workers'] > app.config['DB_MAX_CONNECTIONS']:
+            print("⚠️  More workers than DB_MAX_CONNECTIONS allows one connection each; "
+                  "lower --workers or raise DB_MAX_CONNECTIONS")
+        if options['threads'] - app.seat_feeds.max_connections > pool_size:
+            print(f"⚠️  Up to {options['threads'] - app.seat_feeds.max_connections} request threads per worker "
+                  f"share {pool_size} connections; the rest wait up to DB_POOL_TIMEOUT")
+        print("🔄 Reload: python run.py --reload   Deploy: python run.py --upgrade")
+
+    print(f"🌐 Server will start at: http://localhost:{port}")
     print("📧 Admin Login: admin@bys.com / secret")
     print("👤 Customer Login: rajesh.k@email.com / pass123")
     print("=" * 50)
     print("Press Ctrl+C to stop the server")
     print()
-    
+
     try:
-        app.run(
-            host='0.0.0.0',
-            port=5000,
-            debug=debug_mode,
-            use_reloader=debug_mode
-        )
+        if dev_server:
+            app.run(
+                host=host or '0.0.0.0',
+                port=int(port),
+                debug=debug_mode,
+                use_reloader=debug_mode,
+                threaded=True
+            )
+        else:
+            ProductionServer(app, options).run()
     except KeyboardInterrupt:
         print("\n👋 BookYourShow server stopped. Goodbye!")
     except Exception as e:
@@ -42,4 +225,4 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
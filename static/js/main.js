@@ -66,78 +66,100 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
-    // Movie search functionality
+    // Movie search: query the search API as the user types instead of scanning the DOM
     const searchInput = document.getElementById('search');
-    if (searchInput) {
-        let searchTimeout;
-        searchInput.addEventListener('input', function() {
-            clearTimeout(searchTimeout);
-            searchTimeout = setTimeout(function() {
-                filterMovies();
-            }, 300);
-        });
-    }
-
-    // Genre and rating filters
     const genreSelect = document.getElementById('genre');
     const ratingSelect = document.getElementById('rating');
     
-    if (genreSelect) {
-        genreSelect.addEventListener('change', filterMovies);
-    }
-    
-    if (ratingSelect) {
-        ratingSelect.addEventListener('change', filterMovies);
+    if (searchInput && document.getElementById('moviesGrid')) {
+        searchInput.addEventListener('input', debounce(filterMovies, 250));
+        
+        if (genreSelect) {
+            genreSelect.addEventListener('change', filterMovies);
+        }
+        
+        if (ratingSelect) {
+            ratingSelect.addEventListener('change', filterMovies);
+        }
+        
+        // Apply filters carried in the URL (the form submits with GET)
+        if (searchInput.value || genreSelect?.value || ratingSelect?.value) {
+            filterMovies();
+        }
     }
 });
 
+// Run fn only once calls have stopped for `wait` ms
+function debounce(fn, wait) {
+    let timeout;
+    return function(...args) {
+        clearTimeout(timeout);
+        timeout = setTimeout(() => fn.apply(this, args), wait);
+    };
+}
+
 // Movie filtering function
+let movieSearchController = null;
+
 function filterMovies() {
-    const searchTerm = document.getElementById('search')?.value.toLowerCase() || '';
-    const selectedGenre = document.getElementById('genre')?.value || '';
-    const selectedRating = document.getElementById('rating')?.value || '';
+    const params = new URLSearchParams({
+        q: document.getElementById('search')?.value || '',
+        genre: document.getElementById('genre')?.value || '',
+        rating: document.getElementById('rating')?.value || '',
+        limit: 100
+    });
     
-    const movieCards = document.querySelectorAll('.movie-card');
+    // Only the latest keystroke's results matter
+    if (movieSearchController) {
+        movieSearchController.abort();
+    }
+    movieSearchController = new AbortController();
     
-    movieCards.forEach(function(card) {
-        const title = card.querySelector('.card-title')?.textContent.toLowerCase() || '';
-        const genre = card.querySelector('.card-text')?.textContent.toLowerCase() || '';
-        const ratingBadge = card.querySelector('.movie-rating .badge')?.textContent || '';
-        const rating = parseFloat(ratingBadge.replace('★', '').trim()) || 0;
-        
-        let showCard = true;
-        
-        // Search filter
-        if (searchTerm && !title.includes(searchTerm)) {
-            showCard = false;
-        }
-        
-        // Genre filter
-        if (selectedGenre && !genre.includes(selectedGenre.toLowerCase())) {
-            showCard = false;
-        }
-        
-        // Rating filter
-        if (selectedRating && rating < parseFloat(selectedRating)) {
-            showCard = false;
-        }
-        
-        // Show/hide card with animation
-        if (showCard) {
-            card.style.display = 'block';
-            card.classList.add('fade-in-up');
-        } else {
-            card.style.display = 'none';
-            card.classList.remove('fade-in-up');
-        }
+    fetch(`/api/movies/search?${params}`, { signal: movieSearchController.signal })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                showMovieResults(data.movies);
+            }
+        })
+        .catch(error => {
+            if (error.name !== 'AbortError') {
+                console.error('Movie search failed:', error);
+            }
+        });
+}
+
+// Show the cards the API matched, best match first
+function showMovieResults(movies) {
+    const grid = document.getElementById('moviesGrid');
+    const rank = new Map(movies.map((movie, position) => [String(movie.movie_id), position]));
+    const cards = Array.from(grid.querySelectorAll('[data-movie-id]'));
+    
+    cards.forEach(function(card) {
+        const visible = rank.has(card.dataset.movieId);
+        card.style.display = visible ? '' : 'none';
+        card.querySelector('.movie-card')?.classList.toggle('fade-in-up', visible);
     });
+    cards.filter(card => rank.has(card.dataset.movieId))
+        .sort((a, b) => rank.get(a.dataset.movieId) - rank.get(b.dataset.movieId))
+        .forEach(card => grid.appendChild(card));
+    
+    // Typeahead suggestions for the search box
+    const suggestions = document.getElementById('movieSuggestions');
+    if (suggestions) {
+        suggestions.innerHTML = '';
+        movies.slice(0, 8).forEach(function(movie) {
+            const option = document.createElement('option');
+            option.value = movie.title;
+            suggestions.appendChild(option);
+        });
+    }
     
     // Show "no results" message if no cards are visible
-    const visibleCards = document.querySelectorAll('.movie-card[style*="block"]');
+    const anyVisible = cards.some(card => rank.has(card.dataset.movieId));
     const noResultsMsg = document.getElementById('no-results-message');
     
-    if (visibleCards.length === 0 && !noResultsMsg) {
-        const container = document.querySelector('.row');
+    if (!anyVisible && !noResultsMsg) {
         const message = document.createElement('div');
         message.id = 'no-results-message';
         message.className = 'col-12 text-center py-5';
@@ -146,8 +168,8 @@ function filterMovies() {
             <h3 class="text-muted">No movies found</h3>
             <p class="text-muted">Try adjusting your search criteria</p>
         `;
-        container.appendChild(message);
-    } else if (visibleCards.length > 0 && noResultsMsg) {
+        grid.appendChild(message);
+    } else if (anyVisible && noResultsMsg) {
         noResultsMsg.remove();
     }
 }
@@ -0,0 +1,82 @@
+document.addEventListener('DOMContentLoaded', function () {
+    // Form validation
+    const form = document.querySelector('.needs-validation');
+
+    // Real-time preview updates
+    const titleInput = document.getElementById('title');
+    const genreSelect = document.getElementById('genre');
+    const durationInput = document.getElementById('duration');
+    const ratingInput = document.getElementById('rating');
+    const releaseDateInput = document.getElementById('release_date');
+    const descriptionInput = document.getElementById('description');
+    const posterInput = document.getElementById('poster');
+
+    // Preview elements
+    const titlePreview = document.getElementById('titlePreview');
+    const genrePreview = document.getElementById('genrePreview');
+    const durationPreview = document.getElementById('durationPreview');
+    const ratingPreview = document.getElementById('ratingPreview');
+    const releaseDatePreview = document.getElementById('releaseDatePreview');
+    const descriptionPreview = document.getElementById('descriptionPreview');
+    const posterPreview = document.getElementById('posterPreview');
+
+    // Update preview functions
+    titleInput.addEventListener('input', function () {
+        titlePreview.textContent = this.value || 'Movie Title';
+    });
+
+    genreSelect.addEventListener('change', function () {
+        genrePreview.textContent = this.value || 'Genre';
+    });
+
+    durationInput.addEventListener('input', function () {
+        durationPreview.textContent = this.value || '0';
+    });
+
+    ratingInput.addEventListener('input', function () {
+        ratingPreview.textContent = this.value || '0';
+    });
+
+    releaseDateInput.addEventListener('change', function () {
+        if (this.value) {
+            const date = new Date(this.value);
+            releaseDatePreview.textContent = date.toLocaleDateString('en-US', {
+                year: 'numeric',
+                month: 'long',
+                day: 'numeric'
+            });
+        } else {
+            releaseDatePreview.textContent = 'Not set';
+        }
+    });
+
+    descriptionInput.addEventListener('input', function () {
+        descriptionPreview.textContent = this.value || 'No description provided.';
+    });
+
+    // Poster preview
+    posterInput.addEventListener('change', function () {
+        const file = this.files[0];
+        if (file) {
+            const reader = new FileReader();
+            reader.onload = function (e) {
+                posterPreview.src = e.target.result;
+            };
+            reader.readAsDataURL(file);
+        }
+    });
+
+    // Form submission
+    form.addEventListener('submit', function (event) {
+        if (!form.checkValidity()) {
+            event.preventDefault();
+            event.stopPropagation();
+        }
+        form.classList.add('was-validated');
+    });
+
+    // Set default release date to today
+    const today = new Date().toISOString().split('T')[0];
+    releaseDateInput.value = today;
+    releaseDateInput.dispatchEvent(new Event('change'));
+});
@@ -0,0 +1,79 @@
+document.addEventListener('DOMContentLoaded', function () {
+    // Form validation
+    const form = document.querySelector('.needs-validation');
+
+    // Set minimum date to today
+    const today = new Date().toISOString().split('T')[0];
+    const showDateInput = document.getElementById('show_date');
+    showDateInput.min = today;
+    showDateInput.value = today;
+
+    // Form elements for preview
+    const movieSelect = document.getElementById('movie_id');
+    const screenSelect = document.getElementById('screen_id');
+    const showDate = document.getElementById('show_date');
+    const showTime = document.getElementById('show_time');
+    const priceInput = document.getElementById('price');
+    const previewDiv = document.getElementById('showPreview');
+
+    // Update preview when form changes
+    [movieSelect, screenSelect, showDate, showTime, priceInput].forEach(element => {
+        element.addEventListener('change', updatePreview);
+    });
+
+    function updatePreview() {
+        const movie = movieSelect.options[movieSelect.selectedIndex]?.text || 'No movie selected';
+        const screen = screenSelect.options[screenSelect.selectedIndex]?.text || 'No screen selected';
+        const date = showDate.value ? new Date(showDate.value).toLocaleDateString() : 'No date selected';
+        const time = showTime.options[showTime.selectedIndex]?.text || 'No time selected';
+        const price = priceInput.value ? `₹${priceInput.value}` : 'No price set';
+
+        previewDiv.innerHTML = `
+        <div class="row">
+            <div class="col-md-6">
+                <p><strong>Movie:</strong> ${movie}</p>
+                <p><strong>Screen:</strong> ${screen}</p>
+            </div>
+            <div class="col-md-6">
+                <p><strong>Date & Time:</strong> ${date} at ${time}</p>
+                <p><strong>Ticket Price:</strong> ${price}</p>
+            </div>
+        </div>
+    `;
+    }
+
+    // Form submission
+    form.addEventListener('submit', function (event) {
+        // Combine date and time for datetime field
+        const dateValue = showDate.value;
+        const timeValue = showTime.value;
+
+        if (dateValue && timeValue) {
+            const datetime = `${dateValue} ${timeValue}:00`;
+
+            // Create hidden input for combined datetime
+            const hiddenInput = document.createElement('input');
+            hiddenInput.type = 'hidden';
+            hiddenInput.name = 'show_time';
+            hiddenInput.value = datetime;
+            form.appendChild(hiddenInput);
+
+            // Remove the original show_time select to avoid conflict
+            showTime.name = '';
+        }
+
+        if (!form.checkValidity()) {
+            event.preventDefault();
+            event.stopPropagation();
+        }
+        form.classList.add('was-validated');
+    });
+
+    // Initial preview update
+    updatePreview();
+});
+
+function setPrice(amount) {
+    document.getElementById('price').value = amount;
+    document.getElementById('price').dispatchEvent(new Event('change'));
+}
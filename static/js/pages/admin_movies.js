@@ -0,0 +1,39 @@
+let movieToDelete = null;
+
+function editMovie(movieId) {
+    // In a real application, this would open an edit form
+    alert(`Edit functionality for movie ID ${movieId} will be implemented in the next version.`);
+}
+
+function deleteMovie(movieId, movieTitle) {
+    movieToDelete = movieId;
+    document.getElementById('movieTitle').textContent = movieTitle;
+
+    const modal = new bootstrap.Modal(document.getElementById('deleteModal'));
+    modal.show();
+}
+
+document.getElementById('confirmDelete').addEventListener('click', function () {
+    if (movieToDelete) {
+        // In a real application, this would make an AJAX call to delete the movie
+        alert(`Movie ID ${movieToDelete} would be deleted. This functionality will be implemented in the next version.`);
+
+        const modal = bootstrap.Modal.getInstance(document.getElementById('deleteModal'));
+        modal.hide();
+        movieToDelete = null;
+    }
+});
+
+// Initialize DataTable if available
+document.addEventListener('DOMContentLoaded', function () {
+    const table = document.getElementById('moviesTable');
+    if (table && typeof DataTable !== 'undefined') {
+        new DataTable(table, {
+            pageLength: 25,
+            order: [[0, 'desc']],
+            columnDefs: [
+                { orderable: false, targets: [6] } // Actions column
+            ]
+        });
+    }
+});
@@ -0,0 +1,116 @@
+// Per-page values come from the JSON block in admin/reports.html; this file is cached
+const reportsConfig = JSON.parse(document.getElementById('reportsConfig').textContent);
+
+// Exports stream the whole report from the server, honouring the booking date filters
+const exportNames = {
+    'booking-report': 'bookings',
+    'movie-revenue': 'movie_revenue',
+    'theater-revenue': 'theater_revenue_summary',
+    'customer-summary': 'customer_booking_summary'
+};
+
+function exportReport(format, gzip) {
+    const activeTab = document.querySelector('.tab-pane.active').id;
+    const params = new URLSearchParams({ format: format });
+    ['date_from', 'date_to'].forEach(name => {
+        const value = document.getElementById(name).value;
+        if (value) {
+            params.set(name, value);
+        }
+    });
+    if (gzip) {
+        params.set('gzip', '1');
+    }
+    const base = reportsConfig.exportUrl.replace('__report__', exportNames[activeTab]);
+    window.location = base + '?' + params.toString();
+}
+
+// Booking tables page through /api/admin/reports/bookings. Each response
+// carries a cursor for the next page, which is sent back so the server can
+// resume from the last row instead of counting past every earlier one.
+function bookingReportTable(selector, columns, options) {
+    const cursors = {};
+    let signature = null;
+
+    return $(selector).DataTable(Object.assign({
+        serverSide: true,
+        processing: true,
+        searchDelay: 400,
+        pagingType: 'simple',
+        pageLength: 25,
+        columns: columns,
+        ajax: {
+            url: reportsConfig.bookingReportUrl,
+            data: function (d) {
+                if (options && options.filters) {
+                    Object.assign(d, options.filters());
+                }
+                const current = JSON.stringify([d.order, d.search.value, d.length,
+                    options && options.filters ? options.filters() : null]);
+                if (current !== signature) {
+                    signature = current;
+                    Object.keys(cursors).forEach(key => delete cursors[key]);
+                }
+                if (cursors[d.start]) {
+                    d.cursor = cursors[d.start];
+                }
+            },
+            dataSrc: function (json) {
+                if (json.cursor) {
+                    cursors[json.cursorStart] = json.cursor;
+                }
+                return json.data;
+            }
+        }
+    }, options && options.table));
+}
+
+const text = $.fn.dataTable.render.text();
+const amount = data => '<span class="text-success">₹' + Math.round(data) + '</span>';
+const status = data => '<span class="badge bg-' + (data === 'confirmed' ? 'success' : 'danger') + '">' +
+    data.charAt(0).toUpperCase() + data.slice(1) + '</span>';
+
+function bookingFilters() {
+    const form = document.getElementById('bookingFilters');
+    return Object.fromEntries(new FormData(form).entries());
+}
+
+document.addEventListener('DOMContentLoaded', function () {
+    const bookingTable = bookingReportTable('#bookingTable', [
+        { data: 'booking_id' },
+        { data: 'Customer', render: text },
+        { data: 'Movie', render: text },
+        { data: 'Theater', render: text },
+        { data: 'ShowTime' },
+        { data: 'BookedOn' },
+        { data: 'Amount', render: amount },
+        { data: 'Status', render: status }
+    ], { filters: bookingFilters, table: { order: [[5, 'desc']] } });
+
+    document.getElementById('bookingFilters').addEventListener('change', function () {
+        bookingTable.ajax.reload();
+    });
+
+    bookingReportTable('#customerTable', [
+        { data: 'Customer', render: text },
+        { data: 'Movie', render: text },
+        { data: 'Theater', render: text },
+        { data: 'ShowTime' },
+        { data: 'Amount', render: amount },
+        { data: 'Status', render: status }
+    ], { table: { order: [[4, 'desc']], pageLength: 20, searching: false } });
+
+    // Revenue tables are one row per movie/theater, so they stay client-side
+    ['movieTable', 'theaterTable'].forEach(tableId => {
+        if (document.getElementById(tableId)) {
+            $('#' + tableId).DataTable({ pageLength: 25, order: [[2, 'desc']] });
+        }
+    });
+});
+
+// Auto-refresh data every 5 minutes
+setInterval(function () {
+    if (confirm('Refresh report data?')) {
+        location.reload();
+    }
+}, 300000); // 5 minutes
@@ -0,0 +1,23 @@
+function editShow(showId) {
+    alert(`Edit show functionality for ID ${showId} will be implemented in the next version.`);
+}
+
+function deleteShow(showId, movieTitle) {
+    if (confirm(`Are you sure you want to delete the show for "${movieTitle}"? This will also cancel all associated bookings.`)) {
+        alert(`Show ID ${showId} would be deleted. This functionality will be implemented in the next version.`);
+    }
+}
+
+// Initialize DataTable
+document.addEventListener('DOMContentLoaded', function () {
+    const table = document.getElementById('showsTable');
+    if (table && typeof DataTable !== 'undefined') {
+        new DataTable(table, {
+            paging: false, // Pages come from the server
+            order: [[4, 'desc']], // Sort by show time
+            columnDefs: [
+                { orderable: false, targets: [7] } // Actions column
+            ]
+        });
+    }
+});
@@ -0,0 +1,13 @@
+function viewTheater(theaterId) {
+    alert(`View theater details for ID ${theaterId}. This functionality will be implemented in the next version.`);
+}
+
+function editTheater(theaterId) {
+    alert(`Edit theater functionality for ID ${theaterId} will be implemented in the next version.`);
+}
+
+function deleteTheater(theaterId, theaterName) {
+    if (confirm(`Are you sure you want to delete "${theaterName}"? This will also delete all associated screens and shows.`)) {
+        alert(`Theater ID ${theaterId} would be deleted. This functionality will be implemented in the next version.`);
+    }
+}
@@ -0,0 +1,270 @@
+    document.addEventListener('DOMContentLoaded', function () {
+        // Per-page values come from the JSON block in booking.html; this file is cached
+        const config = JSON.parse(document.getElementById('bookingConfig').textContent);
+        const seatPrice = Number(config.seatPrice);
+        const bookedSeats = config.bookedSeats;
+        const totalSeats = config.totalSeats;
+        const heldSeats = config.heldSeats;
+        const holdUrl = config.holdUrl;
+        const holdTtl = config.holdTtl;
+        const streamUrl = config.streamUrl;
+        const seatsUrl = config.seatsUrl;
+        let selectedSeats = [];
+        let holdTimeout = null;
+        let holdDeadline = null;
+        let holdTicker = null;
+
+    // Generate seat map
+    function generateSeatMap() {
+        const seatMap = document.getElementById('seatMap');
+        const rows = Math.ceil(totalSeats / 12); // 12 seats per row
+
+        for (let row = 0; row < rows; row++) {
+            const rowDiv = document.createElement('div');
+            rowDiv.className = 'seat-row';
+
+            // Row label
+            const rowLabel = document.createElement('div');
+            rowLabel.className = 'row-label';
+            rowLabel.textContent = String.fromCharCode(65 + row); // A, B, C...
+            rowDiv.appendChild(rowLabel);
+
+            // Seats in this row
+            for (let seat = 1; seat <= 12; seat++) {
+                const seatNumber = `${String.fromCharCode(65 + row)}${seat}`;
+
+                // Add aisle gap after seat 6
+                if (seat === 7) {
+                    const gap = document.createElement('div');
+                    gap.className = 'seat-gap';
+                    rowDiv.appendChild(gap);
+                }
+
+                // Check if we've exceeded total seats
+                if ((row * 12) + seat > totalSeats) break;
+
+                const seatDiv = document.createElement('div');
+                seatDiv.className = 'seat';
+                seatDiv.textContent = seat;
+                seatDiv.dataset.seatNumber = seatNumber;
+
+                // Set seat status
+                if (bookedSeats.includes(seatNumber)) {
+                    seatDiv.classList.add('booked');
+                } else if (heldSeats.includes(seatNumber)) {
+                    seatDiv.classList.add('held');
+                    seatDiv.title = 'Held by another customer';
+                } else {
+                    seatDiv.classList.add('available');
+                }
+                // Booked and held seats can free up while the page is open
+                seatDiv.addEventListener('click', () => toggleSeat(seatNumber, seatDiv));
+
+                rowDiv.appendChild(seatDiv);
+            }
+
+            seatMap.appendChild(rowDiv);
+        }
+    }
+
+    // Toggle seat selection
+    function toggleSeat(seatNumber, seatElement) {
+        if (seatElement.classList.contains('booked') || seatElement.classList.contains('held')) return;
+
+        if (selectedSeats.includes(seatNumber)) {
+            // Deselect seat
+            selectedSeats = selectedSeats.filter(s => s !== seatNumber);
+            seatElement.classList.remove('selected');
+            seatElement.classList.add('available');
+        } else {
+            // Select seat (max 10 seats)
+            if (selectedSeats.length >= 10) {
+                alert('You can select maximum 10 seats at a time.');
+                return;
+            }
+            selectedSeats.push(seatNumber);
+            seatElement.classList.remove('available');
+            seatElement.classList.add('selected');
+        }
+
+        updateBookingSummary();
+        scheduleHold();
+    }
+
+    // Hold the selection on the server shortly after the last click
+    function scheduleHold() {
+        clearTimeout(holdTimeout);
+        holdTimeout = setTimeout(requestHold, 400);
+    }
+
+    function requestHold() {
+        const seats = selectedSeats.slice();
+        fetch(holdUrl, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ seats: seats })
+        })
+            .then(response => response.json())
+            .then(data => {
+                if (!data.success) return;
+                if (data.conflicts.length) {
+                    releaseConflicts(data.conflicts);
+                }
+                startHoldTimer(data.expires_in);
+            })
+            .catch(() => {
+                // Booking still re-checks every seat, so a failed hold is not fatal
+            });
+    }
+
+    // Someone else got these seats first: grey them out and drop them
+    function releaseConflicts(conflicts) {
+        conflicts.forEach(seatNumber => {
+            const seatDiv = document.querySelector(`[data-seat-number="${seatNumber}"]`);
+            if (seatDiv) {
+                seatDiv.classList.remove('selected', 'available');
+                seatDiv.classList.add('held');
+            }
+        });
+        selectedSeats = selectedSeats.filter(s => !conflicts.includes(s));
+        updateBookingSummary();
+        alert(`Seats ${conflicts.join(', ')} were just taken by another customer.`);
+    }
+
+    function startHoldTimer(expiresIn) {
+        const timer = document.getElementById('holdTimer');
+        clearInterval(holdTicker);
+        if (!expiresIn) {
+            timer.classList.add('d-none');
+            return;
+        }
+        holdDeadline = Date.now() + Math.min(expiresIn, holdTtl) * 1000;
+        timer.classList.remove('d-none');
+        tickHoldTimer();
+        holdTicker = setInterval(tickHoldTimer, 1000);
+    }
+
+    function tickHoldTimer() {
+        const remaining = Math.max(0, Math.round((holdDeadline - Date.now()) / 1000));
+        const minutes = Math.floor(remaining / 60);
+        const seconds = String(remaining % 60).padStart(2, '0');
+        document.getElementById('holdRemaining').textContent = `${minutes}:${seconds}`;
+        if (remaining === 0) {
+            clearInterval(holdTicker);
+            document.getElementById('holdTimer').classList.add('d-none');
+            // The hold lapsed; take it again so the selection stays protected
+            if (selectedSeats.length) requestHold();
+        }
+    }
+
+    // Apply a seat's live state from the stream (our own held seats stay selected)
+    function setSeatState(seatNumber, state) {
+        const seatDiv = document.querySelector(`[data-seat-number="${seatNumber}"]`);
+        if (!seatDiv) return;
+        if (selectedSeats.includes(seatNumber)) {
+            if (state !== 'booked') return;
+            selectedSeats = selectedSeats.filter(s => s !== seatNumber);
+            updateBookingSummary();
+            scheduleHold();
+            alert(`Seat ${seatNumber} was just booked by another customer.`);
+        }
+        seatDiv.classList.remove('available', 'selected', 'booked', 'held');
+        seatDiv.classList.add(state);
+        seatDiv.title = state === 'held' ? 'Held by another customer' : '';
+    }
+
+    function applySnapshot(data) {
+        const booked = new Set(data.booked);
+        const held = new Set(data.held);
+        document.querySelectorAll('#seatMap .seat').forEach(seatDiv => {
+            const seatNumber = seatDiv.dataset.seatNumber;
+            setSeatState(seatNumber, booked.has(seatNumber) ? 'booked' : held.has(seatNumber) ? 'held' : 'available');
+        });
+    }
+
+    function applyDiff(data) {
+        data.released.concat(data.unheld).forEach(seat => setSeatState(seat, 'available'));
+        data.held.forEach(seat => setSeatState(seat, 'held'));
+        data.booked.forEach(seat => setSeatState(seat, 'booked'));
+    }
+
+    // Live seat map: snapshot then diffs over SSE, or polling if the stream is refused
+    function watchSeats() {
+        if (!window.EventSource) {
+            pollSeats();
+            return;
+        }
+        const source = new EventSource(streamUrl);
+        let version = 0;
+        source.addEventListener('snapshot', event => {
+            const data = JSON.parse(event.data);
+            version = data.version;
+            applySnapshot(data);
+        });
+        source.addEventListener('diff', event => {
+            const data = JSON.parse(event.data);
+            if (data.version <= version) return;
+            version = data.version;
+            applyDiff(data);
+        });
+        source.addEventListener('error', () => {
+            // EventSource retries by itself unless the server refused the stream
+            if (source.readyState === EventSource.CLOSED) pollSeats();
+        });
+    }
+
+    function pollSeats() {
+        fetch(seatsUrl)
+            .then(response => response.json())
+            .then(data => {
+                if (data.success) applySnapshot({ booked: data.booked_seats, held: data.held_seats });
+            })
+            .catch(() => {})
+            .finally(() => setTimeout(pollSeats, 15000));
+    }
+
+    // Update booking summary
+    function updateBookingSummary() {
+        const selectedSeatsDiv = document.getElementById('selectedSeats');
+        const seatCountSpan = document.getElementById('seatCount');
+        const totalAmountSpan = document.getElementById('totalAmount');
+        const confirmButton = document.getElementById('confirmBooking');
+        const bookingForm = document.getElementById('bookingForm');
+
+        // Remove existing hidden inputs
+        const existingInputs = bookingForm.querySelectorAll('input[name="seats"]');
+        existingInputs.forEach(input => input.remove());
+
+        if (selectedSeats.length === 0) {
+            selectedSeatsDiv.innerHTML = '<p class="text-muted">No seats selected</p>';
+            seatCountSpan.textContent = '0';
+            totalAmountSpan.textContent = '₹0';
+            confirmButton.disabled = true;
+        } else {
+            // Show selected seats
+            const seatTags = selectedSeats.map(seat =>
+                `<span class="seat-tag">${seat}</span>`
+            ).join('');
+            selectedSeatsDiv.innerHTML = seatTags;
+
+            // Add hidden inputs for selected seats
+            selectedSeats.forEach(seat => {
+                const input = document.createElement('input');
+                input.type = 'hidden';
+                input.name = 'seats';
+                input.value = seat;
+                bookingForm.appendChild(input);
+            });
+
+            // Update totals
+            const totalAmount = selectedSeats.length * seatPrice;
+            seatCountSpan.textContent = selectedSeats.length;
+            totalAmountSpan.textContent = `₹${totalAmount.toFixed(0)}`;
+            confirmButton.disabled = false;
+        }
+    }
+
+    // Initialize seat map
+    generateSeatMap();
+    watchSeats();
+});
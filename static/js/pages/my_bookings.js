@@ -0,0 +1,104 @@
+function cancelBooking(bookingId) {
+    const modal = new bootstrap.Modal(document.getElementById('cancelModal'));
+    const confirmBtn = document.getElementById('confirmCancelBtn');
+
+    // Store booking ID for the confirm action
+    confirmBtn.setAttribute('data-booking-id', bookingId);
+    modal.show();
+}
+
+function confirmCancelBooking() {
+    const confirmBtn = document.getElementById('confirmCancelBtn');
+    const bookingId = confirmBtn.getAttribute('data-booking-id');
+
+    if (!bookingId) {
+        showAlert('Error: No booking ID found.', 'error');
+        return;
+    }
+
+    // Show loading state
+    const originalText = confirmBtn.innerHTML;
+    confirmBtn.innerHTML = '<span class="spinner-border spinner-border-sm me-2"></span>Cancelling...';
+    confirmBtn.disabled = true;
+
+    // Make API call
+    fetch(`/api/cancel_booking/${bookingId}`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'X-Requested-With': 'XMLHttpRequest'
+        },
+        credentials: 'same-origin'
+    })
+        .then(response => response.json())
+        .then(data => {
+            // Hide modal
+            const modal = bootstrap.Modal.getInstance(document.getElementById('cancelModal'));
+            modal.hide();
+
+            if (data.success) {
+                showAlert(data.message, 'success');
+                // Refresh the page to show updated booking status
+                setTimeout(() => {
+                    window.location.reload();
+                }, 1500);
+            } else {
+                showAlert(data.message || 'Failed to cancel booking.', 'error');
+            }
+        })
+        .catch(error => {
+            console.error('Cancel booking error:', error);
+            const modal = bootstrap.Modal.getInstance(document.getElementById('cancelModal'));
+            modal.hide();
+            showAlert('Network error occurred. Please check your connection and try again.', 'error');
+        })
+        .finally(() => {
+            // Restore button state
+            confirmBtn.innerHTML = originalText;
+            confirmBtn.disabled = false;
+        });
+}
+
+function showAlert(message, type) {
+    // Create and show alert
+    const alertDiv = document.createElement('div');
+    alertDiv.className = `alert alert-${type === 'error' ? 'danger' : type} alert-dismissible fade show`;
+    alertDiv.innerHTML = `
+        ${message}
+        <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+    `;
+
+    const container = document.querySelector('.container');
+    container.insertBefore(alertDiv, container.firstChild);
+
+    // Auto-hide after 5 seconds
+    setTimeout(() => {
+        if (alertDiv.parentNode) {
+            alertDiv.remove();
+        }
+    }, 5000);
+}
+
+function downloadTicket(bookingId) {
+    // Simple ticket download simulation
+    alert(`Downloading ticket for Booking #${bookingId}...\n\nIn a real application, this would generate and download a PDF ticket.`);
+}
+
+// Event listeners for booking actions
+document.addEventListener('DOMContentLoaded', function () {
+    // Cancel booking buttons
+    document.querySelectorAll('.cancel-booking-btn').forEach(button => {
+        button.addEventListener('click', function () {
+            const bookingId = this.getAttribute('data-booking-id');
+            cancelBooking(bookingId);
+        });
+    });
+
+    // Download ticket buttons
+    document.querySelectorAll('.download-ticket-btn').forEach(button => {
+        button.addEventListener('click', function () {
+            const bookingId = this.getAttribute('data-booking-id');
+            downloadTicket(bookingId);
+        });
+    });
+});
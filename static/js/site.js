@@ -0,0 +1,53 @@
+// Initialize AOS
+AOS.init({
+  duration: 800,
+  easing: "ease-in-out",
+  once: true,
+});
+
+// Navbar scroll effect
+window.addEventListener("scroll", function () {
+  const navbar = document.getElementById("mainNavbar");
+  if (window.scrollY > 50) {
+    navbar.classList.add("scrolled");
+  } else {
+    navbar.classList.remove("scrolled");
+  }
+});
+
+// Theme Toggle Functionality
+(function () {
+  const themeToggle = document.getElementById("themeToggle");
+  const themeIcon = document.getElementById("themeIcon");
+  const html = document.documentElement;
+
+  // Get saved theme or default to light
+  const currentTheme = localStorage.getItem("theme") || "light";
+  html.setAttribute("data-theme", currentTheme);
+  updateThemeIcon(currentTheme);
+
+  themeToggle.addEventListener("click", function () {
+    const currentTheme = html.getAttribute("data-theme");
+    const newTheme = currentTheme === "dark" ? "light" : "dark";
+
+    html.setAttribute("data-theme", newTheme);
+    localStorage.setItem("theme", newTheme);
+    updateThemeIcon(newTheme);
+
+    // Add animation
+    themeToggle.style.transform = "rotate(360deg)";
+    setTimeout(() => {
+      themeToggle.style.transform = "";
+    }, 300);
+  });
+
+  function updateThemeIcon(theme) {
+    if (theme === "dark") {
+      themeIcon.classList.remove("fa-moon");
+      themeIcon.classList.add("fa-sun");
+    } else {
+      themeIcon.classList.remove("fa-sun");
+      themeIcon.classList.add("fa-moon");
+    }
+  }
+})();
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+BookYourShow Query Plan Regression Test
+Requests every read page and API in app.py, captures the SELECTs they issue,
+runs EXPLAIN on each one and fails if a large table is read with a full scan.
+
+Run it against a database with production-like volume (small seed tables are
+skipped, since MySQL rightly full-scans a table of ten rows):
+    python test_query_plans.py [--min-rows 1000] [--verbose]
+Under pytest the tests are skipped when the app or its database is unavailable.
+"""
+
+import argparse
+import re
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from app import app
+    from utils.db_helper import execute_query, add_query_listener, remove_query_listener
+    from utils.migrations import migration_status
+    print("✓ Flask app imports successful")
+except ImportError as e:
+    if 'pytest' in sys.modules:
+        import pytest
+        pytest.skip(f"app imports failed: {e}", allow_module_level=True)
+    print(f"✗ Import error: {e}")
+    sys.exit(1)
+
+# Tables that grow with traffic; a full scan of any of these is a regression
+LARGE_TABLES = {'bookings', 'booking_details', 'show_seats', 'payments', 'shows',
+                'activity_log', 'cancellations_log', 'users'}
+
+# Statements whose full scans are known and tracked separately, keyed by a
+# fragment of the SQL. Remove an entry as soon as its query is fixed.
+KNOWN_FULL_SCANS = {}
+
+MIN_ROWS = 1000
+
+def normalize(query):
+    return re.sub(r'\s+', ' ', query).strip()
+
+def capture_route_queries():
+    """Hit the read routes as an admin and collect the SELECTs they run"""
+    captured = {}
+
+    def listener(query, params):
+        if query.strip().upper().startswith('SELECT'):
+            captured.setdefault(normalize(query), params)
+
+    with app.app_context():
+        admin = execute_query("SELECT user_id, name FROM users WHERE role = 'admin' LIMIT 1")
+        movie = execute_query("SELECT movie_id FROM shows ORDER BY show_time DESC LIMIT 1")
+        show = execute_query("SELECT show_id FROM shows ORDER BY show_time DESC LIMIT 1")
+    if not admin or not movie or not show:
+        raise RuntimeError('Need an admin user and at least one show')
+
+    routes = [
+        '/',
+        f"/movie/{movie[0]['movie_id']}",
+        f"/booking/{show[0]['show_id']}",
+        '/my_bookings',
+        '/admin',
+        '/admin/movies',
+        '/admin/theaters',
+        '/admin/shows',
+        '/admin/shows?date_from=2020-01-01&date_to=2030-12-31',
+        '/admin/reports',
+        '/api/admin/reports/bookings?draw=1&start=0&length=25',
+        '/api/admin/reports/bookings?draw=1&start=0&length=20&columns[0][data]=Amount&order[0][column]=0&order[0][dir]=desc',
+        '/api/admin/reports/bookings?draw=1&start=0&length=25&status=confirmed&date_from=2020-01-01',
+        '/admin/add_show',
+        '/api/movies/search?q=the&genre=Action&rating=7',
+        f"/api/shows/{show[0]['show_id']}/seats",
+    ]
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = admin[0]['user_id']
+        sess['name'] = admin[0]['name']
+        sess['role'] = 'admin'
+
+    add_query_listener(listener)
+    try:
+        for route in routes:
+            response = client.get(route)
+            if response.status_code >= 400:
+                print(f"  ! {route} returned {response.status_code}")
+    finally:
+        remove_query_listener(listener)
+    return captured
+
+def require_database():
+    """Skip the calling test under pytest when no database is reachable"""
+    try:
+        with app.app_context():
+            execute_query("SELECT 1")
+    except Exception as e:
+        if 'pytest' in sys.modules:
+            import pytest
+            pytest.skip(f"no database: {e}")
+        raise
+
+def table_sizes():
+    rows = execute_query(
+        "SELECT table_name AS name, table_rows AS estimate FROM information_schema.tables WHERE table_schema = DATABASE()"
+    )
+    return {row['name']: row['estimate'] or 0 for row in rows}
+
+def test_migrations_applied():
+    """Indexes come from migrations; make sure they have all run"""
+    require_database()
+    with app.app_context():
+        pending = [m for m in migration_status() if not m['applied_at']]
+    assert not pending, \
+        f"pending migrations: {', '.join(m['version'] for m in pending)} (run flask --app app db-migrate)"
+
+def test_no_full_scans(min_rows=MIN_ROWS, verbose=False):
+    """EXPLAIN every captured query and reject full scans of large tables"""
+    require_database()
+    queries = capture_route_queries()
+    print(f"  Captured {len(queries)} distinct SELECT statements")
+    regressions = []
+    with app.app_context():
+        sizes = table_sizes()
+        for query, params in queries.items():
+            plan = execute_query(f"EXPLAIN {query}", params)
+            known = next((reason for fragment, reason in KNOWN_FULL_SCANS.items() if fragment in query), None)
+            for step in plan:
+                table = step.get('table') or ''
+                if verbose:
+                    print(f"    {table:<20} type={step.get('type')} key={step.get('key')} rows={step.get('rows')}")
+                if step.get('type') != 'ALL' or table not in LARGE_TABLES:
+                    continue
+                if sizes.get(table, 0) < min_rows:
+                    continue
+                if known:
+                    print(f"  ~ known full scan of {table} ({known})")
+                    continue
+                regressions.append((table, query))
+
+    assert not regressions, '; '.join(f"full scan of {table}: {query[:160]}" for table, query in regressions)
+
+def main():
+    """Run all tests"""
+    parser = argparse.ArgumentParser(description='EXPLAIN regression test for app.py queries')
+    parser.add_argument('--min-rows', type=int, default=MIN_ROWS,
+                        help='ignore full scans of tables smaller than this')
+    parser.add_argument('--verbose', action='store_true', help='print every plan step')
+    args = parser.parse_args()
+
+    print("BookYourShow Query Plan Test")
+    print("=" * 50)
+
+    tests = [
+        ("All migrations applied", test_migrations_applied),
+        ("No unexpected full table scans", lambda: test_no_full_scans(args.min_rows, args.verbose)),
+    ]
+
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✓ {name}")
+            passed += 1
+        except Exception as e:
+            print(f"✗ {name}: {e}")
+
+    print("=" * 50)
+    print(f"Tests passed: {passed}/{len(tests)}")
+    sys.exit(0 if passed == len(tests) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+BookYourShow Show Scheduling Test
+Checks the screen-overlap index and the all/valid import modes of
+utils/show_schedule.py against an in-memory stand-in for the database, so it
+needs no MySQL server:
+    python test_show_schedule.py    (or: python -m pytest test_show_schedule.py)
+"""
+
+import sys
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from utils import show_schedule
+    from utils.show_schedule import ScreenIntervals, schedule_shows
+except ImportError as e:
+    print(f"✗ Import error: {e}")
+    sys.exit(1)
+
+DAY = datetime(2099, 1, 1)
+
+
+def at(hour, minute=0):
+    return DAY + timedelta(hours=hour, minutes=minute)
+
+
+class FakeCursor:
+    """Answers the statements schedule_shows runs from a few in-memory tables"""
+
+    def __init__(self, screens=(1, 2), movies=None, shows=(), first_id=100, id_gap=0):
+        self.screens = set(screens)
+        self.movies = movies or {10: 120, 11: 90}  # movie_id -> duration (minutes)
+        self.shows = list(shows)  # dicts: show_id, screen_id, show_time, duration
+        self.next_id = first_id
+        self.id_gap = id_gap  # ids another session takes between our INSERTs
+        self.inserts = []
+        self.lastrowid = None
+        self._result = []
+
+    def execute(self, query, params=()):
+        if 'FROM screens' in query:
+            self._result = [{'screen_id': s} for s in params if s in self.screens]
+        elif 'MAX(duration)' in query:
+            self._result = [{'longest': max(self.movies.values())}]
+        elif 'SELECT movie_id, duration' in query:
+            self._result = [{'movie_id': m, 'duration': self.movies[m]} for m in params if m in self.movies]
+        elif 'FROM shows s' in query:
+            *screen_ids, start, end = params
+            self._result = [show for show in self.shows
+                            if show['screen_id'] in screen_ids and start <= show['show_time'] < end]
+        elif query.startswith('INSERT INTO shows'):
+            rows = [tuple(params[i:i + 4]) for i in range(0, len(params), 4)]
+            assert query.count('(%s, %s, %s, %s)') == len(rows)
+            self.lastrowid = self.next_id
+            self.next_id += len(rows) + self.id_gap
+            self.inserts.append(rows)
+        else:
+            raise AssertionError(f'unexpected statement: {query}')
+
+    def fetchall(self):
+        return self._result
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+
+@contextmanager
+def database(cursor, chunk=None):
+    """Run schedule_shows' transaction against ``cursor``"""
+    saved = show_schedule.execute_transaction, show_schedule.INSERT_CHUNK
+    show_schedule.execute_transaction = lambda work: work(cursor)
+    if chunk:
+        show_schedule.INSERT_CHUNK = chunk
+    try:
+        yield cursor
+    finally:
+        show_schedule.execute_transaction, show_schedule.INSERT_CHUNK = saved
+
+
+def row(movie_id, screen_id, show_time, price=250):
+    return {'movie_id': movie_id, 'screen_id': screen_id, 'show_time': show_time.strftime('%Y-%m-%d %H:%M'),
+            'price': price}
+
+
+def test_overlapping():
+    """Intervals overlap only when they share time; touching ends do not"""
+    intervals = ScreenIntervals()
+    intervals.add(at(10), at(12), 'a')
+    intervals.add(at(14), at(15), 'b')
+    assert intervals.overlapping(at(12), at(14)) == []
+    assert intervals.overlapping(at(11), at(11, 30)) == ['a']
+    assert intervals.overlapping(at(9), at(16)) == ['a', 'b']
+    assert intervals.overlapping(at(15), at(16)) == []
+    assert intervals.overlapping(at(8), at(10)) == []
+
+
+def test_overlapping_long_interval():
+    """A long interval starting well before the query window is still found"""
+    intervals = ScreenIntervals()
+    intervals.add(at(1), at(20), 'marathon')
+    intervals.add(at(12), at(13), 'short')
+    assert intervals.overlapping(at(18), at(19)) == ['marathon']
+    assert intervals.overlapping(at(12, 30), at(12, 45)) == ['marathon', 'short']
+    assert intervals.overlapping(at(20), at(21)) == []
+
+
+def test_mode_all_rejects_batch():
+    """mode='all' inserts nothing when any row clashes"""
+    existing = {'show_id': 7, 'screen_id': 1, 'show_time': at(18), 'duration': 120}
+    with database(FakeCursor(shows=[existing])) as cursor:
+        result = schedule_shows([row(10, 1, at(9)), row(11, 1, at(19)), row(10, 2, at(9))], mode='all')
+    assert not result['success']
+    assert result['inserted'] == 0 and cursor.inserts == []
+    assert [r['row'] for r in result['rejected']] == [2]
+    assert 'show 7' in result['rejected'][0]['reason']
+    assert all(a['show_id'] is None for a in result['accepted'])
+
+
+def test_mode_valid_inserts_good_rows():
+    """mode='valid' inserts the good rows, reports the rest, and returns their ids"""
+    with database(FakeCursor(first_id=100)) as cursor:
+        result = schedule_shows([
+            row(10, 1, at(9)),
+            row(11, 1, at(10)),   # clashes with row 1 (120 min + 15 min buffer)
+            row(10, 3, at(9)),    # no such screen
+            row(11, 2, at(9)),
+            row(10, 1, at(11, 15)),
+        ], mode='valid')
+    assert result['success']
+    assert result['inserted'] == 3
+    assert [r['row'] for r in result['rejected']] == [2, 3]
+    assert [(a['row'], a['show_id']) for a in result['accepted']] == [(1, 100), (4, 101), (5, 102)]
+    assert len(cursor.inserts) == 1
+
+
+def test_ids_follow_each_chunk():
+    """Each INSERT chunk's ids start at its own lastrowid, even with gaps between chunks"""
+    rows = [row(11, 1, at(hour)) for hour in range(0, 20, 2)]
+    with database(FakeCursor(first_id=1, id_gap=50), chunk=4) as cursor:
+        result = schedule_shows(rows, mode='all')
+    assert [len(chunk) for chunk in cursor.inserts] == [4, 4, 2]
+    assert [a['show_id'] for a in result['accepted']] == [1, 2, 3, 4, 55, 56, 57, 58, 109, 110]
+
+
+def test_dry_run_inserts_nothing():
+    """A dry run validates without inserting"""
+    with database(FakeCursor()) as cursor:
+        result = schedule_shows([row(10, 1, at(9))], dry_run=True)
+    assert result['success'] and result['inserted'] == 0 and cursor.inserts == []
+
+
+def main():
+    """Run all tests"""
+    print("BookYourShow Show Scheduling Test")
+    print("=" * 50)
+
+    tests = [
+        test_overlapping,
+        test_overlapping_long_interval,
+        test_mode_all_rejects_batch,
+        test_mode_valid_inserts_good_rows,
+        test_ids_follow_each_chunk,
+        test_dry_run_inserts_nothing,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✓ {test.__doc__ or test.__name__}")
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ {test.__doc__ or test.__name__}: {e}")
+
+    print("=" * 50)
+    print(f"Tests passed: {passed}/{len(tests)}")
+    sys.exit(0 if passed == len(tests) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""Bundled, minified and fingerprinted static assets.
+
+Stylesheets and scripts under static/ are grouped into bundles. Each bundle
+is concatenated, minified and written to ``output_dir`` under a name that
+includes a hash of its content (``site.3f9c0a1b2d4e.css``), with a gzip copy
+next to it. ``manifest.json`` maps bundle names to those files. Templates
+link bundles with ``asset_url('site.css')`` instead of
+``url_for('static', ...)``.
+
+A hashed name never changes content, so /assets/ responses are cacheable
+forever (``immutable``): a browser fetches each build once and never
+revalidates it. A new build gets new names, and pages link to those as soon
+as a worker loads the new manifest. Files from older builds are kept until
+``flask --app app build-assets --clean``, so pages rendered by workers that
+haven't restarted yet still find their bundles during a rolling deploy.
+
+Run the build as a deploy step (``flask --app app build-assets``). Without a
+manifest, the first ``asset_url`` call builds one (``auto_build``); in debug
+mode, bundles are also rebuilt whenever a source file changes.
+
+The minifiers are deliberately conservative. They strip comments and
+collapse whitespace, but they don't rename or rewrite anything. For scripts,
+a line break is kept wherever dropping it could change where JavaScript
+inserts a semicolon.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from flask import request, send_from_directory, url_for
+
+# Bundle -> source files under static/, in order. Every file in css/pages/ and
+# js/pages/ is also a bundle of its own, named pages/<file>.
+BUNDLES = {
+    'site.css': ['css/style.css'],
+    'admin.css': ['css/admin.css'],
+    'site.js': ['js/main.js', 'js/site.js'],
+}
+PAGE_DIRS = ('css/pages', 'js/pages')
+
+MANIFEST = 'manifest.json'
+
+
+# -- minifiers ----------------------------------------------------------------
+
+_CSS_TOKENS = re.compile(r'("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|/\*.*?\*/)', re.S)
+_CSS_STRINGS = re.compile(r'("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')')
+_CSS_SPACE = re.compile(r'\s+')
+_CSS_PUNCTUATION = re.compile(r' ?([{};,>]) ?')
+
+
+def _drop_comment(match):
+    token = match.group(0)
+    if token.startswith('/*') and not token.startswith('/*!'):  # /*! marks a licence; keep it
+        return ' '
+    return token
+
+
+def minify_css(source):
+    """CSS without comments and redundant whitespace"""
+    # Comments first, so the whitespace on both sides of one collapses too
+    source = _CSS_TOKENS.sub(_drop_comment, source)
+    out = []
+    for i, piece in enumerate(_CSS_STRINGS.split(source)):
+        if i % 2:
+            out.append(piece)  # a string, kept as written
+            continue
+        piece = _CSS_SPACE.sub(' ', piece)
+        piece = _CSS_PUNCTUATION.sub(r'\1', piece)
+        out.append(piece.replace(': ', ':').replace(';}', '}'))
+    return ''.join(out).strip()
+
+
+_JS_WORD = re.compile(r'[\w$]')
+# After these a '/' starts a regular expression rather than a division
+_JS_REGEX_AFTER = set('(,=:[!&|?{};+-*%<>~^')
+_JS_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'instanceof', 'new', 'void',
+                      'delete', 'throw', 'yield', 'await'}
+# A line break next to these never decides where a semicolon is inserted
+_JS_NO_ASI_BEFORE = set('{;,([')
+_JS_NO_ASI_AFTER = set('});,.:?=')
+
+
+def _is_word(char):
+    return bool(char) and bool(_JS_WORD.match(char))
+
+
+def _skip_string(source, i, quote):
+    """Index just past the string or template literal starting at ``i``"""
+    n = len(source)
+    i += 1
+    depth = 0  # open ${ ... } substitutions inside a template literal
+    while i < n:
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if quote == '`':
+            if char == '$' and source.startswith('${', i) and depth == 0:
+                depth = 1
+                i += 2
+                continue
+            if depth:
+                if char == '{':
+                    depth += 1
+                elif char == '}':
+                    depth -= 1
+                elif char in '\'"`':
+                    i = _skip_string(source, i, char)
+                    continue
+                i += 1
+                continue
+        if char == quote:
+            return i + 1
+        if char == '\n' and quote != '`':
+            return i  # unterminated; leave the rest to the browser
+        i += 1
+    return n
+
+
+def _skip_regex(source, i):
+    """Index just past the regular expression literal starting at ``i``"""
+    n = len(source)
+    i += 1
+    in_class = False
+    while i < n:
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '\n':
+            return i
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            return i + 1
+        i += 1
+    return n
+
+
+def minify_js(source):
+    """JavaScript without comments and redundant whitespace"""
+    out = []
+    last = ''  # last character written
+    last_word = ''  # last identifier or keyword written
+    gap = ''  # whitespace skipped since then: '', ' ' or '\n'
+    i, n = 0, len(source)
+
+    def emit(token):
+        nonlocal last, last_word, gap
+        if gap and out:
+            first = token[0]
+            if gap == '\n' and last not in _JS_NO_ASI_BEFORE and first not in _JS_NO_ASI_AFTER:
+                out.append('\n')
+            elif (_is_word(last) and _is_word(first)) or last + first in ('++', '--'):
+                out.append(' ')
+        out.append(token)
+        last = token[-1]
+        last_word = token if _is_word(token[0]) else ''
+        gap = ''
+
+    while i < n:
+        char = source[i]
+        if char in ' \t\r\n\f\v':
+            if char == '\n':
+                gap = '\n'
+            elif not gap:
+                gap = ' '
+            i += 1
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end == -1 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = n if end == -1 else end + 2
+            if '\n' in source[i:end]:
+                gap = '\n'
+            elif not gap:
+                gap = ' '
+            i = end
+        elif char in '\'"`':
+            end = _skip_string(source, i, char)
+            emit(source[i:end])
+            i = end
+        elif char == '/' and (not out or last in _JS_REGEX_AFTER or last_word in _JS_REGEX_KEYWORDS):
+            end = _skip_regex(source, i)
+            emit(source[i:end])
+            i = end
+        elif _is_word(char):
+            end = i + 1
+            while end < n and _is_word(source[end]):
+                end += 1
+            # Keep a number's decimal part (and exponent) together
+            while end < n and source[end] == '.' and source[i].isdigit() and end + 1 < n and source[end + 1].isdigit():
+                end += 1
+                while end < n and _is_word(source[end]):
+                    end += 1
+            emit(source[i:end])
+            i = end
+        else:
+            emit(char)
+            i += 1
+    return ''.join(out)
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+# -- pipeline -------------------------------------------------------------------
+
+class AssetPipeline:
+    """Builds bundles into ``output_dir`` and serves them with far-future caching"""
+
+    def __init__(self, app, output_dir, auto_build=True, max_age=365 * 24 * 3600, gzip_level=9):
+        self.app = app
+        self.source_dir = app.static_folder
+        self.output_dir = output_dir
+        self.auto_build = auto_build
+        self.max_age = max_age
+        self.gzip_level = gzip_level
+        self._manifest = None  # bundle -> file name in output_dir
+        self._built_from = 0.0  # newest source mtime when the manifest was built
+        self._lock = threading.Lock()
+        self._building = threading.Lock()
+        self._stats = {'builds': 0, 'last_build_seconds': None, 'served': 0, 'served_gzip': 0, 'missing': 0}
+
+    @classmethod
+    def from_app(cls, app):
+        """The pipeline for ``app``: /assets/ route and the ``asset_url`` template global"""
+        config = app.config
+        pipeline = cls(app,
+                       output_dir=os.path.join(app.root_path, config.get('ASSETS_OUTPUT_DIR', 'static/dist')),
+                       auto_build=config.get('ASSETS_AUTO_BUILD', True),
+                       max_age=config.get('ASSETS_MAX_AGE', 365 * 24 * 3600))
+        app.add_url_rule('/assets/<path:filename>', 'asset', pipeline.send)
+        app.add_template_global(pipeline.url, 'asset_url')
+        return pipeline
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    # -- build --------------------------------------------------------------
+
+    def bundles(self):
+        """Bundle name -> source paths relative to static/"""
+        bundles = dict(BUNDLES)
+        for directory in PAGE_DIRS:
+            path = os.path.join(self.source_dir, directory)
+            if not os.path.isdir(path):
+                continue
+            for name in sorted(os.listdir(path)):
+                if os.path.splitext(name)[1] in MINIFIERS:
+                    bundles[f'pages/{name}'] = [f'{directory}/{name}']
+        return bundles
+
+    def _newest_source(self):
+        return max((os.path.getmtime(os.path.join(self.source_dir, source))
+                    for sources in self.bundles().values() for source in sources), default=0.0)
+
+    def _write(self, name, data):
+        """Write ``output_dir/name`` atomically; other workers may be building too"""
+        path = os.path.join(self.output_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(data)
+        os.replace(temporary, path)
+
+    def build(self):
+        """Build every bundle and write a new manifest; returns a report per bundle"""
+        started = time.perf_counter()
+        newest = self._newest_source()
+        manifest, report = {}, {}
+        for bundle, sources in self.bundles().items():
+            stem, extension = os.path.splitext(bundle)
+            texts = []
+            for source in sources:
+                with open(os.path.join(self.source_dir, source), encoding='utf-8') as f:
+                    texts.append(f.read())
+            # ';' keeps one script's last statement from running into the next one's first
+            joined = '\n'.join(texts) if extension == '.css' else ';\n'.join(texts)
+            data = MINIFIERS[extension](joined).encode('utf-8')
+            compressed = gzip.compress(data, self.gzip_level, mtime=0)
+            name = f'{stem}.{hashlib.sha256(data).hexdigest()[:12]}{extension}'
+            if not os.path.exists(os.path.join(self.output_dir, name)):
+                self._write(name, data)
+                if len(compressed) < len(data):
+                    self._write(name + '.gz', compressed)
+            manifest[bundle] = name
+            report[bundle] = {'file': name, 'source_bytes': len(joined.encode('utf-8')),
+                              'bytes': len(data), 'gzip_bytes': min(len(compressed), len(data))}
+        self._write(MANIFEST, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+        with self._lock:
+            self._manifest = manifest
+            self._built_from = newest
+            self._stats['builds'] += 1
+            self._stats['last_build_seconds'] = round(time.perf_counter() - started, 3)
+        return report
+
+    def clean(self):
+        """Delete files from earlier builds; returns how many were removed"""
+        keep = set(self.manifest().values())
+        keep |= {name + '.gz' for name in keep} | {MANIFEST}
+        removed = 0
+        for directory, _, files in os.walk(self.output_dir):
+            for name in files:
+                relative = os.path.relpath(os.path.join(directory, name), self.output_dir).replace(os.sep, '/')
+                if relative not in keep:
+                    os.remove(os.path.join(directory, name))
+                    removed += 1
+        return removed
+
+    # -- runtime ------------------------------------------------------------
+
+    def _load(self):
+        path = os.path.join(self.output_dir, MANIFEST)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        with self._lock:
+            self._manifest = manifest
+            self._built_from = os.path.getmtime(path)
+        return manifest
+
+    def _stale(self):
+        # Only debug mode watches the sources; production builds once per deploy
+        return self.app.debug and self.auto_build and self._newest_source() > self._built_from
+
+    def manifest(self):
+        """Bundle -> built file, loading (or building) the manifest on first use"""
+        with self._lock:
+            manifest = self._manifest
+        if manifest is None:
+            manifest = self._load()
+        if manifest is not None and not self._stale():
+            return manifest
+        if not self.auto_build:
+            raise RuntimeError(f'No asset manifest in {self.output_dir}; run flask --app app build-assets')
+        with self._building:
+            if self._manifest is None or self._stale():
+                self.build()
+            return self._manifest
+
+    def fingerprint(self):
+        """A short hash of the manifest; it changes whenever a bundle does (None before a build)"""
+        try:
+            manifest = json.dumps(self.manifest(), sort_keys=True).encode('utf-8')
+        except RuntimeError:
+            return None  # pages fail on asset_url; JSON responses needn't
+        return hashlib.sha256(manifest).hexdigest()[:12]
+
+    def url(self, bundle):
+        """URL of the built ``bundle`` (the template global ``asset_url``)"""
+        return url_for('asset', filename=self.manifest()[bundle])
+
+    def send(self, filename):
+        """Serve a built file, gzipped when the client accepts it"""
+        if filename == MANIFEST or filename.endswith(('.gz', '.tmp')):
+            self._count('missing')
+            return self.app.response_class('Not found', status=404)
+        gzipped = request.accept_encodings['gzip'] and os.path.exists(os.path.join(self.output_dir, filename + '.gz'))
+        if not os.path.exists(os.path.join(self.output_dir, filename)):
+            self._count('missing')
+            return self.app.response_class('Not found', status=404)
+        if gzipped:
+            mimetype = 'text/css' if filename.endswith('.css') else 'text/javascript'
+            response = send_from_directory(self.output_dir, filename + '.gz', mimetype=mimetype, max_age=self.max_age)
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = send_from_directory(self.output_dir, filename, max_age=self.max_age)
+        response.headers['Cache-Control'] = f'public, max-age={self.max_age}, immutable'
+        response.vary.add('Accept-Encoding')
+        self._count('served_gzip' if gzipped else 'served')
+        return response
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['manifest'] = dict(self._manifest or {})
+        snapshot['output_dir'] = self.output_dir
+        return snapshot
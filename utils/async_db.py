@@ -0,0 +1,112 @@
+"""aiomysql pool for the async API tier (async_api.py).
+
+Same credentials as utils/db_pool.py (the MYSQL_* keys), with its own sizes
+(``ASYNC_DB_POOL_*``). A request waiting for a connection costs a suspended
+coroutine rather than a thread, so thousands can wait at once. After
+``timeout`` seconds a waiting request gives up with PoolBusyError, which the
+API answers with a 503.
+
+``coalesced`` runs one query for many identical concurrent reads. At an
+on-sale thousands of browsers poll the same show's seat map: the first
+request runs the query, and requests for the same key that arrive while it
+is in flight wait for that result instead of issuing their own.
+"""
+
+import asyncio
+
+import aiomysql
+
+
+class PoolBusyError(Exception):
+    """No database connection became free within the pool timeout"""
+
+
+class AsyncDatabase:
+    """aiomysql connection pool with a checkout timeout and in-flight query coalescing"""
+
+    def __init__(self, connect_kwargs, min_size=2, max_size=50, timeout=10.0, recycle_seconds=3600):
+        self.connect_kwargs = connect_kwargs
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle_seconds = recycle_seconds
+        self._pool = None
+        self._in_flight = {}  # key -> Task running the query
+        self._stats = {'queries': 0, 'coalesced': 0, 'timeouts': 0, 'errors': 0}
+
+    @classmethod
+    def from_config(cls, config):
+        max_size = config.get('ASYNC_DB_POOL_MAX_SIZE', 50)
+        return cls(
+            {
+                'host': config['MYSQL_HOST'],
+                'user': config['MYSQL_USER'],
+                'password': config['MYSQL_PASSWORD'],
+                'db': config['MYSQL_DB'],
+                'port': config.get('MYSQL_PORT', 3306),
+                'connect_timeout': config.get('MYSQL_CONNECT_TIMEOUT', 10),
+                'autocommit': config.get('MYSQL_AUTOCOMMIT', True),
+                'charset': config.get('MYSQL_CHARSET', 'utf8mb4'),
+            },
+            min_size=min(config.get('ASYNC_DB_POOL_MIN_SIZE', 2), max_size),
+            max_size=max_size,
+            timeout=config.get('ASYNC_DB_POOL_TIMEOUT', 10.0),
+            recycle_seconds=config.get('DB_POOL_RECYCLE_SECONDS', 3600),
+        )
+
+    async def open(self):
+        self._pool = await aiomysql.create_pool(minsize=self.min_size, maxsize=self.max_size,
+                                                pool_recycle=self.recycle_seconds, **self.connect_kwargs)
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            await self._pool.wait_closed()
+            self._pool = None
+
+    async def fetch_all(self, query, params=None):
+        """Rows of a read query, as dicts"""
+        try:
+            conn = await asyncio.wait_for(self._pool.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self._stats['timeouts'] += 1
+            raise PoolBusyError(f'no database connection free after {self.timeout}s')
+        self._stats['queries'] += 1
+        try:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(query, params)
+                return list(await cursor.fetchall())
+        except BaseException as e:
+            if isinstance(e, Exception):
+                self._stats['errors'] += 1
+            # Broken, or cancelled mid-query with a result still unread: the pool drops closed connections
+            conn.close()
+            raise
+        finally:
+            self._pool.release(conn)
+
+    async def coalesced(self, key, query, params=None):
+        """``fetch_all``, shared with any identical read (same ``key``) already in flight"""
+        task = self._in_flight.get(key)
+        if task is None:
+            # Its own task, so a caller that disconnects doesn't cancel the others' query
+            task = self._in_flight[key] = asyncio.ensure_future(self.fetch_all(query, params))
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self._stats['coalesced'] += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key, task):
+        del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()  # mark it retrieved even if every caller has gone
+
+    def stats(self):
+        snapshot = dict(self._stats)
+        snapshot.update({
+            'size': self._pool.size if self._pool else 0,
+            'idle': self._pool.freesize if self._pool else 0,
+            'max_size': self.max_size,
+            'in_flight_keys': len(self._in_flight),
+        })
+        return snapshot
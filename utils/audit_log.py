@@ -0,0 +1,337 @@
+"""Asynchronous, batched audit logging.
+
+Request threads queue audit events (activity_log and cancellations_log rows)
+in memory and return immediately. A background writer drains the queue in
+multi-row inserts of up to ``batch_size`` events, waiting up to
+``flush_interval`` seconds for a batch to fill.
+
+Every event carries a unique ``event_id``, and the tables have a unique key
+on it (migrations/0006_audit_log_pipeline.py). Inserts skip ids already
+present, so retrying a batch, or replaying one from the spill file, writes
+each event exactly once.
+
+The queue holds at most ``max_queue`` events. With ``spill_dir`` set, events
+that don't fit go to an append-only JSON-lines file instead. So do batches
+that fail or take longer than ``slow_flush`` seconds to insert, and the
+writer keeps diverting to the file for ``replay_interval`` seconds before
+it replays the file into the database. Without a spill directory, a full
+queue makes the caller insert its own events synchronously. Pending events
+are flushed at interpreter exit.
+"""
+
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+
+from utils.db_helper import execute_transaction
+
+EVENT_TABLES = {
+    'activity': ('activity_log', ['event_id', 'log_timestamp', 'user_id', 'booking_id', 'activity_type', 'details']),
+    'cancellation': ('cancellations_log', ['event_id', 'cancel_time', 'booking_id', 'user_id', 'reason']),
+}
+
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def write_events(events):
+    """Insert events (dicts with ``kind`` and ``row``), skipping ids already written"""
+    grouped = {}
+    for event in events:
+        grouped.setdefault(event['kind'], []).append(event['row'])
+
+    def write(cursor):
+        for kind, rows in grouped.items():
+            table, columns = EVENT_TABLES[kind]
+            cursor.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) "
+                "ON DUPLICATE KEY UPDATE event_id = event_id",
+                rows
+            )
+
+    execute_transaction(write)
+
+
+class AuditLog:
+    """In-process audit event queue with a batching background writer"""
+
+    def __init__(self, app, max_queue=10000, batch_size=200, flush_interval=0.5,
+                 spill_dir=None, slow_flush=1.0, replay_interval=30):
+        self.app = app
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_dir = spill_dir
+        self.slow_flush = slow_flush
+        self.replay_interval = replay_interval
+        self._queue = deque()
+        self._in_flight = 0  # events the writer has taken off the queue but not finished with
+        self._cond = threading.Condition(threading.Lock())
+        self._spill_lock = threading.Lock()
+        self._writer = None
+        self._pid = None
+        self._stopping = False
+        self._diverted_until = 0.0
+        self._next_replay = 0.0
+        self._stats = {
+            'queued': 0, 'written': 0, 'batches': 0, 'spilled': 0, 'replayed': 0,
+            'sync_writes': 0, 'failures': 0, 'dropped': 0,
+        }
+        atexit.register(self.close)
+
+    @classmethod
+    def from_app(cls, app):
+        """Audit log writing through ``app``'s database pool, tuned by ``app.config``"""
+        config = app.config
+        return cls(app,
+                   max_queue=config.get('AUDIT_MAX_QUEUE', 10000),
+                   batch_size=config.get('AUDIT_BATCH_SIZE', 200),
+                   flush_interval=config.get('AUDIT_FLUSH_INTERVAL', 0.5),
+                   spill_dir=config.get('AUDIT_SPILL_DIR'),
+                   slow_flush=config.get('AUDIT_SLOW_FLUSH', 1.0),
+                   replay_interval=config.get('AUDIT_REPLAY_INTERVAL', 30))
+
+    def _count(self, name, amount=1):
+        with self._cond:
+            self._stats[name] += amount
+
+    # -- producers --------------------------------------------------------
+
+    def record_activity(self, user_id, booking_id, activity_type, details):
+        self._enqueue([{'kind': 'activity', 'row': [uuid.uuid4().hex, _now(), user_id, booking_id,
+                                                     activity_type, details[:255]]}])
+
+    def record_cancellation(self, booking_id, user_id, reason, details):
+        """A cancellations_log row plus its CANCELLED_BOOKING activity row"""
+        now = _now()
+        self._enqueue([
+            {'kind': 'cancellation', 'row': [uuid.uuid4().hex, now, booking_id, user_id, reason[:255]]},
+            {'kind': 'activity', 'row': [uuid.uuid4().hex, now, user_id, booking_id,
+                                         'CANCELLED_BOOKING', details[:255]]},
+        ])
+
+    def _enqueue(self, events):
+        self._ensure_writer()
+        with self._cond:
+            if len(self._queue) + len(events) <= self.max_queue:
+                self._queue.extend(events)
+                self._stats['queued'] += len(events)
+                depth = len(self._queue)
+                # Wake the writer for the first event and again once a batch is full
+                if depth == len(events) or depth >= self.batch_size:
+                    self._cond.notify()
+                return
+        # Queue full: keep the event, but not in memory
+        if self.spill_dir:
+            self._spill(events)
+        else:
+            self._write_now(events)
+
+    def _write_now(self, events):
+        try:
+            write_events(events)
+        except Exception as e:
+            self._count('dropped', len(events))
+            self.app.logger.error('Audit events lost (%d): %s', len(events), e)
+            return
+        self._count('sync_writes', len(events))
+        self._count('written', len(events))
+
+    # -- writer -----------------------------------------------------------
+
+    def _ensure_writer(self):
+        with self._cond:
+            if self._writer is not None and self._pid == os.getpid():
+                return
+            if self._pid is not None and self._pid != os.getpid():
+                # Forked: the parent writes what it queued (event ids make overlap harmless)
+                self._queue.clear()
+                self._in_flight = 0
+            self._pid = os.getpid()
+            self._stopping = False
+            self._writer = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._writer.start()
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                with self._cond:
+                    while not self._queue and not self._stopping:
+                        self._cond.wait(self.replay_interval if self.spill_dir else None)
+                        if self.spill_dir and not self._queue:
+                            break
+                    if self._queue and not self._stopping and len(self._queue) < self.batch_size:
+                        # Let a batch build up
+                        self._cond.wait(self.flush_interval)
+                    batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                    self._in_flight = len(batch)
+                    stopping = self._stopping
+                try:
+                    if batch:
+                        self._drain(batch)
+                    elif stopping:
+                        return
+                    if self.spill_dir and time.monotonic() >= max(self._next_replay, self._diverted_until):
+                        self.replay_spill()
+                except Exception as e:
+                    # Keep the writer alive whatever happens to one batch
+                    self._count('dropped', len(batch))
+                    self.app.logger.error('Audit writer error: %s', e)
+                finally:
+                    with self._cond:
+                        self._in_flight = 0
+
+    def _drain(self, batch):
+        now = time.monotonic()
+        if self.spill_dir and now < self._diverted_until:
+            self._spill(batch)
+            return
+        try:
+            write_events(batch)
+        except Exception as e:
+            self._count('failures')
+            self.app.logger.warning('Audit batch of %d failed: %s', len(batch), e)
+            if self.spill_dir:
+                self._spill(batch)
+                self._diverted_until = time.monotonic() + self.replay_interval
+            else:
+                self._requeue(batch)
+                time.sleep(min(self.flush_interval * 4, 5))
+            return
+        elapsed = time.monotonic() - now
+        with self._cond:
+            self._stats['written'] += len(batch)
+            self._stats['batches'] += 1
+        if self.spill_dir and elapsed > self.slow_flush:
+            # The database is struggling; stop adding to its load for a while
+            self._diverted_until = time.monotonic() + self.replay_interval
+
+    def _requeue(self, batch):
+        with self._cond:
+            room = self.max_queue - len(self._queue)
+            kept = batch[:max(room, 0)]
+            self._queue.extendleft(reversed(kept))
+            if len(kept) < len(batch):
+                self._stats['dropped'] += len(batch) - len(kept)
+
+    # -- spill file ---------------------------------------------------------
+
+    def _spill_path(self, pid=None):
+        return os.path.join(self.spill_dir, f'audit-spill-{pid or os.getpid()}.jsonl')
+
+    def _spill(self, events):
+        with self._spill_lock:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(self._spill_path(), 'a', encoding='utf-8') as spill:
+                for event in events:
+                    spill.write(json.dumps(event) + '\n')
+                spill.flush()
+                os.fsync(spill.fileno())
+        self._count('spilled', len(events))
+
+    def _spill_files(self):
+        """This process's spill file plus any left by processes that have exited"""
+        files = []
+        for path in glob.glob(os.path.join(self.spill_dir, 'audit-spill-*.jsonl*')):
+            pid = int(os.path.basename(path).split('-')[2].split('.')[0])
+            if pid != os.getpid():
+                try:
+                    os.kill(pid, 0)
+                    continue  # still running; it replays its own file
+                except ProcessLookupError:
+                    pass
+                except PermissionError:
+                    continue
+            files.append(path)
+        return files
+
+    def replay_spill(self):
+        """Write spilled events to the database; returns how many were replayed"""
+        self._next_replay = time.monotonic() + self.replay_interval
+        replayed = 0
+        for path in self._spill_files():
+            if not path.endswith('.replay'):
+                with self._spill_lock:
+                    # Claim the file so new spills start a fresh one
+                    claimed = path + '.replay'
+                    if os.path.exists(claimed):
+                        continue  # finish the earlier replay first
+                    try:
+                        os.replace(path, claimed)
+                    except FileNotFoundError:
+                        continue  # another worker claimed it
+                path = claimed
+            try:
+                with open(path, encoding='utf-8') as spill:
+                    batch = []
+                    for line in spill:
+                        if line.strip():
+                            batch.append(json.loads(line))
+                        if len(batch) >= self.batch_size:
+                            write_events(batch)
+                            replayed += len(batch)
+                            batch = []
+                    if batch:
+                        write_events(batch)
+                        replayed += len(batch)
+            except Exception as e:
+                # Left in place; already-written events are skipped next time
+                self._count('failures')
+                self.app.logger.warning('Audit spill replay of %s stopped: %s', path, e)
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._count('replayed', replayed)
+        return replayed
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def flush(self, timeout=10):
+        """Wait until everything queued so far has been written (or spilled)"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify()
+        while time.monotonic() < deadline:
+            with self._cond:
+                # An empty queue isn't enough: the writer may still be writing the last batch
+                if not self._queue and not self._in_flight:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def close(self, timeout=10):
+        """Stop the writer after it drains the queue; leftovers are spilled or written inline"""
+        with self._cond:
+            writer = self._writer if self._pid == os.getpid() else None
+            self._stopping = True
+            self._cond.notify_all()
+        if writer is not None:
+            writer.join(timeout)
+        with self._cond:
+            leftover = list(self._queue)
+            self._queue.clear()
+            self._writer = None
+        if leftover:
+            with self.app.app_context():
+                if self.spill_dir:
+                    self._spill(leftover)
+                else:
+                    self._write_now(leftover)
+
+    def stats(self):
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot['queue_depth'] = len(self._queue)
+            snapshot['in_flight'] = self._in_flight
+        snapshot['avg_batch'] = round(snapshot['written'] / snapshot['batches'], 1) if snapshot['batches'] else 0
+        snapshot['diverting_to_spill'] = bool(self.spill_dir) and time.monotonic() < self._diverted_until
+        return snapshot
@@ -0,0 +1,233 @@
+"""Booking engine: creates a booking, its seats and its payment in one transaction.
+
+The show row is locked with SELECT ... FOR UPDATE so bookings for the same show
+serialize, and the (show_id, seat_number) primary key on ``show_seats`` is what
+finally guarantees a seat is never sold twice. Capacity is enforced with one
+conditional UPDATE of the show's ``show_occupancy`` counter.
+
+Seats under another customer's checkout hold (``seat_holds``, see
+utils/seat_holds.py) cannot be booked. A booking made from the customer's own
+hold converts it in the same transaction: the hold rows are deleted and no
+further per-seat checks are needed.
+
+The NEW_BOOKING audit event is queued once the transaction commits (see
+utils/audit_log.py); nothing is logged inside the transaction.
+"""
+
+import MySQLdb
+from flask import current_app
+
+from utils.db_helper import execute_transaction
+from utils.seat_layout import is_valid_seat, seat_to_index
+
+MAX_SEATS_PER_BOOKING = 10
+
+ER_DUP_ENTRY = 1062
+
+# A customer's booking history, newest first (my_bookings and its JSON API, in app.py and async_api.py)
+USER_BOOKINGS_QUERY = """
+    SELECT b.booking_id, b.booking_date, b.total_amount, b.status,
+           m.title as movie_title, t.name as theater_name,
+           sc.screen_name, s.show_time,
+           GROUP_CONCAT(bd.seat_number ORDER BY bd.seat_number SEPARATOR ', ') as seats,
+           CASE WHEN s.show_time > NOW() THEN 1 ELSE 0 END as can_cancel
+    FROM bookings b
+    JOIN shows s ON b.show_id = s.show_id
+    JOIN movies m ON s.movie_id = m.movie_id
+    JOIN screens sc ON s.screen_id = sc.screen_id
+    JOIN theaters t ON sc.theater_id = t.theater_id
+    LEFT JOIN booking_details bd ON b.booking_id = bd.booking_id
+    WHERE b.user_id = %s
+    GROUP BY b.booking_id, b.booking_date, b.total_amount, b.status,
+             m.title, t.name, sc.screen_name, s.show_time
+    ORDER BY b.booking_date DESC
+"""
+
+
+class BookingError(Exception):
+    """A booking request that cannot be fulfilled"""
+
+
+class ShowNotFoundError(BookingError):
+    """The requested show does not exist"""
+
+
+class SoldOutError(BookingError):
+    """The show does not have enough seats left"""
+
+
+class SeatUnavailableError(BookingError):
+    """One or more of the requested seats is already booked"""
+
+    def __init__(self, seats):
+        self.seats = sorted(seats, key=seat_to_index)
+        super().__init__(f'Seat {", ".join(self.seats)} is already booked. Please select different seats.')
+
+
+class SeatHeldError(BookingError):
+    """One or more of the requested seats is held by another customer's checkout"""
+
+    def __init__(self, seats):
+        self.seats = sorted(seats, key=seat_to_index)
+        super().__init__(f'Seat {", ".join(self.seats)} is being held by another customer. Please select different seats.')
+
+
+def normalize_seats(seats):
+    """Upper-case, de-duplicate and order the requested seat labels"""
+    unique = {seat.strip().upper() for seat in seats if seat and seat.strip()}
+    return sorted(unique, key=lambda seat: (seat_to_index(seat) is None, seat_to_index(seat) or 0, seat))
+
+
+def _reserve_capacity(cursor, show_id, seat_count):
+    """Add ``seat_count`` to the show's occupancy counter if it still fits"""
+    cursor.execute(
+        """
+        UPDATE show_occupancy SET seats_booked = seats_booked + %s
+        WHERE show_id = %s AND seats_booked + %s <= capacity
+        """,
+        (seat_count, show_id, seat_count)
+    )
+    if cursor.rowcount:
+        return
+
+    cursor.execute("SELECT capacity - seats_booked AS remaining FROM show_occupancy WHERE show_id = %s", (show_id,))
+    counter = cursor.fetchone()
+    if counter is None:
+        # Show predates the counters; seed it from the seats already sold and retry
+        cursor.execute(
+            """
+            INSERT INTO show_occupancy (show_id, capacity, seats_booked)
+            SELECT s.show_id, sc.total_seats,
+                   (SELECT COUNT(*) FROM show_seats ss WHERE ss.show_id = s.show_id)
+            FROM shows s
+            JOIN screens sc ON s.screen_id = sc.screen_id
+            WHERE s.show_id = %s
+            """,
+            (show_id,)
+        )
+        return _reserve_capacity(cursor, show_id, seat_count)
+    if counter['remaining'] <= 0:
+        raise SoldOutError('No seats available for this show!')
+    raise SoldOutError(f'Only {counter["remaining"]} seats are left for this show.')
+
+
+def _claim_hold(cursor, show_id, seats, hold_token):
+    """Convert the caller's hold on ``seats``; True if it covered all of them.
+
+    Seats not covered by the caller's hold are checked against everyone else's
+    live holds instead.
+    """
+    placeholders = ', '.join(['%s'] * len(seats))
+    claimed = False
+    if hold_token:
+        cursor.execute(
+            f"""
+            DELETE FROM seat_holds
+            WHERE show_id = %s AND hold_token = %s AND expires_at > NOW(3)
+              AND seat_number IN ({placeholders})
+            """,
+            [show_id, hold_token] + seats
+        )
+        claimed = cursor.rowcount == len(seats)
+        # Anything else the customer had held for this show is no longer needed
+        cursor.execute("DELETE FROM seat_holds WHERE show_id = %s AND hold_token = %s", (show_id, hold_token))
+    if claimed:
+        return True
+
+    cursor.execute(
+        f"""
+        SELECT seat_number FROM seat_holds
+        WHERE show_id = %s AND seat_number IN ({placeholders})
+          AND expires_at > NOW(3) AND hold_token <> %s
+        """,
+        [show_id] + seats + [hold_token or '']
+    )
+    held = [row['seat_number'] for row in cursor.fetchall()]
+    if held:
+        raise SeatHeldError(held)
+    return False
+
+
+def create_booking(user_id, show_id, seats, payment_mode):
+    """Book ``seats`` for ``show_id`` and record the payment.
+
+    Returns ``(booking_id, total_amount)``. Raises a BookingError subclass when
+    the show is missing, a seat label is invalid or a seat is already taken
+    or held; in every failure case nothing is written.
+    """
+    booking_id, total_amount, _ = create_booking_from_hold(user_id, show_id, seats, payment_mode, None)
+    return booking_id, total_amount
+
+
+def create_booking_from_hold(user_id, show_id, seats, payment_mode, hold_token):
+    """Like create_booking, converting the seat hold identified by ``hold_token``.
+
+    Returns ``(booking_id, total_amount, hold_claimed)``; ``hold_claimed`` is
+    False when the hold had lapsed (or didn't cover every seat) and the seats
+    had to be checked against other customers' holds instead.
+    """
+    seats = normalize_seats(seats)
+    if not seats:
+        raise BookingError('Please select at least one seat.')
+    if len(seats) > MAX_SEATS_PER_BOOKING:
+        raise BookingError(f'You can book at most {MAX_SEATS_PER_BOOKING} seats at a time.')
+
+    def book(cursor):
+        cursor.execute(
+            """
+            SELECT s.price, sc.total_seats, m.title
+            FROM shows s
+            JOIN screens sc ON s.screen_id = sc.screen_id
+            JOIN movies m ON s.movie_id = m.movie_id
+            WHERE s.show_id = %s
+            FOR UPDATE OF s
+            """,
+            (show_id,)
+        )
+        show = cursor.fetchone()
+        if not show:
+            raise ShowNotFoundError('Invalid show.')
+
+        invalid = [seat for seat in seats if not is_valid_seat(seat, show['total_seats'])]
+        if invalid:
+            raise BookingError(f'Invalid seat selection: {", ".join(invalid)}')
+
+        hold_claimed = _claim_hold(cursor, show_id, seats, hold_token)
+        total_amount = float(show['price']) * len(seats)
+        _reserve_capacity(cursor, show_id, len(seats))
+
+        cursor.execute(
+            "INSERT INTO bookings (user_id, show_id, total_amount, status) VALUES (%s, %s, %s, 'confirmed')",
+            (user_id, show_id, total_amount)
+        )
+        booking_id = cursor.lastrowid
+
+        try:
+            cursor.executemany(
+                "INSERT INTO show_seats (show_id, seat_number, booking_id) VALUES (%s, %s, %s)",
+                [(show_id, seat, booking_id) for seat in seats]
+            )
+        except MySQLdb.IntegrityError as e:
+            if e.args[0] != ER_DUP_ENTRY:
+                raise
+            placeholders = ', '.join(['%s'] * len(seats))
+            cursor.execute(
+                f"SELECT seat_number FROM show_seats WHERE show_id = %s AND seat_number IN ({placeholders})",
+                [show_id] + seats
+            )
+            raise SeatUnavailableError([row['seat_number'] for row in cursor.fetchall()])
+
+        cursor.executemany(
+            "INSERT INTO booking_details (booking_id, seat_number) VALUES (%s, %s)",
+            [(booking_id, seat) for seat in seats]
+        )
+        cursor.execute(
+            "INSERT INTO payments (booking_id, amount, payment_mode, payment_status) VALUES (%s, %s, %s, 'success')",
+            (booking_id, total_amount, payment_mode)
+        )
+        return booking_id, total_amount, hold_claimed, show['title']
+
+    booking_id, total_amount, hold_claimed, title = execute_transaction(book)
+    current_app.audit_log.record_activity(user_id, booking_id, 'NEW_BOOKING',
+                                          f'Booked: {title}. Amount: ${total_amount:.2f}')
+    return booking_id, total_amount, hold_claimed
@@ -0,0 +1,84 @@
+"""gzip for HTML and JSON responses.
+
+An ``after_request`` hook compresses a response when the client accepts
+gzip, the body is at least ``min_size`` bytes and its type is in
+``mimetypes``. Smaller bodies aren't worth it: below about a kilobyte the
+gzip header and the CPU cost outweigh the bytes saved. Compressible
+responses get ``Vary: Accept-Encoding`` whether or not they were
+compressed, so a shared cache never hands gzip to a client that didn't ask
+for it.
+
+Left alone:
+
+* streamed bodies (the seat map event stream, report exports), which are
+  never buffered;
+* responses that already have a Content-Encoding (the gzipped export
+  option, the precompressed /assets/ files);
+* 304s and other bodiless statuses.
+
+ETags on compressed responses are made weak, since the bytes differ from the
+uncompressed representation. utils/versions.py only issues weak ones.
+"""
+
+import gzip
+import threading
+
+from flask import request
+
+MIMETYPES = ('text/html', 'application/json', 'text/plain', 'text/csv', 'image/svg+xml')
+
+
+class ResponseCompressor:
+    """Compresses eligible responses of a Flask app in an ``after_request`` hook"""
+
+    def __init__(self, min_size=1024, level=6, mimetypes=MIMETYPES):
+        self.min_size = min_size
+        self.level = level
+        self.mimetypes = set(mimetypes)
+        self._lock = threading.Lock()
+        self._stats = {'compressed': 0, 'too_small': 0, 'not_accepted': 0, 'bytes_in': 0, 'bytes_out': 0}
+
+    @classmethod
+    def from_app(cls, app):
+        config = app.config
+        compressor = cls(min_size=config.get('COMPRESS_MIN_SIZE', 1024),
+                         level=config.get('COMPRESS_LEVEL', 6))
+        app.after_request(compressor.compress)
+        return compressor
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def compress(self, response):
+        if response.mimetype not in self.mimetypes:
+            return response
+        if (response.direct_passthrough or response.is_streamed or 'Content-Encoding' in response.headers
+                or response.status_code < 200 or response.status_code in (204, 304)):
+            return response
+        response.vary.add('Accept-Encoding')
+        if not request.accept_encodings['gzip']:
+            self._count('not_accepted')
+            return response
+        data = response.get_data()
+        if len(data) < self.min_size:
+            self._count('too_small')
+            return response
+        compressed = gzip.compress(data, self.level)
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = 'gzip'
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        with self._lock:
+            self._stats['compressed'] += 1
+            self._stats['bytes_in'] += len(data)
+            self._stats['bytes_out'] += len(compressed)
+        return response
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['ratio'] = round(snapshot['bytes_out'] / snapshot['bytes_in'], 3) if snapshot['bytes_in'] else None
+        snapshot['min_size'] = self.min_size
+        return snapshot
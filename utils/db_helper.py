@@ -1,95 +1,252 @@
-from flask import current_app
+import time
+
+from flask import current_app, g, has_request_context, session
 import MySQLdb.cursors
 
-def get_db_connection():
-    """Get database connection using Flask-MySQLdb"""
-    return current_app.mysql.connection
-
-def execute_query(query, params=None, fetch=True):
-    """Execute a query and return results"""
-    conn = None
-    cursor = None
-    
+# Callables run as listener(query, params) before each statement is executed
+_query_listeners = []
+
+def add_query_listener(listener):
+    """Register a callable to observe every statement sent through this module"""
+    _query_listeners.append(listener)
+
+def remove_query_listener(listener):
+    """Unregister a listener added with add_query_listener"""
+    if listener in _query_listeners:
+        _query_listeners.remove(listener)
+
+def _notify(query, params):
+    for listener in list(_query_listeners):
+        listener(query, params)
+
+# Callables run as observer(query, params, seconds) after each statement finishes
+_query_observers = []
+
+def add_query_observer(observer):
+    """Register a callable to be told how long every statement took, failed or not"""
+    _query_observers.append(observer)
+
+def remove_query_observer(observer):
+    """Unregister an observer added with add_query_observer"""
+    if observer in _query_observers:
+        _query_observers.remove(observer)
+
+def _observe(query, params, seconds):
+    for observer in list(_query_observers):
+        observer(query, params, seconds)
+
+def _run(cursor, query, params, many=False):
+    """Execute one statement on ``cursor``, telling listeners and observers about it"""
+    _notify(query, params)
+    started = time.perf_counter()
     try:
-        conn = get_db_connection()
+        if many:
+            return cursor.executemany(query, params)
+        return cursor.execute(query, params or ())
+    finally:
+        _observe(query, params, time.perf_counter() - started)
+
+class _ObservedCursor:
+    """Cursor handed to execute_transaction callables; routes statements through _run"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, params=None):
+        return _run(self._cursor, query, params)
+
+    def executemany(self, query, params):
+        return _run(self._cursor, query, params, many=True)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+def get_db_connection():
+    """Borrow a connection from the application's connection pool.
+
+    Use as a context manager; the connection goes back to the pool when the
+    block exits (or is discarded if the server dropped it).
+    """
+    return current_app.db_pool.connection()
+
+def _replicas_allowed(primary=False):
+    """True if a read may be served by a replica (see utils/db_replicas.py)"""
+    replicas = getattr(current_app, 'db_replicas', None)
+    if primary or not replicas:
+        return False
+    if has_request_context():
+        # Read your own writes: this request's, and this session's for a while
+        if g.get('db_wrote') or session.get('primary_until', 0) > time.time():
+            return False
+    return True
+
+def _mark_write():
+    """Keep this request, and the session for ``sticky_seconds``, reading from the primary"""
+    replicas = getattr(current_app, 'db_replicas', None)
+    if not replicas or not has_request_context():
+        return
+    g.db_wrote = True
+    session['primary_until'] = int(time.time() + replicas.sticky_seconds) + 1
+
+def get_read_connection(primary=False):
+    """Borrow a connection for a read: a replica when one is usable, else the primary"""
+    if _replicas_allowed(primary):
+        return current_app.db_replicas.connection(current_app.db_pool)
+    return get_db_connection()
+
+def execute_query(query, params=None, fetch=True, primary=False):
+    """Execute a query and return results.
+
+    SELECTs may be served by a read replica; pass ``primary=True`` for reads
+    that must see every committed write.
+    """
+    is_select = query.strip().upper().startswith('SELECT')
+    if not is_select:
+        _mark_write()
+    with (get_read_connection(primary) if is_select else get_db_connection()) as conn:
         cursor = conn.cursor(MySQLdb.cursors.DictCursor)
-        cursor.execute(query, params or ())
-        
-        if fetch:
-            if query.strip().upper().startswith('SELECT'):
-                results = cursor.fetchall()
-                return results
+        try:
+            _run(cursor, query, params)
+
+            if fetch:
+                if is_select:
+                    results = cursor.fetchall()
+                    return results
+                else:
+                    conn.commit()
+                    return cursor.lastrowid
             else:
                 conn.commit()
-                return cursor.lastrowid
-        else:
-            conn.commit()
-            return True
-            
-    except Exception as e:
-        if conn:
+                return True
+
+        except Exception as e:
             conn.rollback()
-        raise e
-    finally:
-        if cursor:
+            raise e
+        finally:
             cursor.close()
 
+def stream_query(query, params=None, batch_size=1000, net_write_timeout=600, primary=False):
+    """Iterate over the rows of a SELECT without buffering the result set.
+
+    Rows come from an unbuffered server-side cursor ``batch_size`` at a time,
+    so memory stays flat however many rows match. The pooled connection is
+    held until the iterator is exhausted or closed; an iterator abandoned
+    part-way discards its connection rather than reading the remaining rows
+    off the wire. ``net_write_timeout`` lets the server wait that long for a
+    slow consumer before giving up on the result. Like ``execute_query``, the
+    rows come from a read replica when one is usable.
+    """
+    primary_pool = current_app.db_pool
+    replica = current_app.db_replicas.choose() if _replicas_allowed(primary) else None
+
+    def rows():
+        pool = primary_pool
+        record = None
+        if replica is not None:
+            try:
+                record = replica.pool.acquire()
+                pool = replica.pool
+            except Exception:
+                record = None  # busy or down: read from the primary instead
+        if record is None:
+            record = pool.acquire()
+        cursor = record.conn.cursor(MySQLdb.cursors.SSDictCursor)
+        finished = False
+        try:
+            cursor.execute("SET SESSION net_write_timeout = %s", (net_write_timeout,))
+            _run(cursor, query, params)
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield from batch
+            finished = True
+            cursor.close()
+        finally:
+            pool.release(record, discard=not finished)
+
+    return rows()
+
 def call_procedure(proc_name, params=None):
     """Call a stored procedure"""
-    conn = get_db_connection()
-    cursor = conn.cursor(MySQLdb.cursors.DictCursor)
-    
-    try:
-        cursor.callproc(proc_name, params or ())
-        
-        # Handle multiple result sets
-        results = []
+    _mark_write()
+    with get_db_connection() as conn:
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+
         try:
-            # Get the first result set
-            results = cursor.fetchall()
-            
-            # Consume any additional result sets
-            while cursor.nextset():
+            _notify(f'CALL {proc_name}', params)
+            started = time.perf_counter()
+            try:
+                cursor.callproc(proc_name, params or ())
+            finally:
+                _observe(f'CALL {proc_name}', params, time.perf_counter() - started)
+
+            # Handle multiple result sets
+            results = []
+            try:
+                # Get the first result set
+                results = cursor.fetchall()
+
+                # Consume any additional result sets
+                while cursor.nextset():
+                    pass
+
+            except Exception:
+                # If no results, that's okay for some procedures
                 pass
-                
-        except Exception:
-            # If no results, that's okay for some procedures
-            pass
-            
-        conn.commit()
-        return results
-        
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        cursor.close()
 
-def call_function(func_query, params=None):
-    """Call a database function"""
-    try:
-        conn = get_db_connection()
+            conn.commit()
+            return results
+
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+
+def call_function(func_query, params=None, primary=False):
+    """Call a database function (a read, so it may be served by a replica)"""
+    with get_read_connection(primary) as conn:
         cursor = conn.cursor()
-        cursor.execute(func_query, params or ())
-        result = cursor.fetchone()
-        return result[0] if result else 0
-    except Exception as e:
-        raise e
-    finally:
-        cursor.close()
+        try:
+            _run(cursor, func_query, params)
+            result = cursor.fetchone()
+            return result[0] if result else 0
+        finally:
+            cursor.close()
 
 def execute_transaction(queries_with_params):
-    """Execute multiple queries in a transaction"""
-    conn = get_db_connection()
-    cursor = conn.cursor(MySQLdb.cursors.DictCursor)
-    
-    try:
-        for query, params in queries_with_params:
-            cursor.execute(query, params)
-        conn.commit()
-        return True
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        cursor.close()
\ No newline at end of file
+    """Execute multiple queries in a transaction.
+
+    Accepts either a list of ``(query, params)`` pairs, or a callable that is
+    given the transaction's DictCursor (wrapped so its statements are observed
+    like any other) and whose return value is passed back after commit. Any
+    exception rolls the whole transaction back. Transactions always run on
+    the primary.
+    """
+    _mark_write()
+    with get_db_connection() as conn:
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+
+        try:
+            conn.begin()
+            if callable(queries_with_params):
+                result = queries_with_params(_ObservedCursor(cursor))
+            else:
+                for query, params in queries_with_params:
+                    _run(cursor, query, params)
+                result = True
+            conn.commit()
+            return result
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+
+def get_pool_stats():
+    """Current connection pool statistics for this process"""
+    return current_app.db_pool.stats()
@@ -0,0 +1,290 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import MySQLdb
+
+# Connections inherited from a parent process are parked here instead of being
+# closed, so the child never sends COM_QUIT on a socket the parent still uses.
+_inherited_connections = []
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out before the timeout"""
+
+
+class _PooledConnection:
+    """A raw MySQLdb connection plus the bookkeeping the pool needs"""
+
+    def __init__(self, conn, generation):
+        self.conn = conn
+        self.generation = generation
+        self.pid = os.getpid()
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.uses = 0
+
+
+class ConnectionPool:
+    """Bounded, thread-safe MySQL connection pool.
+
+    The pool is fork-aware: the first checkout in a new process drops whatever
+    was inherited from the parent, so it is safe to create before a pre-fork
+    server spawns its workers.
+    """
+
+    def __init__(self, connect_kwargs, min_size=2, max_size=20, timeout=10.0,
+                 recycle_uses=5000, recycle_seconds=3600, ping_interval=0):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError('Invalid pool size: min=%s max=%s' % (min_size, max_size))
+        self.connect_kwargs = connect_kwargs
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle_uses = recycle_uses
+        self.recycle_seconds = recycle_seconds
+        self.ping_interval = ping_interval
+
+        self._cond = threading.Condition(threading.Lock())
+        self._reset_state()
+
+    @classmethod
+    def from_config(cls, config, host=None, port=None, max_size=None):
+        """Build a pool from the Flask config (MYSQL_* and DB_POOL_* keys).
+
+        ``host``, ``port`` and ``max_size`` override the config, e.g. for a
+        read replica that shares the primary's credentials.
+        """
+        connect_kwargs = {
+            'host': host or config['MYSQL_HOST'],
+            'user': config['MYSQL_USER'],
+            'passwd': config['MYSQL_PASSWORD'],
+            'db': config['MYSQL_DB'],
+            'port': port or config.get('MYSQL_PORT', 3306),
+            'connect_timeout': config.get('MYSQL_CONNECT_TIMEOUT', 10),
+            'autocommit': config.get('MYSQL_AUTOCOMMIT', True),
+            'charset': config.get('MYSQL_CHARSET', 'utf8mb4'),
+            'use_unicode': True,
+        }
+        max_size = max_size or config.get('DB_POOL_MAX_SIZE', 20)
+        return cls(
+            connect_kwargs,
+            min_size=min(config.get('DB_POOL_MIN_SIZE', 2), max_size),
+            max_size=max_size,
+            timeout=config.get('DB_POOL_TIMEOUT', 10.0),
+            recycle_uses=config.get('DB_POOL_RECYCLE_USES', 5000),
+            recycle_seconds=config.get('DB_POOL_RECYCLE_SECONDS', 3600),
+            ping_interval=config.get('DB_POOL_PING_INTERVAL', 0),
+        )
+
+    def _reset_state(self):
+        self._pid = os.getpid()
+        self._idle = deque()
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._generation = 0
+        self._warmed = False
+        self._stats = {
+            'acquired_total': 0,
+            'timeouts_total': 0,
+            'created_total': 0,
+            'recycled_total': 0,
+            'discarded_total': 0,
+            'ping_failures_total': 0,
+            'wait_seconds_total': 0.0,
+            'wait_seconds_max': 0.0,
+        }
+
+    def _check_pid(self):
+        """Forget connections inherited across a fork (caller holds the lock)"""
+        if self._pid != os.getpid():
+            _inherited_connections.extend(record.conn for record in self._idle)
+            self._reset_state()
+
+    def _connect(self):
+        conn = MySQLdb.connect(**self.connect_kwargs)
+        with self._cond:
+            self._stats['created_total'] += 1
+            generation = self._generation
+        return _PooledConnection(conn, generation)
+
+    @staticmethod
+    def _close_quietly(record):
+        try:
+            record.conn.close()
+        except Exception:
+            pass
+
+    def _is_expired(self, record):
+        if self.recycle_uses and record.uses >= self.recycle_uses:
+            return True
+        if self.recycle_seconds and time.monotonic() - record.created_at >= self.recycle_seconds:
+            return True
+        return False
+
+    def _is_alive(self, record):
+        if time.monotonic() - record.last_used < self.ping_interval:
+            return True
+        try:
+            record.conn.ping()
+            return True
+        except MySQLdb.Error:
+            return False
+
+    def _purge_stale_idle(self):
+        """Drop idle connections opened before the server went away (caller holds the lock)"""
+        stale = [record for record in self._idle if record.generation != self._generation]
+        if stale:
+            self._idle = deque(record for record in self._idle if record.generation == self._generation)
+            self._size -= len(stale)
+            self._stats['discarded_total'] += len(stale)
+        return stale
+
+    def warm(self):
+        """Open connections until the pool holds at least ``min_size``"""
+        with self._cond:
+            self._check_pid()
+            self._warmed = True
+            missing = max(0, self.min_size - self._size)
+            self._size += missing
+        opened = []
+        try:
+            for _ in range(missing):
+                opened.append(self._connect())
+        finally:
+            with self._cond:
+                self._size -= missing - len(opened)
+                self._idle.extend(opened)
+                self._cond.notify_all()
+
+    def acquire(self):
+        """Check out a live connection, waiting up to ``timeout`` seconds"""
+        if not self._warmed or self._pid != os.getpid():
+            self.warm()
+
+        started = time.monotonic()
+        deadline = started + self.timeout
+        record = None
+        with self._cond:
+            self._check_pid()
+            self._waiting += 1
+            try:
+                while True:
+                    if self._idle:
+                        record = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        # Reserve the slot now, connect outside the lock
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts_total'] += 1
+                        raise PoolTimeoutError(
+                            'Timed out after %.1fs waiting for a database connection '
+                            '(%d/%d in use)' % (self.timeout, self._in_use, self.max_size)
+                        )
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+        try:
+            record = self._prepare(record)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.monotonic() - started
+        with self._cond:
+            self._in_use += 1
+            self._stats['acquired_total'] += 1
+            self._stats['wait_seconds_total'] += waited
+            self._stats['wait_seconds_max'] = max(self._stats['wait_seconds_max'], waited)
+        return record
+
+    def _prepare(self, record):
+        """Return a usable connection for a reserved slot, replacing stale ones"""
+        if record is not None and self._is_expired(record):
+            self._close_quietly(record)
+            with self._cond:
+                self._stats['recycled_total'] += 1
+            record = None
+
+        if record is not None and not self._is_alive(record):
+            # The server restarted or dropped us; everything idle is suspect too
+            self._close_quietly(record)
+            with self._cond:
+                self._stats['ping_failures_total'] += 1
+                self._stats['discarded_total'] += 1
+                self._generation += 1
+                stale = self._purge_stale_idle()
+            for old in stale:
+                self._close_quietly(old)
+            record = None
+
+        if record is None:
+            record = self._connect()
+        return record
+
+    def release(self, record, discard=False):
+        """Return a connection to the pool, or close it if it is broken"""
+        record.uses += 1
+        record.last_used = time.monotonic()
+        with self._cond:
+            if record.pid != self._pid:
+                return
+            self._in_use -= 1
+            if discard or record.generation != self._generation:
+                self._size -= 1
+                self._stats['discarded_total'] += 1
+            else:
+                self._idle.append(record)
+                record = None
+            self._cond.notify()
+        if record is not None:
+            self._close_quietly(record)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a ``with`` block"""
+        record = self.acquire()
+        broken = False
+        try:
+            yield record.conn
+        except (MySQLdb.OperationalError, MySQLdb.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.release(record, discard=broken)
+
+    def close_all(self):
+        """Close every idle connection (checked-out ones close on release)"""
+        with self._cond:
+            self._check_pid()
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._generation += 1
+        for record in idle:
+            self._close_quietly(record)
+
+    def stats(self):
+        """Snapshot of pool occupancy and wait-time counters"""
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot.update({
+                'pid': self._pid,
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'waiting': self._waiting,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+            })
+        acquired = snapshot['acquired_total']
+        snapshot['wait_seconds_avg'] = snapshot['wait_seconds_total'] / acquired if acquired else 0.0
+        return snapshot
@@ -0,0 +1,194 @@
+"""Read replicas for utils/db_helper.
+
+``DB_REPLICAS`` lists read replicas as ``host:port`` pairs, e.g.
+``127.0.0.1:3307,127.0.0.1:3308``. Each replica gets its own
+ConnectionPool with the primary's credentials. A background thread checks
+every replica every ``check_interval`` seconds with ``SHOW REPLICA STATUS``
+(``SHOW SLAVE STATUS`` on servers older than 8.0.22), so the user needs the
+REPLICATION CLIENT privilege. A replica is used only while both replication
+threads are running and it is at most ``max_lag`` seconds behind.
+Each read goes to whichever of two randomly picked eligible replicas is
+less busy (fewest connections in use, then least lag). A server that isn't
+replicating, can't be reached, or hasn't been checked yet gets no reads.
+
+db_helper decides whether a read may go to a replica at all. Transactions,
+writes and reads marked ``primary=True`` always use the primary. After a
+request writes, that request's later reads also stay on the primary, and so
+do the session's reads for ``sticky_seconds``. That way a customer who has
+just booked or cancelled always sees the change on ``my_bookings``.
+"""
+
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import MySQLdb
+import MySQLdb.cursors
+
+from utils.db_pool import ConnectionPool, PoolTimeoutError
+
+
+class Replica:
+    """One read replica: its pool and the outcome of the latest health check"""
+
+    def __init__(self, name, pool):
+        self.name = name
+        self.pool = pool
+        self.healthy = False
+        self.lag = None
+        self.error = 'not checked yet'
+        self.checked_at = None
+        self.reads = 0
+
+    def check(self):
+        """Refresh ``healthy`` and ``lag`` from the server's replication status"""
+        try:
+            with self.pool.connection() as conn:
+                cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+                try:
+                    try:
+                        cursor.execute("SHOW REPLICA STATUS")
+                    except MySQLdb.ProgrammingError:
+                        cursor.execute("SHOW SLAVE STATUS")
+                    status = cursor.fetchone()
+                finally:
+                    cursor.close()
+        except PoolTimeoutError:
+            return  # every connection busy serving reads; it's alive, keep the last reading
+        except Exception as e:
+            self._set(False, None, f'unreachable: {e}')
+            return
+        if not status:
+            self._set(False, None, 'not replicating')
+            return
+        io_running = status.get('Replica_IO_Running', status.get('Slave_IO_Running'))
+        sql_running = status.get('Replica_SQL_Running', status.get('Slave_SQL_Running'))
+        lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+        if io_running != 'Yes' or sql_running != 'Yes' or lag is None:
+            self._set(False, lag, f'replication stopped (io={io_running}, sql={sql_running})')
+        else:
+            self._set(True, int(lag), None)
+
+    def _set(self, healthy, lag, error):
+        self.healthy = healthy
+        self.lag = lag
+        self.error = error
+        self.checked_at = time.time()
+
+
+class ReplicaSet:
+    """Health-checked, lag-aware routing of reads across replica pools"""
+
+    def __init__(self, replicas, max_lag=2, check_interval=2.0, sticky_seconds=10):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.sticky_seconds = sticky_seconds
+        self._lock = threading.Lock()
+        self._checker = None
+        self._pid = None
+        self._stats = {'replica_reads': 0, 'primary_reads': 0, 'fallbacks': 0}
+
+    @classmethod
+    def from_config(cls, config):
+        replicas = []
+        for address in filter(None, (part.strip() for part in (config.get('DB_REPLICAS') or '').split(','))):
+            host, _, port = address.partition(':')
+            pool = ConnectionPool.from_config(config, host=host, port=int(port or 3306),
+                                              max_size=config.get('DB_REPLICA_POOL_MAX_SIZE'))
+            # A busy replica should send reads to the primary, not keep them waiting
+            pool.timeout = config.get('DB_REPLICA_POOL_TIMEOUT', 0.5)
+            replicas.append(Replica(address, pool))
+        return cls(replicas,
+                   max_lag=config.get('DB_REPLICA_MAX_LAG', 2),
+                   check_interval=config.get('DB_REPLICA_CHECK_INTERVAL', 2.0),
+                   sticky_seconds=config.get('DB_STICKY_PRIMARY_SECONDS', 10))
+
+    def __bool__(self):
+        return bool(self.replicas)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    # -- health checks ----------------------------------------------------
+
+    def _ensure_checker(self):
+        with self._lock:
+            if self._checker is not None and self._pid == os.getpid():
+                return
+            # Started lazily, and again after a fork: threads don't survive fork
+            self._pid = os.getpid()
+            self._checker = threading.Thread(target=self._run, name='replica-health', daemon=True)
+            self._checker.start()
+
+    def _run(self):
+        while True:
+            self.check_all()
+            time.sleep(self.check_interval)
+
+    def check_all(self):
+        for replica in self.replicas:
+            replica.check()
+
+    # -- routing ----------------------------------------------------------
+
+    def choose(self):
+        """The replica to read from, or None if none is fit to serve reads"""
+        self._ensure_checker()
+        eligible = [r for r in self.replicas if r.healthy and r.lag is not None and r.lag <= self.max_lag]
+        if not eligible:
+            return None
+        if len(eligible) == 1:
+            return eligible[0]
+        # Power of two choices: nearly as good as the global minimum, without herding
+        first, second = random.sample(eligible, 2)
+        load = lambda replica: (replica.pool.stats()['in_use'], replica.lag)
+        return first if load(first) <= load(second) else second
+
+    @contextmanager
+    def connection(self, primary_pool):
+        """Borrow a connection from a replica, or from ``primary_pool`` if none is usable"""
+        replica = self.choose()
+        record = None
+        if replica is not None:
+            try:
+                record = replica.pool.acquire()
+            except PoolTimeoutError:
+                self._count('fallbacks')  # busy, not broken
+            except Exception as e:
+                # Don't wait for the next check to stop using it
+                replica._set(False, None, f'unreachable: {e}')
+                self._count('fallbacks')
+        if record is None:
+            self._count('primary_reads')
+            with primary_pool.connection() as conn:
+                yield conn
+            return
+
+        self._count('replica_reads')
+        replica.reads += 1
+        broken = False
+        try:
+            yield record.conn
+        except (MySQLdb.OperationalError, MySQLdb.InterfaceError):
+            broken = True
+            raise
+        finally:
+            replica.pool.release(record, discard=broken)
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot.update({
+            'max_lag': self.max_lag,
+            'sticky_seconds': self.sticky_seconds,
+            'replicas': [
+                {'name': r.name, 'healthy': r.healthy, 'lag': r.lag, 'error': r.error,
+                 'checked_at': r.checked_at, 'reads': r.reads, 'pool': r.pool.stats()}
+                for r in self.replicas
+            ],
+        })
+        return snapshot
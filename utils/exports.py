@@ -0,0 +1,181 @@
+"""Streaming CSV/NDJSON exports of the admin reports.
+
+Rows are read through ``stream_query`` (an unbuffered server-side cursor) and
+encoded a chunk at a time into the response, optionally gzipped on the fly,
+so an export of any size runs in flat memory. Every export has a stable row
+order so an interrupted download can be resumed: ``offset`` skips rows
+already received, and the booking-level exports also accept ``after`` (the
+last booking_id received), which resumes with an index range read.
+"""
+
+import csv
+import datetime
+import decimal
+import io
+import json
+import zlib
+
+from utils.db_helper import stream_query
+from utils.reports import BOOKING_REPORT_FROM
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Rows encoded per chunk handed to the WSGI server
+CHUNK_ROWS = 500
+
+EXPORTS = {
+    'bookings': {
+        'columns': ['booking_id', 'Customer', 'Movie', 'Theater', 'ShowTime', 'BookedOn', 'Amount', 'Status'],
+        'query': """
+            SELECT b.booking_id, u.name AS Customer, m.title AS Movie, t.name AS Theater,
+                   s.show_time AS ShowTime, b.booking_date AS BookedOn,
+                   b.total_amount AS Amount, b.status AS Status
+            """ + BOOKING_REPORT_FROM + "{where} ORDER BY b.booking_id",
+        'date_column': 'b.booking_date',
+        'keyset': True,
+    },
+    'customer_booking_summary': {
+        'columns': ['booking_id', 'CustomerName', 'Movie', 'Theater', 'ShowTime', 'Amount', 'Status'],
+        'query': """
+            SELECT b.booking_id, u.name AS CustomerName, m.title AS Movie, t.name AS Theater,
+                   s.show_time AS ShowTime, b.total_amount AS Amount, b.status AS Status
+            """ + BOOKING_REPORT_FROM + "{where} ORDER BY b.booking_id",
+        'date_column': 'b.booking_date',
+        'keyset': True,
+    },
+    # The revenue views, restated against revenue_daily so a date range can apply
+    'movie_revenue': {
+        'columns': ['title', 'total_bookings', 'total_revenue'],
+        'query': """
+            SELECT m.title, SUM(r.confirmed_bookings) AS total_bookings, SUM(r.revenue) AS total_revenue
+            FROM revenue_daily r
+            JOIN movies m ON r.movie_id = m.movie_id
+            {where}
+            GROUP BY m.title
+            HAVING SUM(r.confirmed_bookings) > 0
+            ORDER BY m.title
+            """,
+        'date_column': 'r.revenue_day',
+        'keyset': False,
+    },
+    'theater_revenue_summary': {
+        'columns': ['TheaterName', 'TotalRevenue', 'TotalBookings'],
+        'query': """
+            SELECT t.name AS TheaterName, SUM(r.revenue) AS TotalRevenue,
+                   SUM(r.confirmed_bookings) AS TotalBookings
+            FROM revenue_daily r
+            JOIN theaters t ON r.theater_id = t.theater_id
+            {where}
+            GROUP BY t.theater_id, t.name
+            HAVING SUM(r.confirmed_bookings) > 0
+            ORDER BY t.theater_id
+            """,
+        'date_column': 'r.revenue_day',
+        'keyset': False,
+    },
+}
+
+class ExportRequestError(ValueError):
+    """The export request names an unknown report or format, or has a bad filter"""
+
+def _date_arg(args, name):
+    value = args.get(name, '').strip()
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ExportRequestError(f'{name} must be a YYYY-MM-DD date')
+
+def _int_arg(args, name):
+    value = args.get(name, '').strip()
+    if not value:
+        return 0
+    if not value.isdigit():
+        raise ExportRequestError(f'{name} must be a non-negative integer')
+    return int(value)
+
+def _build_query(export, args):
+    clauses, params = ['1=1'], []
+    date_from, date_to = _date_arg(args, 'date_from'), _date_arg(args, 'date_to')
+    if date_from:
+        clauses.append(f"{export['date_column']} >= %s")
+        params.append(date_from)
+    if date_to:
+        clauses.append(f"{export['date_column']} < %s")
+        params.append(date_to + datetime.timedelta(days=1))
+
+    after = _int_arg(args, 'after')
+    if after:
+        if not export['keyset']:
+            raise ExportRequestError('after is only supported for booking-level exports')
+        clauses.append('b.booking_id > %s')
+        params.append(after)
+
+    query = export['query'].format(where='WHERE ' + ' AND '.join(clauses))
+    offset = _int_arg(args, 'offset')
+    if offset:
+        # MySQL has no OFFSET without LIMIT; this is its documented "all rows"
+        query += ' LIMIT 18446744073709551615 OFFSET %s'
+        params.append(offset)
+    return query, params, bool(after or offset)
+
+def _plain(row):
+    for key, value in row.items():
+        if isinstance(value, (datetime.datetime, datetime.date)):
+            row[key] = value.isoformat(sep=' ') if isinstance(value, datetime.datetime) else value.isoformat()
+        elif isinstance(value, decimal.Decimal):
+            row[key] = str(value)
+    return row
+
+def _encode(rows, fmt, columns, header):
+    """Yield the rows as text chunks of CHUNK_ROWS rows each"""
+    buffer = io.StringIO()
+    if fmt == 'csv':
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+        if header:
+            writer.writeheader()
+        write = writer.writerow
+    else:
+        def write(row):
+            buffer.write(json.dumps(row, ensure_ascii=False))
+            buffer.write('\n')
+
+    for count, row in enumerate(rows, 1):
+        write(_plain(row))
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    tail = buffer.getvalue()
+    if tail:
+        yield tail
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+def export_report(name, args):
+    """Return (body iterator, mimetype, filename) for a streaming report export"""
+    export = EXPORTS.get(name)
+    if export is None:
+        raise ExportRequestError(f'unknown report {name!r}')
+    fmt = args.get('format', 'csv')
+    if fmt not in FORMATS:
+        raise ExportRequestError(f'format must be one of {", ".join(FORMATS)}')
+
+    query, params, resuming = _build_query(export, args)
+    # A resumed CSV is appended to the partial file, so it must not repeat the header
+    chunks = _encode(stream_query(query, params), fmt, export['columns'], header=not resuming)
+
+    filename = f'{name}-{datetime.date.today():%Y%m%d}.{fmt}'
+    if args.get('gzip') in ('1', 'true'):
+        return _gzip(chunks), 'application/gzip', filename + '.gz'
+    return (chunk.encode('utf-8') for chunk in chunks), FORMATS[fmt], filename
@@ -0,0 +1,167 @@
+"""Minimal client for Redis-protocol (RESP) key-value servers.
+
+Only the handful of commands the session store needs are wrapped, but
+``execute`` sends any command. Works against Redis, Valkey, KeyDB, or the
+stand-in server in utils/kv_server.py. Connections are pooled per process
+and, like the MySQL pool, dropped after a fork so workers never share a
+socket with their parent.
+"""
+
+import os
+import socket
+import threading
+from urllib.parse import urlparse
+
+
+class KVError(Exception):
+    """The server returned an error reply or the connection failed"""
+
+
+def _encode(args):
+    out = [b'*%d\r\n' % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode('utf-8')
+        elif isinstance(arg, int):
+            arg = str(arg).encode('ascii')
+        out.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+    return b''.join(out)
+
+
+def read_reply(stream):
+    """Read one RESP reply from a buffered binary stream"""
+    line = stream.readline()
+    if not line.endswith(b'\r\n'):
+        raise KVError('connection closed by server')
+    kind, body = line[:1], line[1:-2]
+    if kind == b'+':
+        return body.decode('utf-8')
+    if kind == b'-':
+        raise KVError(body.decode('utf-8', 'replace'))
+    if kind == b':':
+        return int(body)
+    if kind == b'$':
+        length = int(body)
+        if length < 0:
+            return None
+        data = stream.read(length + 2)
+        if len(data) != length + 2:
+            raise KVError('connection closed by server')
+        return data[:-2]
+    if kind == b'*':
+        count = int(body)
+        return None if count < 0 else [read_reply(stream) for _ in range(count)]
+    raise KVError(f'unexpected reply {line[:20]!r}')
+
+
+class _Connection:
+    def __init__(self, host, port, timeout):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stream = self.sock.makefile('rb')
+
+    def call(self, args):
+        self.sock.sendall(_encode(args))
+        return read_reply(self.stream)
+
+    def close(self):
+        try:
+            self.stream.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class KVClient:
+    """Thread-safe RESP client with a small per-process connection pool"""
+
+    def __init__(self, host='127.0.0.1', port=6379, db=0, password=None, timeout=2.0, max_idle=8):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle = []
+        self._pid = os.getpid()
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        """Build a client from ``redis://[:password@]host[:port][/db]``"""
+        parsed = urlparse(url)
+        if parsed.scheme not in ('redis', 'tcp'):
+            raise ValueError(f'unsupported key-value URL {url!r}')
+        db = parsed.path.lstrip('/')
+        return cls(host=parsed.hostname or '127.0.0.1', port=parsed.port or 6379,
+                   db=int(db) if db else 0, password=parsed.password, **kwargs)
+
+    def _checkout(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked: the parent owns those sockets
+                self._idle = []
+                self._pid = os.getpid()
+            if self._idle:
+                return self._idle.pop()
+        conn = _Connection(self.host, self.port, self.timeout)
+        try:
+            if self.password:
+                conn.call(['AUTH', self.password])
+            if self.db:
+                conn.call(['SELECT', self.db])
+        except (OSError, KVError):
+            conn.close()
+            raise
+        return conn
+
+    def _checkin(self, conn):
+        with self._lock:
+            if self._pid == os.getpid() and len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def execute(self, *args):
+        """Send one command and return its decoded reply"""
+        try:
+            conn = self._checkout()
+        except OSError as e:
+            raise KVError(f'cannot connect to {self.host}:{self.port}: {e}')
+        try:
+            reply = conn.call(args)
+        except KVError as e:
+            if str(e) == 'connection closed by server':
+                conn.close()
+            else:
+                self._checkin(conn)
+            raise
+        except OSError as e:
+            conn.close()
+            raise KVError(f'{self.host}:{self.port}: {e}')
+        self._checkin(conn)
+        return reply
+
+    def ping(self):
+        return self.execute('PING') == 'PONG'
+
+    def get(self, key):
+        return self.execute('GET', key)
+
+    def set(self, key, value, ttl_ms=None):
+        if ttl_ms is None:
+            return self.execute('SET', key, value)
+        return self.execute('SET', key, value, 'PX', int(ttl_ms))
+
+    def delete(self, *keys):
+        return self.execute('DEL', *keys)
+
+    def pexpire(self, key, ttl_ms):
+        """Reset a key's time to live; False if the key no longer exists"""
+        return self.execute('PEXPIRE', key, int(ttl_ms)) == 1
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
@@ -0,0 +1,220 @@
+"""Local stand-in for a Redis-protocol key-value server.
+
+Implements just enough of RESP for the session store (strings with expiry)
+so the shared-session backend can be run and benchmarked without a Redis
+install. Expired keys are removed lazily on access and by a background sweep,
+as Redis does. Not for production: everything lives in this process's memory.
+
+Usage: python -m utils.kv_server [--host 127.0.0.1] [--port 6379]
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+
+from utils.kv_client import read_reply, KVError
+
+
+class KVStore:
+    """Thread-safe dict of byte strings with millisecond expiry"""
+
+    def __init__(self, sweep_interval=1.0):
+        self._data = {}      # key -> value
+        self._expires = {}   # key -> monotonic deadline
+        self._lock = threading.Lock()
+        self.sweep_interval = sweep_interval
+        self.expired = 0
+
+    def _alive(self, key, now):
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= now:
+            del self._data[key]
+            del self._expires[key]
+            self.expired += 1
+            return False
+        return key in self._data
+
+    def get(self, key):
+        with self._lock:
+            return self._data[key] if self._alive(key, time.monotonic()) else None
+
+    def set(self, key, value, ttl_ms=None, only_new=False):
+        with self._lock:
+            now = time.monotonic()
+            if only_new and self._alive(key, now):
+                return False
+            self._data[key] = value
+            if ttl_ms is None:
+                self._expires.pop(key, None)
+            else:
+                self._expires[key] = now + ttl_ms / 1000
+            return True
+
+    def delete(self, keys):
+        with self._lock:
+            now = time.monotonic()
+            removed = 0
+            for key in keys:
+                if self._alive(key, now):
+                    del self._data[key]
+                    self._expires.pop(key, None)
+                    removed += 1
+            return removed
+
+    def expire(self, key, ttl_ms):
+        with self._lock:
+            now = time.monotonic()
+            if not self._alive(key, now):
+                return 0
+            self._expires[key] = now + ttl_ms / 1000
+            return 1
+
+    def pttl(self, key):
+        with self._lock:
+            now = time.monotonic()
+            if not self._alive(key, now):
+                return -2
+            deadline = self._expires.get(key)
+            return -1 if deadline is None else int((deadline - now) * 1000)
+
+    def size(self):
+        with self._lock:
+            return len(self._data)
+
+    def flush(self):
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+
+    def sweep(self):
+        """Remove every expired key; returns how many were removed"""
+        with self._lock:
+            now = time.monotonic()
+            due = [key for key, deadline in self._expires.items() if deadline <= now]
+            for key in due:
+                del self._data[key]
+                del self._expires[key]
+            self.expired += len(due)
+            return len(due)
+
+    def run_sweeper(self, stop):
+        while not stop.wait(self.sweep_interval):
+            self.sweep()
+
+
+def _ok(value='OK'):
+    return b'+%s\r\n' % value.encode('ascii')
+
+
+def _int(value):
+    return b':%d\r\n' % value
+
+
+def _bulk(value):
+    if value is None:
+        return b'$-1\r\n'
+    return b'$%d\r\n%s\r\n' % (len(value), value)
+
+
+def _error(message):
+    return b'-ERR %s\r\n' % message.encode('utf-8')
+
+
+def handle_command(store, args):
+    """Execute one command (a list of byte strings) and return the encoded reply"""
+    name = args[0].upper()
+    if name == b'PING':
+        return _ok('PONG') if len(args) == 1 else _bulk(args[1])
+    if name in (b'AUTH', b'SELECT'):
+        return _ok()
+    if name == b'GET' and len(args) == 2:
+        return _bulk(store.get(args[1]))
+    if name == b'SET' and len(args) >= 3:
+        ttl_ms, only_new, options = None, False, [arg.upper() for arg in args[3:]]
+        i = 0
+        while i < len(options):
+            if options[i] in (b'EX', b'PX') and i + 1 < len(options):
+                ttl_ms = int(options[i + 1]) * (1000 if options[i] == b'EX' else 1)
+                i += 2
+            elif options[i] == b'NX':
+                only_new = True
+                i += 1
+            else:
+                return _error('syntax error')
+        stored = store.set(args[1], args[2], ttl_ms, only_new)
+        return _ok() if stored else _bulk(None)
+    if name == b'DEL' and len(args) >= 2:
+        return _int(store.delete(args[1:]))
+    if name in (b'EXPIRE', b'PEXPIRE') and len(args) == 3:
+        return _int(store.expire(args[1], int(args[2]) * (1000 if name == b'EXPIRE' else 1)))
+    if name == b'PTTL' and len(args) == 2:
+        return _int(store.pttl(args[1]))
+    if name == b'DBSIZE':
+        return _int(store.size())
+    if name == b'FLUSHDB':
+        store.flush()
+        return _ok()
+    return _error(f"unknown command or wrong arguments for '{name.decode('utf-8', 'replace')}'")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                args = read_reply(self.rfile)
+            except KVError:
+                return
+            if not isinstance(args, list) or not args:
+                self.wfile.write(_error('expected a command array'))
+                continue
+            if args[0].upper() == b'QUIT':
+                self.wfile.write(_ok())
+                return
+            try:
+                reply = handle_command(self.server.store, args)
+            except ValueError:
+                reply = _error('value is not an integer or out of range')
+            self.wfile.write(reply)
+
+
+class KVServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, store=None):
+        super().__init__(address, _Handler)
+        self.store = store or KVStore()
+        self._stop_sweeper = threading.Event()
+        threading.Thread(target=self.store.run_sweeper, args=(self._stop_sweeper,), daemon=True).start()
+
+    def server_close(self):
+        self._stop_sweeper.set()
+        super().server_close()
+
+
+def start_background(host='127.0.0.1', port=0):
+    """Start a server on a daemon thread; returns (server, port). Port 0 picks a free one."""
+    server = KVServer((host, port))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_address[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in key-value server (RESP)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6379)
+    args = parser.parse_args()
+
+    server = KVServer((args.host, args.port))
+    print(f"Key-value stand-in listening on {args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+"""Request and database metrics in Prometheus text format.
+
+Every statement sent through utils/db_helper is timed by an observer and
+counted against a normalized form of its SQL, with literals, placeholders
+and IN/VALUES lists collapsed, so ``WHERE show_id = 12`` and
+``WHERE show_id = 40`` share one latency histogram. Within a request the
+observer also adds up the number of queries and the time spent in the
+database, and the request totals are recorded per endpoint once the
+response is ready.
+
+Two things are logged as warnings:
+
+* a statement slower than ``slow_query_seconds``;
+* an N+1 pattern: one request running the same normalized statement
+  ``n_plus_one_threshold`` times or more, which usually means a loop issuing
+  one query per row where one query (or one ``executemany``) would do.
+
+Metrics are kept per worker process, like the other ``/debug`` counters.
+Scrape each worker, or aggregate in Prometheus.
+"""
+
+import re
+import threading
+import time
+
+from flask import g, has_request_context, request, session
+
+from utils.db_helper import add_query_observer, remove_query_observer
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_COMMENTS = re.compile(r'/\*.*?\*/|--[^\n]*', re.S)
+_STRINGS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBERS = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDERS = re.compile(r'%s|%\(\w+\)s')
+_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_ROWS = re.compile(r'(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+')
+_SPACE = re.compile(r'\s+')
+
+
+def normalize_statement(query, max_length=200):
+    """SQL with literals and parameter lists replaced, for grouping similar statements"""
+    text = _COMMENTS.sub(' ', query)
+    text = _STRINGS.sub('?', text)
+    text = _NUMBERS.sub('?', text)
+    text = _PLACEHOLDERS.sub('?', text)
+    text = _LISTS.sub('(...)', text)
+    text = _ROWS.sub(r'\1', text)
+    text = _SPACE.sub(' ', text).strip()
+    return text[:max_length]
+
+
+class Histogram:
+    """Cumulative-bucket histogram, as Prometheus expects"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def samples(self, name, labels):
+        """(metric name, labels, value) rows for the exposition format"""
+        for bound, count in zip(self.buckets, self.counts):
+            yield f'{name}_bucket', dict(labels, le=_format_bound(bound)), count
+        yield f'{name}_bucket', dict(labels, le='+Inf'), self.count
+        yield f'{name}_sum', labels, self.sum
+        yield f'{name}_count', labels, self.count
+
+
+def _format_bound(bound):
+    return repr(float(bound)) if isinstance(bound, float) else str(bound)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_sample(name, labels, value):
+    if labels:
+        rendered = ','.join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+        return f'{name}{{{rendered}}} {value}'
+    return f'{name} {value}'
+
+
+class Metrics:
+    """Per-process request, query, slow-query and N+1 metrics for a Flask app"""
+
+    def __init__(self, app, slow_query_seconds=0.5, n_plus_one_threshold=10, max_statements=500,
+                 server_timing=False):
+        self.app = app
+        self.server_timing = server_timing
+        self.slow_query_seconds = slow_query_seconds
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.max_statements = max_statements
+        self._lock = threading.Lock()
+        self._statements = {}  # normalized SQL -> Histogram
+        self._requests = {}  # (endpoint, method, status) -> Histogram
+        self._request_queries = {}  # endpoint -> Histogram of queries per request
+        self._request_db_time = {}  # endpoint -> Histogram of DB seconds per request
+        self._slow = {}  # normalized SQL -> executions over the threshold
+        self._n_plus_one = {}  # (endpoint, normalized SQL) -> requests flagged
+        self._untracked_statements = 0
+
+    @classmethod
+    def from_app(cls, app):
+        """Metrics for ``app``, hooked into its requests and into utils.db_helper"""
+        config = app.config
+        metrics = cls(app,
+                      slow_query_seconds=config.get('DB_SLOW_QUERY_SECONDS', 0.5),
+                      n_plus_one_threshold=config.get('DB_N_PLUS_ONE_THRESHOLD', 10),
+                      max_statements=config.get('METRICS_MAX_STATEMENTS', 500),
+                      server_timing=config.get('SERVER_TIMING_HEADER', False))
+        app.before_request(metrics._start_request)
+        app.after_request(metrics._finish_request)
+        add_query_observer(metrics.observe_query)
+        return metrics
+
+    def close(self):
+        remove_query_observer(self.observe_query)
+
+    # -- hooks --------------------------------------------------------------
+
+    def observe_query(self, query, params, seconds):
+        statement = normalize_statement(query)
+        slow = seconds >= self.slow_query_seconds
+        with self._lock:
+            histogram = self._statements.get(statement)
+            if histogram is None and len(self._statements) < self.max_statements:
+                histogram = self._statements[statement] = Histogram(LATENCY_BUCKETS)
+            if histogram is None:
+                # Keep label cardinality bounded; the count shows when to raise the cap
+                self._untracked_statements += 1
+            else:
+                histogram.observe(seconds)
+                if slow:
+                    self._slow[statement] = self._slow.get(statement, 0) + 1
+
+        if slow:
+            self.app.logger.warning('Slow query (%.3fs)%s: %s', seconds, _where(), normalize_statement(query, 1000))
+
+        if has_request_context() and 'db_queries' in g:
+            g.db_queries += 1
+            g.db_seconds += seconds
+            g.db_statements[statement] = g.db_statements.get(statement, 0) + 1
+
+    def _start_request(self):
+        g.request_started = time.perf_counter()
+        g.db_queries = 0
+        g.db_seconds = 0.0
+        g.db_statements = {}
+
+    def _finish_request(self, response):
+        if 'request_started' not in g:
+            return response
+        elapsed = time.perf_counter() - g.request_started
+        endpoint = request.endpoint or 'unmatched'
+        repeated = [(statement, count) for statement, count in g.db_statements.items()
+                    if count >= self.n_plus_one_threshold]
+        with self._lock:
+            key = (endpoint, request.method, response.status_code)
+            self._requests.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(elapsed)
+            self._request_queries.setdefault(endpoint, Histogram(QUERY_COUNT_BUCKETS)).observe(g.db_queries)
+            self._request_db_time.setdefault(endpoint, Histogram(LATENCY_BUCKETS)).observe(g.db_seconds)
+            for statement, _ in repeated:
+                self._n_plus_one[(endpoint, statement)] = self._n_plus_one.get((endpoint, statement), 0) + 1
+        for statement, count in repeated:
+            self.app.logger.warning('Possible N+1 in %s: %d runs of %s', endpoint, count, statement)
+        # Timings and query counts would tell anyone which code path a request took
+        if self.server_timing or self.app.debug or session.get('role') == 'admin':
+            response.headers['Server-Timing'] = (
+                f'db;dur={g.db_seconds * 1000:.1f};desc="{g.db_queries} queries", app;dur={elapsed * 1000:.1f}'
+            )
+        return response
+
+    # -- export -------------------------------------------------------------
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            families = [
+                ('bys_http_request_duration_seconds', 'histogram', 'Request latency by endpoint',
+                 [(h, {'endpoint': e, 'method': m, 'status': s}) for (e, m, s), h in self._requests.items()]),
+                ('bys_http_request_db_queries', 'histogram', 'Database statements issued per request',
+                 [(h, {'endpoint': e}) for e, h in self._request_queries.items()]),
+                ('bys_http_request_db_seconds', 'histogram', 'Time per request spent waiting on the database',
+                 [(h, {'endpoint': e}) for e, h in self._request_db_time.items()]),
+                ('bys_db_query_duration_seconds', 'histogram', 'Statement latency by normalized SQL',
+                 [(h, {'statement': s}) for s, h in self._statements.items()]),
+            ]
+            counters = [
+                ('bys_db_slow_queries_total', 'Statements slower than the slow-query threshold',
+                 [({'statement': s}, n) for s, n in self._slow.items()]),
+                ('bys_db_n_plus_one_total', 'Requests that repeated one statement past the N+1 threshold',
+                 [({'endpoint': e, 'statement': s}, n) for (e, s), n in self._n_plus_one.items()]),
+                ('bys_db_untracked_queries_total', 'Statements not tracked because the statement cap was reached',
+                 [({}, self._untracked_statements)]),
+            ]
+            lines = []
+            for name, kind, help_text, series in families:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for histogram, labels in series:
+                    lines.extend(_format_sample(*sample) for sample in histogram.samples(name, labels))
+            for name, help_text, series in counters:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                lines.extend(_format_sample(name, labels, value) for labels, value in series)
+        return '\n'.join(lines) + '\n'
+
+    def stats(self):
+        """The slowest statements and flagged N+1 routes, for /debug/metrics"""
+        with self._lock:
+            statements = sorted(self._statements.items(), key=lambda item: item[1].sum, reverse=True)
+            return {
+                'statements_tracked': len(self._statements),
+                'untracked_queries': self._untracked_statements,
+                'slow_query_seconds': self.slow_query_seconds,
+                'n_plus_one_threshold': self.n_plus_one_threshold,
+                'top_statements': [
+                    {'statement': statement, 'calls': h.count, 'total_ms': round(h.sum * 1000, 1),
+                     'avg_ms': round(h.sum / h.count * 1000, 2) if h.count else 0,
+                     'slow': self._slow.get(statement, 0)}
+                    for statement, h in statements[:20]
+                ],
+                'n_plus_one': [
+                    {'endpoint': endpoint, 'statement': statement, 'requests': count}
+                    for (endpoint, statement), count in sorted(self._n_plus_one.items(), key=lambda item: -item[1])
+                ],
+            }
+
+
+def _where():
+    return f' in {request.endpoint or request.path}' if has_request_context() else ''
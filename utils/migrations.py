@@ -0,0 +1,198 @@
+"""Versioned schema migrations.
+
+Migrations live in ``migrations/`` as ``NNNN_description.py`` modules that
+define ``upgrade(cursor)``. They run in version order, each one is recorded in
+``schema_migrations`` once it succeeds, and a MySQL named lock keeps two
+deploys from migrating at the same time.
+
+MySQL commits DDL implicitly, so migrations cannot be rolled back; write them
+to be safe to re-run (the helpers below skip work that is already done).
+"""
+
+import hashlib
+import importlib.util
+import os
+import re
+import time
+
+import MySQLdb.cursors
+
+from utils.db_helper import get_db_connection
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+MIGRATION_LOCK = 'bookyourshow_schema_migrations'
+LOCK_TIMEOUT = 60
+
+_FILENAME = re.compile(r'^(\d{4})_(\w+)\.py$')
+
+
+class MigrationError(Exception):
+    """A migration could not be applied"""
+
+
+class Migration:
+    """A migration module discovered on disk"""
+
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+        with open(path, 'rb') as f:
+            self.checksum = hashlib.sha256(f.read()).hexdigest()
+
+    def load(self):
+        spec = importlib.util.spec_from_file_location(f'migrations.m{self.version}', self.path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        if not hasattr(module, 'upgrade'):
+            raise MigrationError(f'{os.path.basename(self.path)} has no upgrade(cursor) function')
+        return module
+
+
+def discover_migrations(directory=MIGRATIONS_DIR):
+    """All migrations on disk, sorted by version"""
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = _FILENAME.match(filename)
+        if match:
+            migrations.append(Migration(match.group(1), match.group(2), os.path.join(directory, filename)))
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise MigrationError('Duplicate migration version numbers in ' + directory)
+    return migrations
+
+
+# Helpers for writing re-runnable migrations
+
+def table_exists(cursor, table):
+    cursor.execute(
+        "SELECT 1 FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+        (table,)
+    )
+    return cursor.fetchone() is not None
+
+def column_exists(cursor, table, column):
+    cursor.execute(
+        """
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        """,
+        (table, column)
+    )
+    return cursor.fetchone() is not None
+
+def index_exists(cursor, table, index):
+    cursor.execute(
+        """
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        """,
+        (table, index)
+    )
+    return cursor.fetchone() is not None
+
+def add_index(cursor, table, index, columns, unique=False):
+    """CREATE INDEX unless an index with this name already exists"""
+    if index_exists(cursor, table, index):
+        return False
+    kind = 'UNIQUE INDEX' if unique else 'INDEX'
+    cursor.execute(f"CREATE {kind} {index} ON {table} ({', '.join(columns)})")
+    return True
+
+def drop_index(cursor, table, index):
+    """DROP INDEX if it exists"""
+    if not index_exists(cursor, table, index):
+        return False
+    cursor.execute(f"DROP INDEX {index} ON {table}")
+    return True
+
+
+# Runner
+
+def _ensure_migrations_table(cursor):
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+          version VARCHAR(4) PRIMARY KEY,
+          name VARCHAR(100) NOT NULL,
+          checksum CHAR(64) NOT NULL,
+          applied_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+          execution_ms INT
+        )
+        """
+    )
+
+def _applied_versions(cursor):
+    cursor.execute("SELECT version, checksum FROM schema_migrations")
+    return {row['version']: row['checksum'] for row in cursor.fetchall()}
+
+def migration_status():
+    """Every known migration with whether (and when) it was applied"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+        try:
+            _ensure_migrations_table(cursor)
+            cursor.execute("SELECT version, checksum, applied_at FROM schema_migrations")
+            applied = {row['version']: row for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+    status = []
+    for migration in discover_migrations():
+        record = applied.get(migration.version)
+        status.append({
+            'version': migration.version,
+            'name': migration.name,
+            'applied_at': record['applied_at'] if record else None,
+            'modified': bool(record) and record['checksum'] != migration.checksum,
+        })
+    return status
+
+def migrate(target=None, dry_run=False, log=print):
+    """Apply pending migrations up to ``target`` (inclusive); returns the versions applied"""
+    migrations = discover_migrations()
+    if target is not None:
+        migrations = [m for m in migrations if m.version <= target.zfill(4)]
+
+    applied_now = []
+    with get_db_connection() as conn:
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+        try:
+            cursor.execute("SELECT GET_LOCK(%s, %s) AS locked", (MIGRATION_LOCK, LOCK_TIMEOUT))
+            if not cursor.fetchone()['locked']:
+                raise MigrationError('Another process is running migrations')
+            try:
+                _ensure_migrations_table(cursor)
+                applied = _applied_versions(cursor)
+                for migration in migrations:
+                    if migration.version in applied:
+                        if applied[migration.version] != migration.checksum:
+                            log(f'! {migration.version}_{migration.name} changed after it was applied')
+                        continue
+                    if dry_run:
+                        log(f'~ {migration.version}_{migration.name} (pending)')
+                        applied_now.append(migration.version)
+                        continue
+
+                    log(f'→ {migration.version}_{migration.name}')
+                    module = migration.load()
+                    started = time.perf_counter()
+                    try:
+                        conn.begin()
+                        module.upgrade(cursor)
+                        cursor.execute(
+                            "INSERT INTO schema_migrations (version, name, checksum, execution_ms) VALUES (%s, %s, %s, %s)",
+                            (migration.version, migration.name, migration.checksum,
+                             int((time.perf_counter() - started) * 1000))
+                        )
+                        conn.commit()
+                    except Exception as e:
+                        conn.rollback()
+                        raise MigrationError(f'{migration.version}_{migration.name} failed: {e}') from e
+                    applied_now.append(migration.version)
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK,))
+                cursor.fetchall()
+        finally:
+            cursor.close()
+    return applied_now
@@ -0,0 +1,239 @@
+"""In-process movie search index.
+
+Titles and genres are tokenized into an inverted index with two lookup
+structures on top: a prefix table (typeahead, "aven" -> "avengers") and a
+trigram table for typo tolerance ("avengrs" -> "avengers"). Each query token
+is scored by its best match (exact > prefix > fuzzy, title > genre) and a
+movie must match every query token. Results are ranked by score, then rating.
+
+The catalog is small, so the whole index is rebuilt from ``movies`` in one
+query; ``refresh_movie`` patches a single movie in after an admin edit, and a
+rebuild after ``max_age`` seconds picks up movies added by other worker
+processes. With ``max_age=None`` the index never loads itself and its owner
+calls ``load`` with the rows instead.
+"""
+
+import re
+import threading
+import time
+import unicodedata
+
+from utils.db_helper import execute_query
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+# Longest prefix stored per token; longer query tokens are checked with startswith
+MAX_PREFIX = 12
+# Trigram similarity (Jaccard) a token needs to count as a typo match
+FUZZY_THRESHOLD = 0.4
+
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+FUZZY_SCORE = 1.5
+FIELD_WEIGHTS = {'title': 1.0, 'genre': 0.6}
+# Extra credit when the whole query is a prefix of the title
+TITLE_PREFIX_BONUS = 1.0
+
+
+def tokenize(text):
+    """Lower-cased, accent-stripped alphanumeric words of ``text``"""
+    text = unicodedata.normalize('NFKD', str(text or ''))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return _WORD.findall(text.lower())
+
+
+def trigrams(token):
+    padded = f'${token}$'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class MovieSearchIndex:
+    """Inverted index over movie titles and genres with prefix and trigram lookup"""
+
+    def __init__(self, max_age=300):
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._rebuilding = threading.Lock()
+        self._loaded_at = None
+        self._reset()
+        self._stats = {'searches': 0, 'rebuilds': 0, 'patches': 0}
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(max_age=config.get('MOVIE_SEARCH_MAX_AGE', 300))
+
+    def _reset(self):
+        self._movies = {}       # movie_id -> movie row
+        self._postings = {}     # token -> {movie_id: field weight}
+        self._prefixes = {}     # prefix -> set of tokens
+        self._trigrams = {}     # trigram -> set of tokens
+        self._movie_tokens = {}  # movie_id -> set of tokens, for removal
+
+    # -- building -------------------------------------------------------
+
+    def _add(self, movie):
+        movie_id = movie['movie_id']
+        tokens = set()
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(movie.get(field)):
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    for length in range(1, min(len(token), MAX_PREFIX) + 1):
+                        self._prefixes.setdefault(token[:length], set()).add(token)
+                    for gram in trigrams(token):
+                        self._trigrams.setdefault(gram, set()).add(token)
+                postings[movie_id] = max(postings.get(movie_id, 0), weight)
+                tokens.add(token)
+        self._movies[movie_id] = movie
+        self._movie_tokens[movie_id] = tokens
+
+    def _remove(self, movie_id):
+        self._movies.pop(movie_id, None)
+        for token in self._movie_tokens.pop(movie_id, ()):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(movie_id, None)
+            if postings:
+                continue
+            # Last movie using this token: drop it from the lookup tables too
+            del self._postings[token]
+            for length in range(1, min(len(token), MAX_PREFIX) + 1):
+                bucket = self._prefixes.get(token[:length])
+                if bucket is not None:
+                    bucket.discard(token)
+                    if not bucket:
+                        del self._prefixes[token[:length]]
+            for gram in trigrams(token):
+                bucket = self._trigrams.get(gram)
+                if bucket is not None:
+                    bucket.discard(token)
+                    if not bucket:
+                        del self._trigrams[gram]
+
+    def rebuild(self, primary=False):
+        """Reload every movie from the database; ``primary`` skips the read replicas"""
+        self.load(execute_query("SELECT * FROM movies", primary=primary))
+
+    def load(self, movies):
+        """Replace the index with ``movies`` (rows of the movies table)"""
+        with self._lock:
+            self._reset()
+            for movie in movies:
+                self._add(movie)
+            self._loaded_at = time.monotonic()
+            self._stats['rebuilds'] += 1
+
+    def refresh_movie(self, movie_id):
+        """Re-read one movie after it was added or changed (or drop it if deleted)"""
+        movie = execute_query("SELECT * FROM movies WHERE movie_id = %s", (movie_id,))
+        with self._lock:
+            self._remove(movie_id)
+            if movie:
+                self._add(movie[0])
+            self._stats['patches'] += 1
+
+    def _ensure_fresh(self):
+        if self.max_age is None:
+            return  # the owner reloads it (see async_api.py)
+        if self._loaded_at is None:
+            with self._rebuilding:
+                if self._loaded_at is None:
+                    self.rebuild()
+        elif time.monotonic() - self._loaded_at > self.max_age:
+            # Keep serving the current index while one thread reloads it
+            if self._rebuilding.acquire(blocking=False):
+                try:
+                    self.rebuild()
+                finally:
+                    self._rebuilding.release()
+
+    # -- querying -------------------------------------------------------
+
+    def _match_token(self, query_token):
+        """{token: match score} for every indexed token a query token matches"""
+        matches = {}
+        if query_token in self._postings:
+            matches[query_token] = EXACT_SCORE
+        completions = self._prefixes.get(query_token[:MAX_PREFIX], ())
+        for token in completions:
+            if token != query_token and token.startswith(query_token):
+                # Shorter completions are closer to what was typed
+                matches[token] = PREFIX_SCORE + 0.5 * len(query_token) / len(token)
+        if len(query_token) >= 3:
+            query_grams = trigrams(query_token)
+            shared = {}
+            for gram in query_grams:
+                for token in self._trigrams.get(gram, ()):
+                    shared[token] = shared.get(token, 0) + 1
+            for token, common in shared.items():
+                if token in matches:
+                    continue
+                similarity = common / (len(query_grams) + len(trigrams(token)) - common)
+                if similarity >= FUZZY_THRESHOLD:
+                    matches[token] = FUZZY_SCORE * similarity
+        return matches
+
+    def _score(self, query_tokens):
+        """{movie_id: score} for movies matching every query token"""
+        scores = None
+        for query_token in query_tokens:
+            best = {}
+            for token, match_score in self._match_token(query_token).items():
+                for movie_id, weight in self._postings[token].items():
+                    score = match_score * weight
+                    if score > best.get(movie_id, 0):
+                        best[movie_id] = score
+            if scores is None:
+                scores = best
+            else:
+                scores = {movie_id: scores[movie_id] + score
+                          for movie_id, score in best.items() if movie_id in scores}
+            if not scores:
+                break
+        return scores or {}
+
+    def search(self, query='', genre=None, min_rating=None, offset=0, limit=10):
+        """Return (page of movie rows, total matches) ranked by relevance.
+
+        An empty query lists every movie passing the filters, newest release first.
+        """
+        self._ensure_fresh()
+        query_tokens = tokenize(query)
+        genre = genre.lower() if genre else None
+        with self._lock:
+            self._stats['searches'] += 1
+            if query_tokens:
+                scores = self._score(query_tokens)
+                candidates = [self._movies[movie_id] for movie_id in scores]
+            else:
+                scores = {}
+                candidates = list(self._movies.values())
+
+            if genre:
+                candidates = [m for m in candidates if (m.get('genre') or '').lower() == genre]
+            if min_rating is not None:
+                candidates = [m for m in candidates if (m.get('rating') or 0) >= min_rating]
+
+        if query_tokens:
+            phrase = ' '.join(query_tokens)
+            for movie in candidates:
+                if ' '.join(tokenize(movie.get('title'))).startswith(phrase):
+                    scores[movie['movie_id']] += TITLE_PREFIX_BONUS
+            candidates.sort(key=lambda m: (-scores[m['movie_id']], -(m.get('rating') or 0), m.get('title') or ''))
+        else:
+            candidates.sort(key=lambda m: (m.get('release_date') is not None, m.get('release_date')), reverse=True)
+        return candidates[offset:offset + limit], len(candidates)
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot.update({
+                'movies': len(self._movies),
+                'tokens': len(self._postings),
+                'prefixes': len(self._prefixes),
+                'trigrams': len(self._trigrams),
+                'age_seconds': None if self._loaded_at is None else round(time.monotonic() - self._loaded_at, 1),
+            })
+        return snapshot
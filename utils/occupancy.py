@@ -0,0 +1,51 @@
+"""Consistency checks for the denormalized ``show_occupancy`` counters.
+
+Counters are compared with ``show_seats``, the booking engine's source of
+truth: a confirmed booking claims one row per seat there, and a cancellation
+releases them. ``booking_details`` is only the booking's receipt.
+"""
+
+from utils.db_helper import execute_query, execute_transaction
+
+DRIFT_QUERY = """
+SELECT s.show_id,
+       sc.total_seats AS expected_capacity,
+       COALESCE(sold.seats, 0) AS expected_booked,
+       o.capacity, o.seats_booked
+FROM shows s
+JOIN screens sc ON s.screen_id = sc.screen_id
+LEFT JOIN show_occupancy o ON o.show_id = s.show_id
+LEFT JOIN (
+    SELECT show_id, COUNT(*) AS seats
+    FROM show_seats
+    GROUP BY show_id
+) sold ON sold.show_id = s.show_id
+WHERE o.show_id IS NULL
+   OR o.capacity <> sc.total_seats
+   OR o.seats_booked <> COALESCE(sold.seats, 0)
+ORDER BY s.show_id
+"""
+
+def find_occupancy_drift():
+    """Shows whose counter is missing or disagrees with show_seats"""
+    return execute_query(DRIFT_QUERY, primary=True)
+
+def reconcile_occupancy(fix=False):
+    """Report (and optionally repair) drifted occupancy counters.
+
+    Returns the drifted rows as found before any repair.
+    """
+    drift = find_occupancy_drift()
+    if fix and drift:
+        execute_transaction([
+            (
+                """
+                INSERT INTO show_occupancy (show_id, capacity, seats_booked)
+                VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE capacity = VALUES(capacity), seats_booked = VALUES(seats_booked)
+                """,
+                (row['show_id'], row['expected_capacity'], row['expected_booked'])
+            )
+            for row in drift
+        ])
+    return drift
@@ -0,0 +1,154 @@
+"""In-process cache for the data behind hot pages.
+
+Entries carry tags (e.g. ``catalog``, ``movie:3``, ``show:17``) so writes can
+invalidate exactly the pages they affect, and a TTL as a safety net for
+changes made by other worker processes. Recomputation is single-flight: one
+thread reloads an expired entry while the others keep serving the stale value
+(or wait for it, if there is nothing to serve yet).
+
+The cache remembers when each tag was last invalidated. A refill soon after
+an invalidation can check ``invalidated_within`` and read from the primary,
+since a lagging replica may not have the change yet. Otherwise the stale rows
+would be cached again under the new version.
+"""
+
+import threading
+import time
+
+
+class _Entry:
+    __slots__ = ('value', 'expires_at', 'tags')
+
+    def __init__(self, value, expires_at, tags):
+        self.value = value
+        self.expires_at = expires_at
+        self.tags = tags
+
+
+class PageCache:
+    """Tag-invalidated, TTL-bounded cache with stampede protection"""
+
+    def __init__(self, default_ttl=60, max_entries=2000):
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._tags = {}
+        self._key_locks = {}
+        self._invalidated = {}  # tag -> monotonic time of its last invalidation
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stale_hits': 0, 'invalidations': 0, 'evictions': 0}
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(default_ttl=config.get('PAGE_CACHE_TTL', 60),
+                   max_entries=config.get('PAGE_CACHE_MAX_ENTRIES', 2000))
+
+    def _key_lock(self, key):
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _fresh(self, key):
+        """Return (entry, is_fresh) for a key (caller holds the lock)"""
+        entry = self._entries.get(key)
+        return entry, entry is not None and entry.expires_at > time.monotonic()
+
+    def get_or_set(self, key, loader, ttl=None, tags=()):
+        """Return the cached value for ``key``, calling ``loader()`` to fill it on a miss.
+
+        ``tags`` may be a callable that derives the tags from the loaded value.
+        A loader returning None is not cached.
+        """
+        with self._lock:
+            entry, fresh = self._fresh(key)
+            if fresh:
+                self._stats['hits'] += 1
+                return entry.value
+
+        key_lock = self._key_lock(key)
+        # With a stale value on hand, don't queue behind the thread that's refreshing it
+        if not key_lock.acquire(blocking=entry is None):
+            with self._lock:
+                self._stats['stale_hits'] += 1
+            return entry.value
+        try:
+            with self._lock:
+                entry, fresh = self._fresh(key)
+                if fresh:
+                    self._stats['hits'] += 1
+                    return entry.value
+                self._stats['misses'] += 1
+            value = loader()
+            if value is not None:
+                self.set(key, value, ttl=ttl, tags=tags(value) if callable(tags) else tags)
+            return value
+        finally:
+            key_lock.release()
+
+    def set(self, key, value, ttl=None, tags=()):
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._remove(key)
+            if len(self._entries) >= self.max_entries:
+                self._evict()
+            self._entries[key] = _Entry(value, expires_at, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+    def _remove(self, key):
+        """Drop a key and its tag references (caller holds the lock)"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _evict(self):
+        """Make room by dropping expired entries, else the soonest-expiring one"""
+        now = time.monotonic()
+        expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+        if not expired:
+            expired = [min(self._entries, key=lambda key: self._entries[key].expires_at)]
+        for key in expired:
+            self._remove(key)
+            self._key_locks.pop(key, None)
+        self._stats['evictions'] += len(expired)
+
+    def invalidate(self, *tags):
+        """Drop every entry carrying any of ``tags``"""
+        now = time.monotonic()
+        with self._lock:
+            for tag in tags:
+                self._invalidated[tag] = now
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+                    self._stats['invalidations'] += 1
+            if len(self._invalidated) > self.max_entries:
+                # Forget the older half; only recent invalidations matter
+                cutoff = sorted(self._invalidated.values())[len(self._invalidated) // 2]
+                self._invalidated = {tag: at for tag, at in self._invalidated.items() if at >= cutoff}
+
+    def invalidated_within(self, tags, seconds):
+        """True if any of ``tags`` was invalidated in the last ``seconds``"""
+        since = time.monotonic() - seconds
+        with self._lock:
+            return any(self._invalidated.get(tag, since) > since for tag in tags)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['entries'] = len(self._entries)
+        lookups = snapshot['hits'] + snapshot['misses'] + snapshot['stale_hits']
+        snapshot['hit_ratio'] = (snapshot['hits'] + snapshot['stale_hits']) / lookups if lookups else 0.0
+        return snapshot
@@ -0,0 +1,172 @@
+"""Password hashing off the request threads.
+
+Key derivation (scrypt/PBKDF2) is deliberately CPU-heavy. Running it inline
+lets a login surge starve the threads serving bookings, so hashing and
+verification go through a small, fixed-size thread pool instead. The hashlib
+KDFs release the GIL, so pool threads run truly in parallel, but never more
+than ``max_workers`` at once. At most ``max_pending`` requests may wait for
+the pool; beyond that, or after waiting ``queue_timeout`` seconds, a request
+fails fast with HasherBusyError instead of piling up.
+
+``PASSWORD_HASH_METHOD`` takes any Werkzeug method string, e.g.
+``scrypt:32768:8:1`` or ``pbkdf2:sha256:600000``. ``verify`` reports when a
+stored hash should be replaced: plaintext passwords (seeded accounts),
+another algorithm, or a lower cost than configured. Login then stores a
+fresh hash, so old accounts upgrade as their owners sign in.
+"""
+
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusyError(Exception):
+    """Too many password checks are already queued; retry shortly"""
+
+
+def parse_method(method):
+    """(algorithm, cost) for a Werkzeug method string; cost is comparable within an algorithm"""
+    parts = method.split(':')
+    if parts[0] == 'scrypt':
+        n, r = (int(parts[1]), int(parts[2])) if len(parts) >= 3 else (2 ** 15, 8)
+        return 'scrypt', n * r
+    if parts[0] == 'pbkdf2':
+        digest = parts[1] if len(parts) > 1 else 'sha256'
+        iterations = int(parts[2]) if len(parts) > 2 else 600000
+        return f'pbkdf2:{digest}', iterations
+    return parts[0], 0
+
+
+# Methods Werkzeug's generate_password_hash produces; the method is stored before the first '$'
+HASH_PREFIXES = ('pbkdf2:', 'scrypt:')
+
+
+def is_hashed(stored):
+    """True if ``stored`` is a Werkzeug hash (method$salt$hash) rather than plaintext"""
+    parts = stored.split('$')
+    return len(parts) == 3 and parts[0].startswith(HASH_PREFIXES) and all(parts[1:])
+
+
+class PasswordHasher:
+    """Bounded pool that hashes and verifies passwords with a configurable KDF"""
+
+    def __init__(self, method='scrypt:32768:8:1', max_workers=None, max_pending=64, queue_timeout=5.0):
+        self.method = method
+        self.algorithm, self.cost = parse_method(method)
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) // 2)
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._executor = None
+        self._pid = None
+        self._slots = threading.BoundedSemaphore(self.max_workers + max_pending)
+        self._lock = threading.Lock()
+        self._stats = {
+            'hashes': 0, 'verifications': 0, 'failures': 0, 'rehashes_needed': 0,
+            'plaintext_upgrades': 0, 'rejected_busy': 0,
+            'kdf_calls': 0, 'kdf_seconds': 0.0, 'wait_seconds': 0.0,
+        }
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(method=config.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1'),
+                   max_workers=config.get('PASSWORD_HASH_WORKERS'),
+                   max_pending=config.get('PASSWORD_HASH_MAX_PENDING', 64),
+                   queue_timeout=config.get('PASSWORD_HASH_QUEUE_TIMEOUT', 5.0))
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # Created lazily, and again after a fork: threads don't survive fork
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='password-kdf')
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, func, *args):
+        """Run ``func`` on the pool and wait for it, or raise HasherBusyError"""
+        queued_at = time.monotonic()
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self._count('rejected_busy')
+            raise HasherBusyError('Too many sign-ins at once; please try again in a moment.')
+
+        def timed():
+            started = time.monotonic()
+            try:
+                return func(*args)
+            finally:
+                finished = time.monotonic()
+                with self._lock:
+                    self._stats['kdf_calls'] += 1
+                    self._stats['wait_seconds'] += started - queued_at
+                    self._stats['kdf_seconds'] += finished - started
+
+        try:
+            future = self._pool().submit(timed)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.queue_timeout + 30)
+        except FutureTimeoutError:
+            self._count('rejected_busy')
+            raise HasherBusyError('Password check timed out; please try again in a moment.')
+
+    def hash(self, password):
+        """Hash a password with the configured method"""
+        self._count('hashes')
+        return self._run(generate_password_hash, password, self.method)
+
+    def needs_rehash(self, stored):
+        if not is_hashed(stored):
+            return True
+        try:
+            algorithm, cost = parse_method(stored.split('$', 1)[0])
+        except ValueError:
+            return True
+        return algorithm != self.algorithm or cost < self.cost
+
+    def verify(self, stored, password):
+        """Check a password; returns (matches, replacement hash or None).
+
+        A replacement is returned only when the password matched and the
+        stored value is plaintext, another algorithm, or below the configured cost.
+        """
+        self._count('verifications')
+        if not stored:
+            self._count('failures')
+            return False, None
+        if is_hashed(stored):
+            matches = self._run(check_password_hash, stored, password)
+        else:
+            # Legacy plaintext from seed data: constant-time compare, then upgrade
+            matches = hmac.compare_digest(stored.encode('utf-8'), password.encode('utf-8'))
+            if matches:
+                self._count('plaintext_upgrades')
+        if not matches:
+            self._count('failures')
+            return False, None
+        if not self.needs_rehash(stored):
+            return True, None
+        self._count('rehashes_needed')
+        return True, self.hash(password)
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+        kdf_calls = snapshot['kdf_calls']
+        snapshot.update({
+            'method': self.method,
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'avg_kdf_ms': round(snapshot['kdf_seconds'] / kdf_calls * 1000, 2) if kdf_calls else 0,
+            'avg_wait_ms': round(snapshot['wait_seconds'] / kdf_calls * 1000, 2) if kdf_calls else 0,
+        })
+        return snapshot
@@ -0,0 +1,235 @@
+"""Server-side queries behind the admin booking report.
+
+The report speaks the DataTables server-side processing protocol, but pages
+with a keyset cursor on (sort column, booking_id) instead of OFFSET: each
+response carries an opaque cursor for the row after its last one, and the
+next request resumes from there with an indexed range read. Every request
+therefore touches one page of rows however deep the admin pages or however
+large ``bookings`` grows. Requests that arrive without a usable cursor (a
+changed sort or filter mid-way, a hand-edited ``start``) fall back to OFFSET.
+"""
+
+import base64
+import datetime
+import decimal
+import hashlib
+import json
+
+from flask import current_app
+
+from utils.db_helper import execute_query
+
+# DataTables column order -> (key in each row, SQL expression it sorts/filters on)
+BOOKING_REPORT_COLUMNS = [
+    ('booking_id', 'b.booking_id'),
+    ('Customer', 'u.name'),
+    ('Movie', 'm.title'),
+    ('Theater', 't.name'),
+    ('ShowTime', 's.show_time'),
+    ('BookedOn', 'b.booking_date'),
+    ('Amount', 'b.total_amount'),
+    ('Status', 'b.status'),
+]
+COLUMN_SQL = dict(BOOKING_REPORT_COLUMNS)
+DEFAULT_ORDER = ('BookedOn', 'desc')
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+STATUSES = ('confirmed', 'cancelled')
+EMPTY_FILTERS = {'status': None, 'date_from': None, 'date_to': None,
+                 'theater_id': None, 'movie_id': None, 'search': ''}
+
+# Totals for the "Showing x of y" footer are cached briefly per filter set
+COUNT_CACHE_TTL = 30
+
+BOOKING_REPORT_FROM = """
+FROM bookings b
+JOIN users u ON b.user_id = u.user_id
+JOIN shows s ON b.show_id = s.show_id
+JOIN movies m ON s.movie_id = m.movie_id
+JOIN screens sc ON s.screen_id = sc.screen_id
+JOIN theaters t ON sc.theater_id = t.theater_id
+"""
+
+class ReportRequestError(ValueError):
+    """The report request has an unknown column, direction or filter value"""
+
+def _int_arg(args, name, default, minimum=0, maximum=None):
+    try:
+        value = int(args.get(name, default))
+    except (TypeError, ValueError):
+        raise ReportRequestError(f'{name} must be an integer')
+    value = max(value, minimum)
+    return min(value, maximum) if maximum is not None else value
+
+def _date_arg(args, name):
+    value = args.get(name, '').strip()
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ReportRequestError(f'{name} must be a YYYY-MM-DD date')
+
+def parse_booking_report_request(args):
+    """Read DataTables parameters plus the report's own filters from a query string"""
+    length = _int_arg(args, 'length', DEFAULT_PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE)
+
+    column, direction = DEFAULT_ORDER
+    if 'order[0][column]' in args:
+        # Tables may show a subset of the columns, so resolve the index via its data key
+        index = _int_arg(args, 'order[0][column]', 0)
+        column = args.get(f'columns[{index}][data]')
+        if column is None and index < len(BOOKING_REPORT_COLUMNS):
+            column = BOOKING_REPORT_COLUMNS[index][0]
+        if column not in COLUMN_SQL:
+            raise ReportRequestError('unknown order column')
+        direction = args.get('order[0][dir]', 'asc').lower()
+        if direction not in ('asc', 'desc'):
+            raise ReportRequestError('order direction must be asc or desc')
+
+    status = args.get('status', '').strip()
+    if status and status not in STATUSES:
+        raise ReportRequestError(f'status must be one of {", ".join(STATUSES)}')
+
+    filters = {
+        'status': status or None,
+        'date_from': _date_arg(args, 'date_from'),
+        'date_to': _date_arg(args, 'date_to'),
+        'theater_id': _int_arg(args, 'theater_id', 0) or None,
+        'movie_id': _int_arg(args, 'movie_id', 0) or None,
+        'search': args.get('search[value]', '').strip()[:100],
+    }
+    return {
+        'draw': _int_arg(args, 'draw', 0),
+        'start': _int_arg(args, 'start', 0),
+        'length': length,
+        'order': (column, direction),
+        'filters': filters,
+        'cursor': args.get('cursor', ''),
+    }
+
+def _filter_clause(filters):
+    """WHERE fragments and params for the filter set (search is a prefix match)"""
+    clauses, params = [], []
+    if filters['status']:
+        clauses.append('b.status = %s')
+        params.append(filters['status'])
+    if filters['date_from']:
+        clauses.append('b.booking_date >= %s')
+        params.append(filters['date_from'])
+    if filters['date_to']:
+        clauses.append('b.booking_date < %s')
+        params.append(filters['date_to'] + datetime.timedelta(days=1))
+    if filters['theater_id']:
+        clauses.append('sc.theater_id = %s')
+        params.append(filters['theater_id'])
+    if filters['movie_id']:
+        clauses.append('s.movie_id = %s')
+        params.append(filters['movie_id'])
+
+    search = filters['search']
+    if search.isdigit():
+        clauses.append('b.booking_id = %s')
+        params.append(int(search))
+    elif search:
+        # Prefix match so the name/title indexes stay usable; %term% can't use any index
+        pattern = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        clauses.append('(u.name LIKE %s OR m.title LIKE %s OR t.name LIKE %s)')
+        params.extend([pattern] * 3)
+    return clauses, params
+
+def _signature(order, filters):
+    """Fingerprint of everything that decides row order, so cursors can't outlive it"""
+    raw = json.dumps([order, filters], default=str, sort_keys=True)
+    return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+def _encode_cursor(start, signature, value, booking_id):
+    raw = json.dumps({'p': start, 's': signature, 'v': str(value), 'id': booking_id})
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor, start, signature):
+    """Return (value, booking_id) if the cursor continues exactly this page, else None"""
+    if not cursor:
+        return None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if data['p'] != start or data['s'] != signature:
+            return None
+        return data['v'], int(data['id'])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+def _count(filters):
+    clauses, params = _filter_clause(filters)
+    if not clauses:
+        query = 'SELECT COUNT(*) AS total FROM bookings'
+    else:
+        query = f"SELECT COUNT(*) AS total {BOOKING_REPORT_FROM} WHERE {' AND '.join(clauses)}"
+
+    def load():
+        return execute_query(query, params)[0]['total']
+
+    key = f'booking-report-count:{_signature(None, filters)}'
+    return current_app.page_cache.get_or_set(key, load, ttl=COUNT_CACHE_TTL)
+
+def count_bookings():
+    """Total rows in the unfiltered report (cached briefly)"""
+    return _count(EMPTY_FILTERS)
+
+def _serialize(row):
+    for key, value in row.items():
+        if isinstance(value, datetime.datetime):
+            row[key] = value.strftime('%Y-%m-%d %H:%M')
+        elif isinstance(value, decimal.Decimal):
+            row[key] = float(value)
+    return row
+
+def booking_report_page(request_args):
+    """One page of the booking report as a DataTables server-side response dict"""
+    params = parse_booking_report_request(request_args)
+    column, direction = params['order']
+    filters, start, length = params['filters'], params['start'], params['length']
+    sort_sql = COLUMN_SQL[column]
+    signature = _signature(params['order'], filters)
+
+    clauses, query_params = _filter_clause(filters)
+    offset = 0
+    resume = _decode_cursor(params['cursor'], start, signature) if start else None
+    if resume:
+        value, booking_id = resume
+        op = '<' if direction == 'desc' else '>'
+        if column == 'booking_id':
+            clauses.append(f'b.booking_id {op} %s')
+            query_params.append(booking_id)
+        else:
+            clauses.append(f'({sort_sql} {op} %s OR ({sort_sql} = %s AND b.booking_id {op} %s))')
+            query_params.extend([value, value, booking_id])
+    else:
+        offset = start
+
+    select = ', '.join(
+        sql if key == 'booking_id' else f'{sql} AS {key}' for key, sql in BOOKING_REPORT_COLUMNS
+    )
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    order_by = f'{sort_sql} {direction.upper()}'
+    if column != 'booking_id':
+        order_by += f', b.booking_id {direction.upper()}'
+    query = f"SELECT {select} {BOOKING_REPORT_FROM} {where} ORDER BY {order_by} LIMIT %s OFFSET %s"
+    rows = execute_query(query, query_params + [length, offset])
+
+    cursor = None
+    if len(rows) == length:
+        last = rows[-1]
+        cursor = _encode_cursor(start + length, signature, last[column], last['booking_id'])
+
+    total = count_bookings()
+    filtered = _count(filters) if any(filters.values()) else total
+    return {
+        'draw': params['draw'],
+        'recordsTotal': total,
+        'recordsFiltered': filtered,
+        'data': [_serialize(row) for row in rows],
+        'cursor': cursor,
+        'cursorStart': start + length,
+    }
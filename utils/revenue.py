@@ -0,0 +1,84 @@
+"""Daily revenue rollups.
+
+``revenue_daily`` holds one row per booking day, movie, screen and payment
+mode. Triggers keep it current: a successful payment adds its booking, and a
+cancellation moves the booking from confirmed to cancelled and takes its seats
+and amount back out. Dashboard and revenue queries then sum a few rows per day
+instead of scanning every booking ever made.
+
+A booking counts as confirmed revenue once it has a successful payment and
+is not cancelled. ``rebuild_revenue`` recomputes the rollup from the base
+tables using that same rule. Use it after a bulk load, or after a repair that
+went around the triggers.
+"""
+
+from utils.db_helper import execute_query, execute_transaction
+
+# Per-booking facts, then grouped to the rollup grain. Mirrors the triggers in
+# migrations/0004_revenue_rollups.py exactly.
+REBUILD_QUERY = """
+INSERT INTO revenue_daily (revenue_day, movie_id, theater_id, screen_id, payment_mode,
+                           confirmed_bookings, cancelled_bookings, seats, revenue)
+SELECT revenue_day, movie_id, theater_id, screen_id, payment_mode,
+       SUM(IF(status = 'confirmed' AND paid, 1, 0)),
+       SUM(IF(status = 'cancelled', 1, 0)),
+       SUM(IF(status = 'confirmed' AND paid, seat_count, 0)),
+       SUM(IF(status = 'confirmed' AND paid, total_amount, 0))
+FROM (
+    SELECT DATE(b.booking_date) AS revenue_day, s.movie_id, sc.theater_id, s.screen_id,
+           b.status, b.total_amount,
+           EXISTS(SELECT 1 FROM payments p
+                  WHERE p.booking_id = b.booking_id AND p.payment_status = 'success') AS paid,
+           COALESCE((SELECT p.payment_mode FROM payments p WHERE p.booking_id = b.booking_id
+                     ORDER BY p.payment_status = 'success' DESC LIMIT 1), 'none') AS payment_mode,
+           (SELECT COUNT(*) FROM booking_details bd WHERE bd.booking_id = b.booking_id) AS seat_count
+    FROM bookings b
+    JOIN shows s ON b.show_id = s.show_id
+    JOIN screens sc ON s.screen_id = sc.screen_id
+    WHERE b.booking_date >= %s
+) per_booking
+GROUP BY revenue_day, movie_id, theater_id, screen_id, payment_mode
+"""
+
+# Earliest date MySQL's DATE type can hold; "since the beginning"
+EPOCH = '1000-01-01'
+
+def rebuild_revenue(since=None):
+    """Recompute revenue_daily from bookings on or after ``since`` (a date; None = all)"""
+    since = since or EPOCH
+
+    def rebuild(cursor):
+        cursor.execute("DELETE FROM revenue_daily WHERE revenue_day >= %s", (since,))
+        removed = cursor.rowcount
+        cursor.execute(REBUILD_QUERY, (since,))
+        return removed, cursor.rowcount
+
+    return execute_transaction(rebuild)
+
+def revenue_totals():
+    """Confirmed revenue and the number of bookings ever made (confirmed or cancelled)"""
+    row = execute_query(
+        """
+        SELECT COALESCE(SUM(revenue), 0) AS revenue,
+               COALESCE(SUM(confirmed_bookings + cancelled_bookings), 0) AS bookings
+        FROM revenue_daily
+        """
+    )[0]
+    return row['revenue'], int(row['bookings'])
+
+def top_movies(limit=3):
+    """Movies with the most confirmed revenue"""
+    return execute_query(
+        """
+        SELECT m.title AS Movie,
+               SUM(r.confirmed_bookings) AS TotalBookings,
+               SUM(r.revenue) AS Revenue
+        FROM revenue_daily r
+        JOIN movies m ON r.movie_id = m.movie_id
+        GROUP BY m.movie_id, m.title
+        HAVING SUM(r.confirmed_bookings) > 0
+        ORDER BY Revenue DESC
+        LIMIT %s
+        """,
+        (limit,)
+    )
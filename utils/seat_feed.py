@@ -0,0 +1,297 @@
+"""Live seat map change feeds, streamed to browsers as Server-Sent Events.
+
+Each show being watched gets one ``ShowFeed`` with one background thread,
+however many browsers are subscribed. The thread keeps the show's last known
+state (sold seats and seats held by anyone) and publishes a diff to every
+subscriber whenever it changes:
+
+* Bookings, cancellations and holds made in this process call ``notify``,
+  which wakes the thread to diff against the in-memory seat index and hold
+  cache straight away.
+* Every ``poll_interval`` seconds the thread also reloads the show's sold
+  seats from the database, so changes made by other worker processes (and
+  holds lapsing) reach viewers within a few seconds.
+
+Subscribers read from a bounded queue. A subscriber that falls more than
+``max_queue`` events behind has its backlog dropped and is sent a fresh
+snapshot instead, so a slow client never makes the feed buffer without
+limit. ``max_connections`` caps open streams per worker process, and idle
+streams send a comment line every ``heartbeat`` seconds to keep proxies from
+closing them and to notice clients that have gone away.
+
+Every open stream holds one of the worker's request threads. So unless
+``SEAT_FEED_MAX_CONNECTIONS`` is set, the cap is the worker's thread count
+less ``SEAT_FEED_RESERVED_THREADS``. The threads kept back serve everything
+else, and viewers beyond the cap get the 503 that makes the page poll
+instead. Streams never end by themselves, so ``close`` ends them all when the
+worker stops. It then doesn't wait out its graceful timeout on them, and the
+browsers reconnect to another worker.
+"""
+
+import json
+import queue
+import threading
+import time
+
+# Sent first on every stream: how long EventSource waits before reconnecting (ms)
+RETRY_MS = 3000
+
+# How long a new stream waits for its feed's first read before giving up (s)
+READY_TIMEOUT = 10
+
+
+class FeedFullError(Exception):
+    """This worker already has ``max_connections`` open seat map streams"""
+
+
+class ShowFeed:
+    """Change feed for one show, fanned out to every subscriber"""
+
+    def __init__(self, owner, show_id):
+        self.owner = owner
+        self.show_id = show_id
+        self.subscribers = set()
+        self.version = 0
+        self.booked = None
+        self.held = None
+        self._wake = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+
+    def snapshot(self):
+        return {'version': self.version, 'booked': sorted(self.booked or ()), 'held': sorted(self.held or ())}
+
+    def _read_state(self, reload):
+        """Current (sold, held) seat sets; ``reload`` refreshes sold seats from the database"""
+        seat_index = self.owner.app.seat_index
+        if reload:
+            seat_index.rebuild(self.show_id)
+        booked = set(seat_index.booked_seats(self.show_id))
+        held = set(self.owner.app.seat_holds.held_seats(self.show_id)) - booked
+        return booked, held
+
+    def _publish(self, booked, held):
+        diff = {
+            'booked': sorted(booked - self.booked),
+            'released': sorted(self.booked - booked),
+            'held': sorted(held - self.held),
+            'unheld': sorted(self.held - held - booked),
+        }
+        self.booked, self.held = booked, held
+        if not any(diff.values()):
+            return
+        with self.owner._lock:
+            self.version += 1
+            diff['version'] = self.version
+            subscribers = list(self.subscribers)
+        event = ('diff', diff)
+        for subscriber in subscribers:
+            self.owner._deliver(subscriber, event)
+
+    def _run(self):
+        with self.owner.app.app_context():
+            try:
+                self.booked, self.held = self._read_state(reload=False)
+            except Exception:
+                self.owner._count('poll_errors')
+                self.booked, self.held = set(), set()
+            self._ready.set()
+            self._loop()
+
+    def _loop(self):
+        next_reload = time.monotonic() + self.owner.poll_interval
+        while True:
+            woken = self._wake.wait(max(0.0, next_reload - time.monotonic()))
+            self._wake.clear()
+            with self.owner._lock:
+                if not self.subscribers:
+                    # Last viewer left; a new subscriber starts a fresh thread
+                    self._thread = None
+                    self.owner._feeds.pop(self.show_id, None)
+                    return
+            reload = not woken or time.monotonic() >= next_reload
+            if reload:
+                next_reload = time.monotonic() + self.owner.poll_interval
+            try:
+                booked, held = self._read_state(reload)
+            except Exception:
+                self.owner._count('poll_errors')
+                continue
+            self._publish(booked, held)
+            self.owner._count('reloads' if reload else 'local_updates')
+
+
+class SeatFeeds:
+    """Per-show seat map feeds for this worker process"""
+
+    def __init__(self, app, max_connections=4, max_queue=32, heartbeat=15, poll_interval=2.0, reserved_threads=4):
+        self.app = app
+        self.max_connections = max_connections
+        self.reserved_threads = reserved_threads
+        self.max_queue = max_queue
+        self.heartbeat = heartbeat
+        self.poll_interval = poll_interval
+        self._feeds = {}
+        self._connections = 0
+        self._closing = False
+        self._lock = threading.Lock()
+        self._stats = {
+            'streams_opened': 0, 'streams_rejected': 0, 'events_sent': 0,
+            'heartbeats': 0, 'resyncs': 0, 'ready_timeouts': 0, 'reloads': 0, 'local_updates': 0, 'poll_errors': 0,
+        }
+
+    @classmethod
+    def from_app(cls, app):
+        """Feeds reading ``app.seat_index`` and ``app.seat_holds``, tuned by ``app.config``"""
+        config = app.config
+        feeds = cls(app,
+                    max_queue=config.get('SEAT_FEED_MAX_QUEUE', 32),
+                    heartbeat=config.get('SEAT_FEED_HEARTBEAT', 15),
+                    poll_interval=config.get('SEAT_FEED_POLL_INTERVAL', 2.0),
+                    reserved_threads=config.get('SEAT_FEED_RESERVED_THREADS', 4))
+        if config.get('SEAT_FEED_MAX_CONNECTIONS'):
+            feeds.max_connections = config['SEAT_FEED_MAX_CONNECTIONS']
+        else:
+            feeds.fit_threads(config.get('SERVER_THREADS', 8))
+        return feeds
+
+    def fit_threads(self, threads):
+        """Cap streams so ``reserved_threads`` of a worker's ``threads`` stay free for other requests"""
+        self.max_connections = max(threads - self.reserved_threads, 0)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _deliver(self, subscriber, event):
+        """Queue an event for one subscriber (the feed thread, or ``close``)"""
+        try:
+            subscriber.put_nowait(event)
+        except queue.Full:
+            # Too far behind to catch up on diffs: drop them and resend the whole map
+            try:
+                while True:
+                    subscriber.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                subscriber.put_nowait(event if event[0] == 'close' else ('resync', None))
+            except queue.Full:
+                pass  # the other thread refilled it; the stream still sees _closing
+            self._count('resyncs')
+
+    def notify(self, show_id):
+        """Wake a show's feed after this process changed its seats or holds"""
+        with self._lock:
+            feed = self._feeds.get(show_id)
+        if feed is not None:
+            feed._wake.set()
+
+    def _subscribe(self, show_id):
+        with self._lock:
+            if self._closing or self._connections >= self.max_connections:
+                self._stats['streams_rejected'] += 1
+                raise FeedFullError(f'{self.max_connections} seat map streams already open')
+            self._connections += 1
+            self._stats['streams_opened'] += 1
+            feed = self._feeds.get(show_id)
+            if feed is None:
+                feed = self._feeds[show_id] = ShowFeed(self, show_id)
+            subscriber = queue.Queue(maxsize=self.max_queue)
+            feed.subscribers.add(subscriber)
+            if feed._thread is None:
+                feed._thread = threading.Thread(target=feed._run, name=f'seat-feed-{show_id}', daemon=True)
+                feed._thread.start()
+        return feed, subscriber
+
+    def _unsubscribe(self, feed, subscriber):
+        with self._lock:
+            feed.subscribers.discard(subscriber)
+            self._connections -= 1
+            last = not feed.subscribers
+        if last:
+            feed._wake.set()
+
+    def stream(self, show_id):
+        """Open a stream for the show; returns a SeatStream of SSE-formatted text.
+
+        Raises FeedFullError when the worker is at its connection cap. The
+        stream starts with a full snapshot and then sends diffs. Its slot is
+        freed by ``close()``, which the WSGI server calls even when the
+        response is never iterated.
+        """
+        feed, subscriber = self._subscribe(show_id)
+        return SeatStream(self, feed, subscriber)
+
+    def _events(self, feed, subscriber):
+        yield f'retry: {RETRY_MS}\n\n'
+        if not feed._ready.wait(READY_TIMEOUT):
+            # The feed's first read is stuck; the browser reconnects after RETRY_MS
+            self._count('ready_timeouts')
+            return
+        yield self._format('snapshot', feed.snapshot())
+        while True:
+            try:
+                kind, data = subscriber.get(timeout=self.heartbeat)
+            except queue.Empty:
+                kind = 'heartbeat'
+            if kind == 'close' or self._closing:
+                return
+            if kind == 'heartbeat':
+                self._count('heartbeats')
+                yield ': heartbeat\n\n'
+            elif kind == 'resync':
+                yield self._format('snapshot', feed.snapshot())
+            else:
+                yield self._format(kind, data)
+
+    def close(self):
+        """End every open stream and refuse new ones: this worker is stopping"""
+        with self._lock:
+            self._closing = True
+            subscribers = [subscriber for feed in self._feeds.values() for subscriber in feed.subscribers]
+        for subscriber in subscribers:
+            self._deliver(subscriber, ('close', None))
+
+    def _format(self, kind, data):
+        self._count('events_sent')
+        return f'id: {data["version"]}\nevent: {kind}\ndata: {json.dumps(data)}\n\n'
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['open_streams'] = self._connections
+            snapshot['shows_watched'] = len(self._feeds)
+            snapshot['max_connections'] = self.max_connections
+        return snapshot
+
+
+class SeatStream:
+    """One open seat map stream; iterate for SSE text, ``close()`` to free its slot"""
+
+    def __init__(self, owner, feed, subscriber):
+        self._owner = owner
+        self._feed = feed
+        self._subscriber = subscriber
+        self._events = owner._events(feed, subscriber)
+        self._closed = False
+        self._close_lock = threading.Lock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._events)
+        except BaseException:
+            # Ended, or the write to the client failed; don't wait for close()
+            self.close()
+            raise
+
+    def close(self):
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._events.close()
+        self._owner._unsubscribe(self._feed, self._subscriber)
@@ -0,0 +1,282 @@
+"""Time-limited seat holds taken while a customer is checking out.
+
+Selecting seats on the booking page holds them in ``seat_holds`` for
+``ttl`` seconds, keyed by (show_id, seat_number) so only one checkout can
+hold a seat at a time across every worker process. A booking made from the
+hold converts it atomically (see utils/booking_engine.py).
+
+Expiry needs no table scans. Each process keeps a min-heap of the holds it
+handed out, and a background thread deletes each one by token once its
+deadline passes. Holds orphaned by a process that died are removed lazily:
+taking a hold clears lapsed holds on the seats it wants, and the same thread
+periodically does an index range delete on ``expires_at``. Reads ignore
+lapsed rows either way and never write, so a visitor who only looks at a
+seat map is not pinned to the primary (see utils/db_helper.py).
+
+Held seats for the seat map are cached per show for ``cache_ttl`` seconds,
+and this process's own hold changes update that cache immediately.
+
+Every change to a show's holds (taken, released, expired or purged) bumps the
+``holds:<show_id>`` version (utils/versions.py), so seat map ETags can be
+checked without reading the holds. A hold orphaned by a dead process lapses
+without a bump. Its ETag moves once the purge removes it, within
+``purge_interval`` seconds.
+"""
+
+import heapq
+import os
+import threading
+import time
+
+from utils.db_helper import execute_query, execute_transaction
+
+PURGE_BATCH = 1000
+
+
+def _delete(query, params):
+    """Run a DELETE and return how many rows it removed"""
+    return execute_transaction(lambda cursor: cursor.execute(query, params))
+
+
+class SeatHolds:
+    """Seat hold store with heap-driven expiry and conversion/contention counters"""
+
+    def __init__(self, app, ttl=300, cache_ttl=2.0, purge_interval=60):
+        self.app = app
+        self.ttl = ttl
+        self.cache_ttl = cache_ttl
+        self.purge_interval = purge_interval
+        self._heap = []    # (deadline, show_id, token) for holds taken in this process
+        self._held = {}    # show_id -> (loaded_at, {seat: (token, deadline)})
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._expirer = None
+        self._pid = None
+        self._last_purge = time.monotonic()
+        self._stats = {
+            'holds_requested': 0, 'seats_requested': 0, 'seats_held': 0,
+            'seats_contended': 0, 'seats_sold': 0,
+            'holds_released': 0, 'holds_expired': 0, 'holds_purged': 0,
+            'bookings_from_hold': 0, 'bookings_without_hold': 0,
+        }
+
+    @classmethod
+    def from_app(cls, app):
+        config = app.config
+        return cls(app, ttl=config.get('SEAT_HOLD_TTL', 300),
+                   cache_ttl=config.get('SEAT_HOLD_CACHE_TTL', 2.0),
+                   purge_interval=config.get('SEAT_HOLD_PURGE_INTERVAL', 60))
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _changed(self, *show_ids):
+        """Bump the hold versions of ``show_ids`` for every worker's seat map ETags"""
+        self.app.versions.bump(*(f'holds:{show_id}' for show_id in show_ids))
+
+    # -- expiry ---------------------------------------------------------
+
+    def _ensure_expirer(self):
+        with self._lock:
+            if self._expirer is not None and self._pid == os.getpid():
+                return
+            # Started lazily, and again after a fork: threads don't survive fork
+            self._pid = os.getpid()
+            self._heap = []  # the parent's holds are the parent's to expire
+            self._expirer = threading.Thread(target=self._run, name='seat-hold-expiry', daemon=True)
+            self._expirer.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                until = self._last_purge + self.purge_interval
+                if self._heap:
+                    until = min(until, self._heap[0][0])
+            self._wake.wait(max(until - time.monotonic(), 0.05))
+            self._wake.clear()
+            try:
+                with self.app.app_context():
+                    self._expire_due()
+            except Exception as e:
+                self.app.logger.warning('Seat hold expiry failed: %s', e)
+
+    def _expire_due(self):
+        """Delete this process's holds whose deadline has passed"""
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap))
+            purge = now - self._last_purge >= self.purge_interval
+            if purge:
+                self._last_purge = now
+
+        changed = set()
+        for _, show_id, token in due:
+            # A hold that was renewed since has a later expires_at and is left alone
+            expired = _delete(
+                "DELETE FROM seat_holds WHERE show_id = %s AND hold_token = %s AND expires_at <= NOW(3)",
+                (show_id, token)
+            )
+            if expired:
+                self._forget(show_id, token)
+                self._count('holds_expired')
+                changed.add(show_id)
+        if changed:
+            self._changed(*sorted(changed))
+        if purge:
+            self.purge_expired()
+
+    def purge_expired(self):
+        """Remove lapsed holds left behind by any process (index range delete)"""
+        def purge(cursor):
+            # One cutoff for both statements, so every show whose holds go is bumped
+            cursor.execute("SELECT NOW(3) AS cutoff")
+            cutoff = cursor.fetchone()['cutoff']
+            cursor.execute(
+                """
+                SELECT DISTINCT show_id FROM (
+                    SELECT show_id FROM seat_holds WHERE expires_at <= %s ORDER BY expires_at LIMIT %s
+                ) AS lapsed
+                """,
+                (cutoff, PURGE_BATCH)
+            )
+            show_ids = sorted(row['show_id'] for row in cursor.fetchall())
+            cursor.execute("DELETE FROM seat_holds WHERE expires_at <= %s ORDER BY expires_at LIMIT %s",
+                           (cutoff, PURGE_BATCH))
+            return show_ids, cursor.rowcount
+
+        show_ids, purged = execute_transaction(purge)
+        if purged and show_ids:
+            self._changed(*show_ids)
+        self._count('holds_purged', purged)
+        return purged
+
+    # -- cache ------------------------------------------------------------
+
+    def _forget(self, show_id, token):
+        with self._lock:
+            entry = self._held.get(show_id)
+            if entry is not None:
+                for seat in [seat for seat, (owner, _) in entry[1].items() if owner == token]:
+                    del entry[1][seat]
+
+    def _remember(self, show_id, token, seats, deadline):
+        with self._lock:
+            entry = self._held.get(show_id)
+            if entry is not None:
+                for seat in seats:
+                    entry[1][seat] = (token, deadline)
+
+    def _load(self, show_id):
+        rows = execute_query(
+            """
+            SELECT seat_number, hold_token,
+                   TIMESTAMPDIFF(MICROSECOND, NOW(3), expires_at) / 1000000 AS remaining
+            FROM seat_holds
+            WHERE show_id = %s AND expires_at > NOW(3)
+            """,
+            (show_id,), primary=True
+        )
+        now = time.monotonic()
+        seats = {row['seat_number']: (row['hold_token'], now + float(row['remaining'])) for row in rows}
+        with self._lock:
+            self._held[show_id] = (now, seats)
+        return seats
+
+    # -- public API -------------------------------------------------------
+
+    def held_seats(self, show_id, exclude_token=None):
+        """Seats under a live hold for the show, other than ``exclude_token``'s own"""
+        self._ensure_expirer()  # also purges holds other workers left behind
+        now = time.monotonic()
+        with self._lock:
+            entry = self._held.get(show_id)
+            seats = entry[1] if entry is not None and now - entry[0] < self.cache_ttl else None
+            if seats is not None:
+                seats = dict(seats)
+        if seats is None:
+            seats = self._load(show_id)
+        return sorted(seat for seat, (token, deadline) in seats.items()
+                      if deadline > now and token != exclude_token)
+
+    def hold(self, show_id, token, user_id, seats, sold=()):
+        """Replace ``token``'s hold for the show with ``seats``.
+
+        ``sold`` lists requested seats already known to be sold; they are not
+        held. Returns ``(held, conflicts)``: the seats now held for this token,
+        and the requested seats that are sold or held by someone else.
+        """
+        self._ensure_expirer()
+        sold = set(sold)
+        wanted = [seat for seat in seats if seat not in sold]
+
+        def take(cursor):
+            cursor.execute("DELETE FROM seat_holds WHERE show_id = %s AND hold_token = %s", (show_id, token))
+            if not wanted:
+                return []
+            placeholders = ', '.join(['%s'] * len(wanted))
+            # Lapsed holds on these seats would otherwise block the insert below
+            cursor.execute(
+                f"DELETE FROM seat_holds WHERE show_id = %s AND seat_number IN ({placeholders}) AND expires_at <= NOW(3)",
+                [show_id] + wanted
+            )
+            cursor.executemany(
+                """
+                INSERT INTO seat_holds (show_id, seat_number, hold_token, user_id, expires_at)
+                VALUES (%s, %s, %s, %s, NOW(3) + INTERVAL %s SECOND)
+                ON DUPLICATE KEY UPDATE show_id = show_id
+                """,
+                [(show_id, seat, token, user_id, self.ttl) for seat in wanted]
+            )
+            cursor.execute("SELECT seat_number FROM seat_holds WHERE show_id = %s AND hold_token = %s",
+                           (show_id, token))
+            return [row['seat_number'] for row in cursor.fetchall()]
+
+        held = execute_transaction(take)
+        contended = [seat for seat in wanted if seat not in held]
+        self._changed(show_id)
+
+        deadline = time.monotonic() + self.ttl
+        self._forget(show_id, token)
+        self._remember(show_id, token, held, deadline)
+        with self._lock:
+            if held:
+                heapq.heappush(self._heap, (deadline, show_id, token))
+                self._wake.set()
+            self._stats['holds_requested'] += 1
+            self._stats['seats_requested'] += len(seats)
+            self._stats['seats_held'] += len(held)
+            self._stats['seats_contended'] += len(contended)
+            self._stats['seats_sold'] += len(sold)
+        return held, sorted(sold) + contended
+
+    def release(self, show_id, token):
+        """Drop ``token``'s hold for the show"""
+        released = _delete("DELETE FROM seat_holds WHERE show_id = %s AND hold_token = %s", (show_id, token))
+        self._forget(show_id, token)
+        if released:
+            self._changed(show_id)
+            self._count('holds_released')
+
+    def invalidate(self, show_id):
+        """Drop the cached holds of a show whose holds another process changed"""
+        with self._lock:
+            self._held.pop(show_id, None)
+
+    def record_booking(self, show_id, token, hold_claimed):
+        """Count a confirmed booking as converted from a hold or made without one"""
+        self._forget(show_id, token)
+        self._count('bookings_from_hold' if hold_claimed else 'bookings_without_hold')
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['pending_expiries'] = len(self._heap)
+            snapshot['shows_cached'] = len(self._held)
+        ended = snapshot['bookings_from_hold'] + snapshot['holds_expired'] + snapshot['holds_released']
+        snapshot['conversion_rate'] = snapshot['bookings_from_hold'] / ended if ended else 0.0
+        requested = snapshot['seats_requested']
+        snapshot['contention_rate'] = (snapshot['seats_contended'] + snapshot['seats_sold']) / requested if requested else 0.0
+        return snapshot
@@ -0,0 +1,184 @@
+"""In-process seat availability index.
+
+Keeps one bitset per show (bit i set = seat index i is sold, see
+utils/seat_layout.py) so seat maps and availability checks don't hit MySQL.
+Shows are loaded lazily from ``show_seats``, evicted least-recently-used once
+``max_shows`` are cached, and reloaded after ``max_age`` seconds so bookings made
+by other worker processes are picked up.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from utils.db_helper import execute_query
+from utils.seat_layout import seat_to_index, index_to_seat
+
+
+class ShowSeatMap:
+    """Sold-seat bitset for a single show"""
+
+    __slots__ = ('total_seats', 'bits', 'booked_count', 'loaded_at')
+
+    def __init__(self, total_seats):
+        self.total_seats = total_seats
+        self.bits = bytearray((total_seats + 7) // 8)
+        self.booked_count = 0
+        self.loaded_at = time.monotonic()
+
+    def is_booked(self, index):
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
+    def set_booked(self, index, booked):
+        mask = 1 << (index & 7)
+        if booked and not self.bits[index >> 3] & mask:
+            self.bits[index >> 3] |= mask
+            self.booked_count += 1
+        elif not booked and self.bits[index >> 3] & mask:
+            self.bits[index >> 3] &= ~mask
+            self.booked_count -= 1
+
+    def booked_seats(self):
+        return [index_to_seat(i) for i in range(self.total_seats) if self.is_booked(i)]
+
+
+class SeatIndex:
+    """LRU-bounded collection of per-show seat bitsets"""
+
+    def __init__(self, max_shows=5000, max_age=30):
+        self.max_shows = max_shows
+        self.max_age = max_age
+        self._shows = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'reloads': 0, 'drift_reloads': 0}
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(max_shows=config.get('SEAT_INDEX_MAX_SHOWS', 5000),
+                   max_age=config.get('SEAT_INDEX_MAX_AGE', 30))
+
+    def _load(self, show_id):
+        """Build a show's bitset from the database, or None if the show doesn't exist"""
+        show = execute_query(
+            """
+            SELECT sc.total_seats
+            FROM shows s
+            JOIN screens sc ON s.screen_id = sc.screen_id
+            WHERE s.show_id = %s
+            """,
+            (show_id,), primary=True
+        )
+        if not show:
+            return None
+        seat_map = ShowSeatMap(show[0]['total_seats'] or 0)
+        # From the primary: a replica's lag would cache seats as free that were just sold
+        for row in execute_query("SELECT seat_number FROM show_seats WHERE show_id = %s", (show_id,), primary=True):
+            index = seat_to_index(row['seat_number'])
+            if index is not None and index < seat_map.total_seats:
+                seat_map.set_booked(index, True)
+        return seat_map
+
+    def _store(self, show_id, seat_map):
+        with self._lock:
+            self._shows[show_id] = seat_map
+            self._shows.move_to_end(show_id)
+            while len(self._shows) > self.max_shows:
+                self._shows.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def get(self, show_id):
+        """Return the show's ShowSeatMap, loading it if needed (None if no such show)"""
+        with self._lock:
+            seat_map = self._shows.get(show_id)
+            if seat_map is not None:
+                if time.monotonic() - seat_map.loaded_at < self.max_age:
+                    self._shows.move_to_end(show_id)
+                    self._stats['hits'] += 1
+                    return seat_map
+                self._stats['reloads'] += 1
+            else:
+                self._stats['misses'] += 1
+
+        seat_map = self._load(show_id)
+        if seat_map is not None:
+            self._store(show_id, seat_map)
+        return seat_map
+
+    def booked_seats(self, show_id):
+        """Labels of every sold seat for the show"""
+        seat_map = self.get(show_id)
+        if seat_map is None:
+            return []
+        with self._lock:
+            return seat_map.booked_seats()
+
+    def unavailable(self, show_id, seats, verify=True):
+        """Return the subset of ``seats`` that are already sold.
+
+        With ``verify`` a conflict is double-checked against a fresh load, so a
+        stale entry can never reject a seat that another worker released.
+        """
+        seat_map = self.get(show_id)
+        if seat_map is None:
+            return []
+        taken = self._taken(seat_map, seats)
+        if taken and verify:
+            with self._lock:
+                self._stats['drift_reloads'] += 1
+            seat_map = self.rebuild(show_id)
+            taken = self._taken(seat_map, seats) if seat_map else []
+        return taken
+
+    def _taken(self, seat_map, seats):
+        taken = []
+        with self._lock:
+            for seat in seats:
+                index = seat_to_index(seat)
+                if index is not None and index < seat_map.total_seats and seat_map.is_booked(index):
+                    taken.append(seat)
+        return taken
+
+    def _update(self, show_id, seats, booked):
+        with self._lock:
+            seat_map = self._shows.get(show_id)
+            if seat_map is None:
+                return
+            for seat in seats:
+                index = seat_to_index(seat)
+                if index is not None and index < seat_map.total_seats:
+                    seat_map.set_booked(index, booked)
+
+    def mark_booked(self, show_id, seats):
+        """Record seats sold by a booking made in this process"""
+        self._update(show_id, seats, True)
+
+    def mark_released(self, show_id, seats):
+        """Record seats freed by a cancellation made in this process"""
+        self._update(show_id, seats, False)
+
+    def invalidate(self, show_id):
+        """Drop a show so its next read reloads from the database"""
+        with self._lock:
+            self._shows.pop(show_id, None)
+
+    def rebuild(self, show_id=None):
+        """Reload one show (returning its map), or every cached show, from the database"""
+        if show_id is not None:
+            seat_map = self._load(show_id)
+            if seat_map is None:
+                self.invalidate(show_id)
+            else:
+                self._store(show_id, seat_map)
+            return seat_map
+        with self._lock:
+            show_ids = list(self._shows)
+        for cached_show_id in show_ids:
+            self.rebuild(cached_show_id)
+        return None
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['shows_cached'] = len(self._shows)
+            snapshot['bitmap_bytes'] = sum(len(seat_map.bits) for seat_map in self._shows.values())
+        return snapshot
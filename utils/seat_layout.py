@@ -0,0 +1,31 @@
+"""Seat numbering shared by the seat map (templates/booking.html) and the server.
+
+Seats are laid out 12 to a row; rows are lettered from 'A', seats numbered from 1,
+so seat 'B3' is index 14. A screen with ``total_seats`` seats uses indexes
+0 .. total_seats - 1.
+"""
+
+SEATS_PER_ROW = 12
+
+def seat_to_index(seat_number):
+    """Convert a seat label like 'C7' to its 0-based index, or None if malformed"""
+    if not seat_number or len(seat_number) < 2:
+        return None
+    row = ord(seat_number[0].upper()) - ord('A')
+    number = seat_number[1:]
+    if row < 0 or row > 25 or not number.isdigit():
+        return None
+    number = int(number)
+    if number < 1 or number > SEATS_PER_ROW:
+        return None
+    return row * SEATS_PER_ROW + number - 1
+
+def index_to_seat(index):
+    """Convert a 0-based seat index back to its label"""
+    row, number = divmod(index, SEATS_PER_ROW)
+    return f'{chr(ord("A") + row)}{number + 1}'
+
+def is_valid_seat(seat_number, total_seats):
+    """True if the label names a seat that exists on a screen of this size"""
+    index = seat_to_index(seat_number)
+    return index is not None and index < total_seats
@@ -0,0 +1,313 @@
+"""Session backends.
+
+``SESSION_BACKEND`` picks one:
+
+* ``cookie`` (default): the session lives in a signed cookie. Known keys are
+  written under one-letter names and itsdangerous compresses the payload, so
+  a logged-in session (user_id, name, role) costs about a hundred bytes and
+  no server storage at all.
+* ``kv``: the cookie carries only a signed session id; the data lives in a
+  shared Redis-protocol key-value server (``SESSION_KV_URL``) so any worker
+  on any host can serve any user. Each process keeps a small LRU of recently
+  read sessions for ``SESSION_KV_CACHE_TTL`` seconds, and a request that
+  doesn't change its session writes nothing.
+* ``filesystem``: the previous Flask-Session file store, kept for rollback.
+
+Both new backends use sliding expiry: a session expires after
+``SESSION_IDLE_TIMEOUT`` seconds without a request, and is re-stamped at most
+once every ``SESSION_REFRESH_INTERVAL`` seconds rather than on every request.
+"""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from flask.sessions import SecureCookieSessionInterface, SessionInterface, SessionMixin, session_json_serializer
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+from utils.kv_client import KVClient
+
+SESSION_BACKENDS = ('cookie', 'kv', 'filesystem')
+
+# One-letter cookie names for the keys the app actually stores. Any other key
+# is kept under its own name.
+COOKIE_FIELDS = {'user_id': 'u', 'name': 'n', 'role': 'r', 'hold_token': 'h', '_flashes': 'f',
+                 'primary_until': 'p'}
+_COOKIE_KEYS = {short: key for key, short in COOKIE_FIELDS.items()}
+
+
+class _CompactSerializer:
+    """Flask's tagged JSON with the short cookie field names"""
+
+    def dumps(self, value):
+        return session_json_serializer.dumps({COOKIE_FIELDS.get(key, key): item for key, item in value.items()})
+
+    def loads(self, value):
+        return {_COOKIE_KEYS.get(key, key): item for key, item in session_json_serializer.loads(value).items()}
+
+
+def _cookie_options(interface, app):
+    return {
+        'domain': interface.get_cookie_domain(app),
+        'path': interface.get_cookie_path(app),
+        'secure': interface.get_cookie_secure(app),
+        'samesite': interface.get_cookie_samesite(app),
+        'httponly': interface.get_cookie_httponly(app),
+    }
+
+
+class CompactCookieSessionInterface(SecureCookieSessionInterface):
+    """Signed cookie sessions with short field names and sliding expiry"""
+
+    serializer = _CompactSerializer()
+
+    def __init__(self, idle_timeout=7200, refresh_interval=300):
+        self.idle_timeout = idle_timeout
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._stats = {'opened': 0, 'expired': 0, 'written': 0, 'refreshed': 0, 'bytes_written': 0}
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(idle_timeout=config.get('SESSION_IDLE_TIMEOUT', 7200),
+                   refresh_interval=config.get('SESSION_REFRESH_INTERVAL', 300))
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def open_session(self, app, request):
+        signer = self.get_signing_serializer(app)
+        if signer is None:
+            return None
+        self._count('opened')
+        value = request.cookies.get(self.get_cookie_name(app))
+        if not value:
+            return self.session_class()
+        try:
+            # The signature timestamp enforces the idle timeout server-side
+            data, issued_at = signer.loads(value, max_age=self.idle_timeout, return_timestamp=True)
+        except BadSignature:
+            self._count('expired')
+            return self.session_class()
+        session = self.session_class(data)
+        session.issued_at = issued_at
+        return session
+
+    def should_set_cookie(self, app, session):
+        if session.modified:
+            return True
+        issued_at = getattr(session, 'issued_at', None)
+        if issued_at is None:
+            return False
+        return (datetime.now(timezone.utc) - issued_at).total_seconds() >= self.refresh_interval
+
+    def save_session(self, app, session, response):
+        if session and not session.modified and self.should_set_cookie(app, session):
+            self._count('refreshed')
+        super().save_session(app, session, response)
+        prefix = self.get_cookie_name(app) + '='
+        for cookie in response.headers.getlist('Set-Cookie'):
+            if session and cookie.startswith(prefix):
+                self._count('written')
+                self._count('bytes_written', len(cookie.split(';', 1)[0]) - len(prefix))
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['backend'] = 'cookie'
+        snapshot['avg_cookie_bytes'] = snapshot['bytes_written'] / snapshot['written'] if snapshot['written'] else 0
+        return snapshot
+
+
+class KVSession(CallbackDict, SessionMixin):
+    """Session data stored under ``sid`` in the key-value server"""
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(session):
+            session.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+
+class KVSessionInterface(SessionInterface):
+    """Server-side sessions in a Redis-protocol store, with an in-process LRU"""
+
+    session_class = KVSession
+    serializer = session_json_serializer
+    salt = 'kv-session'
+
+    def __init__(self, client, key_prefix='session:', idle_timeout=7200, refresh_interval=300,
+                 cache_size=10000, cache_ttl=5.0):
+        self.client = client
+        self.key_prefix = key_prefix
+        self.idle_timeout = idle_timeout
+        self.refresh_interval = refresh_interval
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._cache = OrderedDict()  # sid -> [payload, loaded_at, expiry pushed at (or None)]
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self._stats = {
+            'opened': 0, 'cache_hits': 0, 'store_reads': 0, 'not_found': 0, 'writes': 0,
+            'refreshes': 0, 'unchanged': 0, 'deletes': 0, 'evictions': 0, 'swept': 0,
+        }
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(KVClient.from_url(config.get('SESSION_KV_URL', 'redis://127.0.0.1:6379/0'),
+                                     timeout=config.get('SESSION_KV_TIMEOUT', 2.0)),
+                   key_prefix=config.get('SESSION_KEY_PREFIX', 'session:'),
+                   idle_timeout=config.get('SESSION_IDLE_TIMEOUT', 7200),
+                   refresh_interval=config.get('SESSION_REFRESH_INTERVAL', 300),
+                   cache_size=config.get('SESSION_KV_CACHE_SIZE', 10000),
+                   cache_ttl=config.get('SESSION_KV_CACHE_TTL', 5.0))
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt=self.salt, key_derivation='hmac')
+
+    # -- local cache ------------------------------------------------------
+
+    def _sweep_if_due(self, now):
+        """Drop cached sessions idle long enough to have expired in the store"""
+        with self._lock:
+            if now - self._last_sweep < self.refresh_interval:
+                return
+            self._last_sweep = now
+            expired = [sid for sid, entry in self._cache.items() if now - entry[1] >= self.idle_timeout]
+            for sid in expired:
+                del self._cache[sid]
+            self._stats['swept'] += len(expired)
+
+    def _cached(self, sid, now):
+        """(fresh cache entry or None, when this process last pushed the sid's expiry)"""
+        with self._lock:
+            entry = self._cache.get(sid)
+            if entry is None:
+                return None, None
+            if now - entry[1] < self.cache_ttl:
+                self._cache.move_to_end(sid)
+                self._stats['cache_hits'] += 1
+                return entry, entry[2]
+            return None, entry[2]
+
+    def _remember(self, sid, payload, now, pushed_at):
+        with self._lock:
+            self._cache[sid] = [payload, now, pushed_at]
+            self._cache.move_to_end(sid)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def _forget(self, sid):
+        with self._lock:
+            self._cache.pop(sid, None)
+
+    # -- SessionInterface -------------------------------------------------
+
+    def open_session(self, app, request):
+        if not app.secret_key:
+            return None
+        self._count('opened')
+        now = time.monotonic()
+        self._sweep_if_due(now)
+
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        sid = None
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode('ascii')
+            except (BadSignature, UnicodeDecodeError):
+                sid = None
+        if sid:
+            entry, pushed_at = self._cached(sid, now)
+            if entry is None:
+                payload = self.client.get(self.key_prefix + sid)
+                self._count('store_reads')
+                if payload is not None:
+                    payload = payload.decode('utf-8')
+                    # pushed_at stays None for a session new to this process, so save refreshes it
+                    entry = [payload, now, pushed_at]
+                    self._remember(sid, *entry)
+                else:
+                    self._forget(sid)
+                    self._count('not_found')
+            if entry is not None:
+                return self.session_class(self.serializer.loads(entry[0]), sid=sid)
+        return self.session_class(sid=secrets.token_urlsafe(24), new=True)
+
+    def save_session(self, app, session, response):
+        options = _cookie_options(self, app)
+        name = self.get_cookie_name(app)
+        key = self.key_prefix + session.sid
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if not session:
+            if session.modified and not session.new:
+                self.client.delete(key)
+                self._forget(session.sid)
+                self._count('deletes')
+                response.delete_cookie(name, **options)
+            return
+
+        now = time.monotonic()
+        ttl_ms = self.idle_timeout * 1000
+        payload = self.serializer.dumps(dict(session))
+        with self._lock:
+            entry = self._cache.get(session.sid)
+            entry = list(entry) if entry is not None else None
+
+        stored = True
+        if session.new or entry is None or (session.modified and entry[0] != payload):
+            self.client.set(key, payload, ttl_ms=ttl_ms)
+            self._remember(session.sid, payload, now, now)
+            self._count('writes')
+        elif entry[2] is None or now - entry[2] >= self.refresh_interval:
+            # Sliding expiry; the key may have lapsed since we read it
+            if not self.client.pexpire(key, ttl_ms):
+                self.client.set(key, payload, ttl_ms=ttl_ms)
+                self._count('writes')
+            self._remember(session.sid, entry[0], entry[1], now)
+            self._count('refreshes')
+        else:
+            stored = False
+            self._count('unchanged')
+
+        if session.new or (stored and session.permanent):
+            response.set_cookie(name, self._signer(app).sign(session.sid).decode('ascii'),
+                                expires=self.get_expiration_time(app, session), **options)
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['cached_sessions'] = len(self._cache)
+        snapshot['backend'] = 'kv'
+        opened = snapshot['opened']
+        snapshot['cache_hit_rate'] = snapshot['cache_hits'] / opened if opened else 0.0
+        return snapshot
+
+
+def init_session(app):
+    """Install the session interface named by ``SESSION_BACKEND``"""
+    backend = app.config.get('SESSION_BACKEND', 'cookie')
+    if backend == 'cookie':
+        app.session_interface = CompactCookieSessionInterface.from_config(app.config)
+    elif backend == 'kv':
+        app.session_interface = KVSessionInterface.from_config(app.config)
+    elif backend == 'filesystem':
+        from flask_session import Session
+        Session(app)
+    else:
+        raise ValueError(f'SESSION_BACKEND must be one of {", ".join(SESSION_BACKENDS)}, not {backend!r}')
+    return app.session_interface
@@ -0,0 +1,139 @@
+"""Faster template rendering: a persistent bytecode cache and cached fragments.
+
+Compiling a template (parse, generate Python, compile) costs far more than
+rendering it. Jinja keeps compiled templates in memory, but every new worker
+process starts empty, and workers are recycled every ``SERVER_MAX_REQUESTS``
+requests. The bytecode cache stores the compiled code in
+``TEMPLATE_BYTECODE_DIR`` (by default ``jinja-cache`` in the app's instance
+folder), so a new worker (or one after a restart) loads it instead of
+compiling again. Jinja checks each entry against a checksum of the template
+source, so an edited template is recompiled, never served stale. Cached
+bytecode is executed as it is loaded. So the directory is created private to
+the app's user, and the cache is left off if other users could write to it
+(a shared /tmp path, say).
+``flask --app app precompile-templates`` fills the cache during a deploy,
+and utils/warmup.py loads every template before a worker takes requests.
+
+The ``{% cache %}`` tag caches a rendered fragment in a PageCache
+(``app.fragment_cache``)::
+
+    {% cache 'movie-card', movie tagged 'movie:' ~ movie.movie_id %}
+        ...
+    {% endcache %}
+
+Everything before ``tagged`` makes up the key. Dicts (database rows) are
+keyed by their contents, so a changed row gets a new key and never finds
+the old markup. The key has to cover everything else the fragment depends
+on too, such as whether a visitor is signed in. Tags use the entity names of
+utils/page_cache.py. ``changed()`` in app.py drops the fragments of the
+entities it changes, and so frees the superseded ones at once instead of
+leaving them to expire.
+
+Fragments are rendered fresh while templates auto-reload (debug mode), since
+an edited template would not change the key.
+
+``template_fingerprint`` hashes every template's source. The ETags of
+rendered pages include it (utils/versions.py), so a deploy that changes a
+template isn't answered with a 304 for the old markup.
+"""
+
+import hashlib
+import os
+import time
+
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+
+from utils.page_cache import PageCache
+
+
+def _freeze(value):
+    """A hashable stand-in for a fragment key part"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class FragmentCacheExtension(Extension):
+    """``{% cache key, ... [tagged tags] %}...{% endcache %}``"""
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            key.append(parser.parse_expression())
+        tags = parser.parse_expression() if parser.stream.skip_if('name:tagged') else nodes.List([])
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        # The template's name keeps two templates' fragments apart
+        key.insert(0, nodes.Const(parser.name))
+        call = self.call_method('_render', [nodes.List(key), tags])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, key, tags, caller):
+        cache = self.environment.fragment_cache
+        if cache is None or self.environment.auto_reload:
+            return caller()
+        return cache.get_or_set(_freeze(key), caller, tags=(tags,) if isinstance(tags, str) else tuple(tags))
+
+
+def _writable_by_others(directory):
+    """True if someone other than this user could plant bytecode in ``directory``"""
+    if not hasattr(os, 'getuid'):
+        return False  # Windows: no owner or mode bits to check
+    status = os.stat(directory)
+    return status.st_uid != os.getuid() or bool(status.st_mode & 0o022)
+
+
+def init_templates(app):
+    """Give ``app`` a bytecode cache and the ``{% cache %}`` tag; returns the fragment cache"""
+    config = app.config
+    directory = config.get('TEMPLATE_BYTECODE_DIR')
+    if directory is None:
+        directory = os.path.join(app.instance_path, 'jinja-cache')
+    if directory:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        if _writable_by_others(directory):
+            app.logger.warning('Template bytecode cache disabled: %s is writable by other users', directory)
+        else:
+            app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+    fragments = PageCache(default_ttl=config.get('FRAGMENT_CACHE_TTL', 600),
+                          max_entries=config.get('FRAGMENT_CACHE_MAX_ENTRIES', 5000))
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.jinja_env.fragment_cache = fragments
+    app.jinja_env.extend(template_fingerprint=None)
+    return fragments
+
+
+def template_fingerprint(app):
+    """A short hash of every template's source; computed once, or per call while templates auto-reload"""
+    env = app.jinja_env
+    if env.template_fingerprint is None or env.auto_reload:
+        digest = hashlib.sha256()
+        for name in env.list_templates(extensions=('html',)):
+            source = env.loader.get_source(env, name)[0]
+            digest.update(f'{name}\0{source}\0'.encode('utf-8'))
+        env.template_fingerprint = digest.hexdigest()[:12]
+    return env.template_fingerprint
+
+
+def precompile_templates(app, clear=False):
+    """Load every template, compiling it into the bytecode cache if needed; returns {name: seconds}"""
+    env = app.jinja_env
+    if clear and env.bytecode_cache is not None:
+        env.bytecode_cache.clear()
+    if clear and env.cache is not None:
+        env.cache.clear()
+    timings = {}
+    for name in env.list_templates(extensions=('html',)):
+        started = time.perf_counter()
+        env.get_template(name)
+        timings[name] = time.perf_counter() - started
+    return timings
@@ -0,0 +1,241 @@
+"""Per-entity version counters for conditional GET.
+
+Pages and API responses are built from a few entities: ``catalog`` (the
+movie list), ``movie:<id>`` and ``show:<id>``. These are the same names
+utils/page_cache.py uses as tags. A write bumps the counters of whatever
+it changed in ``entity_versions``, so every worker process sees the bump.
+Each process keeps all the counters in memory. A background thread pulls the
+rows changed since its last look every ``sync_interval`` seconds. It passes
+entities that another process changed to the listeners first (app.py drops
+its cached copies of them), and only then publishes the new versions. That
+order means an ETag can never describe content older than the cache holds.
+
+``validators`` turns the versions a response depends on into a weak ETag
+and a Last-Modified time. Views check them before running SQL or rendering a
+template, and answer a matching If-None-Match (or, without one,
+If-Modified-Since) with a 304. Responses that also depend on the clock (e.g.
+"upcoming shows") pass ``ttl``, which folds a time bucket into the ETag.
+
+The same data renders differently after a deploy. So every ETag also covers
+``BUILD_ID`` (set it to the release, e.g. the git commit) and the parts
+registered with ``add_build_part``: app.py adds the asset manifest and the
+template sources.
+
+Last-Modified has one-second resolution. It is sent only once the newest
+change is at least a second old. Otherwise two changes within one second
+could share a Last-Modified, and the second would go unnoticed.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import request
+
+from utils.db_helper import execute_query, execute_transaction
+
+# A bump stamped just before a sync may commit just after it; re-read this far back
+SYNC_OVERLAP = 5.0
+
+
+class Validators:
+    """The ETag and Last-Modified for one response"""
+
+    def __init__(self, etag, last_modified, private):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.private = private
+
+    def matches(self):
+        """True if the request already holds this version"""
+        if request.if_none_match:
+            return request.if_none_match.contains_weak(self.etag)
+        since = request.if_modified_since
+        return bool(since and self.last_modified and self.last_modified <= since)
+
+    def apply(self, response):
+        response.set_etag(self.etag, weak=True)
+        if self.last_modified is not None:
+            response.last_modified = self.last_modified
+        response.headers['Cache-Control'] = 'private, no-cache' if self.private else 'no-cache'
+        return response
+
+
+class VersionCounters:
+    """In-memory copy of ``entity_versions``, kept in sync by a background thread"""
+
+    def __init__(self, app, sync_interval=1.0):
+        self.app = app
+        self.sync_interval = sync_interval
+        self._versions = {}  # entity -> (version, modified as a Unix time)
+        self._dirty = set()  # bumped here, but the write failed: no validators until it succeeds
+        self._listeners = []
+        self._build_parts = []
+        self._synced_to = None
+        self._lock = threading.Lock()
+        self._syncing = threading.Lock()
+        self._syncer = None
+        self._pid = None
+        self._stats = {'bumps': 0, 'bump_failures': 0, 'syncs': 0, 'sync_failures': 0,
+                       'remote_changes': 0, 'validated': 0, 'not_modified': 0}
+
+    @classmethod
+    def from_app(cls, app):
+        return cls(app, sync_interval=app.config.get('VERSION_SYNC_INTERVAL', 1.0))
+
+    def add_listener(self, callback):
+        """Call ``callback(entities)`` with the entities other processes change"""
+        self._listeners.append(callback)
+
+    def add_build_part(self, part):
+        """Fold ``part()`` (a hash of something deployed, such as the assets) into every ETag"""
+        self._build_parts.append(part)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    # -- writes -----------------------------------------------------------
+
+    def bump(self, *entities):
+        """Record that ``entities`` changed, for this process and every other one"""
+        entities = list(dict.fromkeys(entities))
+        if not entities:
+            return
+        now = time.time()
+
+        def write(cursor):
+            cursor.executemany(
+                """
+                INSERT INTO entity_versions (entity, version, updated_at) VALUES (%s, 1, FROM_UNIXTIME(%s))
+                ON DUPLICATE KEY UPDATE version = version + 1, updated_at = VALUES(updated_at)
+                """,
+                [(entity, now) for entity in entities]
+            )
+            cursor.execute(
+                f"SELECT entity, version FROM entity_versions WHERE entity IN ({', '.join(['%s'] * len(entities))})",
+                entities
+            )
+            return cursor.fetchall()
+
+        try:
+            rows = execute_transaction(write)
+        except Exception as e:
+            # The page would change without its ETag changing; stop validating it instead
+            self.app.logger.error('Could not bump versions of %s: %s', ', '.join(entities), e)
+            with self._lock:
+                self._dirty.update(entities)
+                self._stats['bump_failures'] += 1
+            return
+        with self._lock:
+            for row in rows:
+                self._versions[row['entity']] = (row['version'], now)
+            self._dirty.difference_update(entities)
+            self._stats['bumps'] += len(entities)
+
+    # -- sync -------------------------------------------------------------
+
+    def _ensure_syncer(self):
+        with self._lock:
+            if self._syncer is not None and self._pid == os.getpid():
+                return
+            # Started lazily, and again after a fork: threads don't survive fork
+            self._pid = os.getpid()
+            self._syncer = threading.Thread(target=self._run, name='version-sync', daemon=True)
+            self._syncer.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.sync_interval)
+            try:
+                with self.app.app_context():
+                    with self._lock:
+                        dirty = list(self._dirty)
+                    if dirty:
+                        self.bump(*dirty)
+                    self.sync()
+            except Exception as e:
+                self._count('sync_failures')
+                self.app.logger.warning('Version sync failed: %s', e)
+
+    def sync(self):
+        """Pull counters changed since the last sync"""
+        with self._syncing:
+            first = self._synced_to is None
+            query = "SELECT entity, version, UNIX_TIMESTAMP(updated_at) AS modified FROM entity_versions"
+            if first:
+                rows = execute_query(query, primary=True)
+            else:
+                rows = execute_query(query + " WHERE updated_at >= FROM_UNIXTIME(%s)",
+                                     (self._synced_to - SYNC_OVERLAP,), primary=True)
+            with self._lock:
+                changed = [row for row in rows
+                           if row['version'] > self._versions.get(row['entity'], (0, None))[0]]
+            if changed and not first:
+                entities = [row['entity'] for row in changed]
+                for listener in self._listeners:
+                    listener(entities)
+                self._count('remote_changes', len(changed))
+            with self._lock:
+                for row in changed:
+                    # Re-checked: a local bump may have moved it further meanwhile
+                    if row['version'] > self._versions.get(row['entity'], (0, None))[0]:
+                        self._versions[row['entity']] = (row['version'], float(row['modified']))
+                modified = [float(row['modified']) for row in rows]
+                self._synced_to = max(modified + [self._synced_to or 0.0]) or time.time()
+                self._stats['syncs'] += 1
+
+    # -- reads ------------------------------------------------------------
+
+    def version(self, entity):
+        """(version, modified Unix time or None) for one entity"""
+        self._ensure_syncer()
+        if self._synced_to is None:
+            self.sync()  # once per process, before the first validators
+        with self._lock:
+            return self._versions.get(entity, (0, None))
+
+    def validators(self, entities, vary=(), ttl=None):
+        """Validators for a response built from ``entities``, or None if one can't be trusted.
+
+        ``vary`` lists anything else the response depends on, such as the
+        signed-in user, and makes the response private.
+        """
+        versions = [(entity,) + self.version(entity) for entity in entities]
+        with self._lock:
+            if self._dirty.intersection(entities):
+                return None
+            self._stats['validated'] += 1
+        now = time.time()
+        modified = [stamp for _, _, stamp in versions if stamp is not None]
+        key = [(entity, version) for entity, version, _ in versions]
+        if ttl:
+            bucket = int(now // ttl)
+            key.append(('t', bucket))
+            modified.append(bucket * ttl)
+        key.append(('vary', tuple(vary)))
+        key.append(('build', self.app.config.get('BUILD_ID'), tuple(part() for part in self._build_parts)))
+        etag = hashlib.blake2b(repr(key).encode(), digest_size=10).hexdigest()
+
+        last_modified = None
+        newest = max(modified, default=None)
+        if newest is not None and now - newest >= 1:
+            last_modified = datetime.fromtimestamp(int(newest), timezone.utc)
+        return Validators(etag, last_modified, private=bool(vary))
+
+    def not_modified(self, validators):
+        """A 304 for a request whose validators match"""
+        self._count('not_modified')
+        return validators.apply(self.app.response_class(status=304))
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot.update({
+                'entities': len(self._versions),
+                'dirty': sorted(self._dirty),
+                'synced_to': self._synced_to,
+            })
+        return snapshot
@@ -0,0 +1,77 @@
+"""Worker warmup for the production server.
+
+A freshly forked worker starts with empty pools and caches, so its first
+requests would each pay for a MySQL handshake, a movie search rebuild,
+template compilation and the home page queries. The launcher in run.py runs
+``warm_worker`` in every worker before it accepts connections (and again
+for every replacement worker, since workers are recycled after
+``SERVER_MAX_REQUESTS``). Each step is timed and a failing step is only
+logged: a cold worker is better than no worker.
+
+Steps, in order:
+
+* open ``DB_POOL_MIN_SIZE`` connections to the primary and to each replica,
+  then check replication lag so reads can go to replicas at once;
+* build the movie search index;
+* load the seat maps of the next ``SERVER_WARMUP_SHOWS`` shows;
+* load the asset manifest (building the bundles if the deploy didn't);
+* load every template, from the bytecode cache if the deploy precompiled it;
+* render the home page and the pages of movies with upcoming shows through
+  the test client, which fills the page and fragment caches.
+"""
+
+import time
+
+from utils.db_helper import execute_query
+from utils.templates import precompile_templates
+
+
+def _upcoming_shows(limit):
+    return execute_query(
+        "SELECT show_id, movie_id FROM shows WHERE show_time > NOW() ORDER BY show_time LIMIT %s",
+        (limit,)
+    )
+
+
+def warm_worker(app, show_limit=50):
+    """Prime ``app``'s pools and caches; returns {step: seconds, or 'failed: ...'}"""
+    timings = {}
+
+    def step(name, func):
+        started = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            app.logger.warning('Warmup step %s failed: %s', name, e)
+            timings[name] = f'failed: {e}'
+        else:
+            timings[name] = round(time.perf_counter() - started, 3)
+
+    def warm_replicas():
+        for replica in app.db_replicas.replicas:
+            replica.pool.warm()
+        app.db_replicas.check_all()
+
+    shows = []
+
+    def warm_seat_maps():
+        shows.extend(_upcoming_shows(show_limit))
+        for show in shows:
+            app.seat_index.get(show['show_id'])
+
+    def warm_pages():
+        client = app.test_client()
+        client.get('/')
+        for movie_id in dict.fromkeys(show['movie_id'] for show in shows):
+            client.get(f'/movie/{movie_id}')
+
+    with app.app_context():
+        step('db_pool', app.db_pool.warm)
+        if app.db_replicas:
+            step('db_replicas', warm_replicas)
+        step('movie_search', app.movie_search.rebuild)
+        step('seat_index', warm_seat_maps)
+    step('assets', app.assets.manifest)
+    step('templates', lambda: precompile_templates(app))
+    step('pages', warm_pages)
+    return timings